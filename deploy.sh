@@ -57,6 +57,13 @@ if [ ! -d "../src/auth_lambda_layer/python" ]; then
     pip3 install pyjwt -t ../src/auth_lambda_layer/python
 fi
 
+# Install the layer's compiled packages (orjson) as wheels for the Lambda runtime,
+# not the local machine; keep in line with the authorizer's runtime and architecture
+echo "📦 Installing Lambda layer packages..."
+pip3 install -r ../src/auth_lambda_layer/requirements.txt -t ../src/auth_lambda_layer/python \
+    --platform manylinux2014_x86_64 --implementation cp --python-version 3.13 \
+    --only-binary=:all: --upgrade
+
 # Deploy the stack
 echo "🚀 Deploying CDK stack..."
 npx cdk deploy --all --require-approval never
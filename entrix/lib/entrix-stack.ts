@@ -110,12 +110,29 @@ export class EntrixStack extends cdk.Stack {
     // Lambda Layer for PyJWT
     // 1. Package the layer: pip3 install pyjwt -t ../src/auth_lambda_layer/python
     // 2. The directory structure should be: ../src/auth_lambda_layer/python/jwt/... etc.
+    // 3. deploy.sh installs orjson from requirements.txt into python/ for the Lambda runtime
     const jwtLayer = new lambda.LayerVersion(this, 'JwtLayer', {
-      code: lambda.Code.fromAsset('../src/auth_lambda_layer'),
+      code: lambda.Code.fromAsset('../src/auth_lambda_layer', { exclude: ['requirements.txt'] }),
       compatibleRuntimes: [lambda.Runtime.PYTHON_3_13],
       description: 'Layer with PyJWT for JWT authorizer',
     });
 
+    // Optional AWS Parameters and Secrets Lambda Extension, so the authorizer reads the
+    // secret from localhost instead of importing boto3 during INIT. The layer ARN is regional:
+    // cdk deploy -c secretsExtensionLayerArn=arn:aws:lambda:eu-west-1:015030872274:layer:AWS-Parameters-and-Secrets-Lambda-Extension:<version>
+    const secretsExtensionLayerArn: string | undefined = this.node.tryGetContext('secretsExtensionLayerArn');
+    const authorizerLayers: lambda.ILayerVersion[] = [jwtLayer];
+    if (secretsExtensionLayerArn) {
+      authorizerLayers.push(lambda.LayerVersion.fromLayerVersionArn(this, 'SecretsExtensionLayer', secretsExtensionLayerArn));
+    }
+
+    // API Gateway caches the authorizer's policy per Authorization header for this long (0 disables it).
+    // While caching, policies cover the whole stage by default, so one authorizer call serves every
+    // method for the token: cdk deploy -c authorizerResultsCacheTtlSeconds=600 -c authorizerPolicyScope=api
+    const authorizerResultsCacheTtlSeconds = Number(this.node.tryGetContext('authorizerResultsCacheTtlSeconds') ?? 300);
+    const authorizerPolicyScope: string = this.node.tryGetContext('authorizerPolicyScope')
+      ?? (authorizerResultsCacheTtlSeconds > 0 ? 'stage' : 'method');
+
     // Lambda Authorizer for JWT authentication (request-based)
     const authorizerLambda = new lambda.Function(this, 'JwtAuthorizerLambda', {
       runtime: lambda.Runtime.PYTHON_3_13,
@@ -123,8 +140,13 @@ export class EntrixStack extends cdk.Stack {
       code: lambda.Code.fromAsset('../src/auth_lambda'),
       environment: {
         JWT_SECRET_ARN: jwtSecret.secretArn,
+        // Warm containers serve the secret from memory for this long
+        JWT_SECRET_TTL_SECONDS: '300',
+        // method, resource, stage or api: what the returned policies cover
+        POLICY_SCOPE: authorizerPolicyScope,
+        ...(secretsExtensionLayerArn ? { JWT_SECRETS_EXTENSION: '1' } : {}),
       },
-      layers: [jwtLayer],
+      layers: authorizerLayers,
     });
 
     // Grant the Lambda function permission to read the secret
@@ -149,7 +171,8 @@ export class EntrixStack extends cdk.Stack {
     // Attach request-based Lambda authorizer to POST /orders
     const jwtAuthorizer = new apigateway.RequestAuthorizer(this, 'JwtRequestAuthorizer', {
       handler: authorizerLambda,
-      identitySources: [apigateway.IdentitySource.header('Authorization')]
+      identitySources: [apigateway.IdentitySource.header('Authorization')],
+      resultsCacheTtl: cdk.Duration.seconds(authorizerResultsCacheTtlSeconds),
     });
     orders.addMethod('POST', undefined, {
       authorizer: jwtAuthorizer,
@@ -16,6 +16,8 @@ export class PipelineStack extends cdk.Stack {
         commands: [
           'pwd',
           'ls -al',
+          // orjson wheels for the authorizer's runtime, as deploy.sh installs them
+          'pip3 install -r src/auth_lambda_layer/requirements.txt -t src/auth_lambda_layer/python --platform manylinux2014_x86_64 --implementation cp --python-version 3.13 --only-binary=:all: --upgrade',
           'cd entrix',
           'npm install',
           'npm run build',
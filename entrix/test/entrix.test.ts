@@ -1,19 +1,56 @@
-// import * as cdk from 'aws-cdk-lib';
-// import { Template } from 'aws-cdk-lib/assertions';
-// import * as Entrix from '../lib/entrix-stack';
-
-// example test. To run these tests, uncomment this file along with the
-// example resource in lib/entrix-stack.ts
-test('SQS Queue Created', () => {
-//   const app = new cdk.App();
-//     // WHEN
-//   const stack = new Entrix.EntrixStack(app, 'MyTestStack');
-//     // THEN
-//   const template = Template.fromStack(stack);
-
-//   template.hasResourceProperties('AWS::SQS::Queue', {
-//     VisibilityTimeout: 300
-//   });
+import * as cdk from 'aws-cdk-lib';
+import { Match, Template } from 'aws-cdk-lib/assertions';
+import * as Entrix from '../lib/entrix-stack';
+
+function synth(context?: Record<string, unknown>): Template {
+  const app = new cdk.App({ context });
+  const stack = new Entrix.EntrixStack(app, 'MyTestStack');
+  return Template.fromStack(stack);
+}
+
+test('JWT authorizer caches results and returns stage-wide policies by default', () => {
+  const template = synth();
+
+  template.hasResourceProperties('AWS::ApiGateway::Authorizer', {
+    Type: 'REQUEST',
+    IdentitySource: 'method.request.header.Authorization',
+    AuthorizerResultTtlInSeconds: 300,
+  });
+  template.hasResourceProperties('AWS::Lambda::Function', {
+    Environment: { Variables: Match.objectLike({ POLICY_SCOPE: 'stage' }) },
+  });
+});
+
+test('Authorizer cache TTL and policy scope are configurable from context', () => {
+  const template = synth({ authorizerResultsCacheTtlSeconds: 900, authorizerPolicyScope: 'api' });
+
+  template.hasResourceProperties('AWS::ApiGateway::Authorizer', {
+    AuthorizerResultTtlInSeconds: 900,
+  });
+  template.hasResourceProperties('AWS::Lambda::Function', {
+    Environment: { Variables: Match.objectLike({ POLICY_SCOPE: 'api' }) },
+  });
 });
 
+test('Policies are scoped to the method when authorizer caching is disabled', () => {
+  const template = synth({ authorizerResultsCacheTtlSeconds: 0 });
+
+  template.hasResourceProperties('AWS::ApiGateway::Authorizer', {
+    AuthorizerResultTtlInSeconds: 0,
+  });
+  template.hasResourceProperties('AWS::Lambda::Function', {
+    Environment: { Variables: Match.objectLike({ POLICY_SCOPE: 'method' }) },
+  });
+});
 
+test('Secrets extension layer is attached only when its ARN is given', () => {
+  const layerArn = 'arn:aws:lambda:eu-west-1:015030872274:layer:AWS-Parameters-and-Secrets-Lambda-Extension:12';
+
+  synth().resourcePropertiesCountIs('AWS::Lambda::Function', {
+    Environment: { Variables: Match.objectLike({ JWT_SECRETS_EXTENSION: '1' }) },
+  }, 0);
+  synth({ secretsExtensionLayerArn: layerArn }).hasResourceProperties('AWS::Lambda::Function', {
+    Layers: Match.arrayWith([layerArn]),
+    Environment: { Variables: Match.objectLike({ JWT_SECRETS_EXTENSION: '1' }) },
+  });
+});
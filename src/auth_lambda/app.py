@@ -1,66 +1,185 @@
-import json
-import os
+import logging
 import jwt  # PyJWT
-import boto3
-from botocore.exceptions import ClientError
-
-def get_secret():
-    """Retrieve JWT secret from AWS Secrets Manager"""
-    secret_name = os.environ.get('JWT_SECRET_ARN')
-    
-    if not secret_name:
-        raise ValueError("JWT_SECRET_ARN environment variable is not set")
-    
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=os.environ.get('AWS_REGION', 'eu-west-1')
-    )
-    
+from counter_metrics import counter_metrics_from_env
+from decision_cache import decision_cache_from_env, token_digest
+from phase_metrics import phase_metrics_from_env
+from policy_scope import policy_resource, policy_scope_from_env
+from prefilter import REJECTION_ERRORS, TokenRejected, prefilter_from_env
+from secret_provider import secret_provider_from_env
+from tenant_keys import tenant_key_provider_from_env
+
+logger = logging.getLogger()
+
+# Fetched during INIT so warm invocations are served from memory. Tenant
+# key-map mode (JWT_TENANT_SECRET_PREFIX or JWT_TENANT_KEYS_SECRET_ARN) loads
+# every tenant's key instead of the versions of one secret.
+secret_provider = tenant_key_provider_from_env() or secret_provider_from_env()
+try:
+    secret_provider.key_ring()
+except Exception as e:
+    logger.warning("Could not prefetch JWT secret during INIT: %s", e)
+
+# Allow decisions for tokens already verified by this container.
+decision_cache = decision_cache_from_env()
+
+# Opt-in per-phase decode timings, published as CloudWatch embedded metrics.
+phase_metrics = phase_metrics_from_env()
+
+# Size, format and expiry checks run before any crypto, and recently rejected
+# tokens are denied from a negative cache.
+prefilter = prefilter_from_env()
+
+# Decision-cache and prefilter counters, published as CloudWatch embedded
+# metrics every AUTHORIZER_METRICS_INTERVAL_SECONDS (0 disables).
+counter_metrics = counter_metrics_from_env({
+    'decision_cache': decision_cache.stats,
+    'prefilter': prefilter.stats,
+})
+
+# Policies cover the methodArn, or with POLICY_SCOPE its resource, stage or
+# whole API, so API Gateway's cached result serves the other methods too.
+policy_scope = policy_scope_from_env()
+
+# Deny policies by error and resource, built once and returned as is
+_deny_policies = {}
+MAX_DENY_POLICIES = 256
+
+class UnconfirmedSignatureError(jwt.InvalidSignatureError):
+    """Signature failure against a key-ring too recently fetched to refresh, so the secret may have rotated since"""
+
+def get_key_ring():
+    """Return the key-ring (or tenant key map), served from the warm-container cache"""
+    return secret_provider.key_ring()
+
+# Compiled decoders by secret and issuer, one per key in use
+_compiled_decoders = {}
+MAX_COMPILED_DECODERS = 1024
+
+def get_decoder(key):
+    """Return a JWT decoder compiled for the given key, checking its issuer if it has one"""
+    decoder = _compiled_decoders.get((key.secret, key.iss))
+    if decoder is None:
+        if len(_compiled_decoders) >= MAX_COMPILED_DECODERS:
+            _compiled_decoders.clear()
+        decoder = jwt.compile_decoder(key.secret, algorithms=['HS256'], issuer=key.iss)
+        _compiled_decoders[(key.secret, key.iss)] = decoder
+    return decoder
+
+def verify_with_key_ring(parsed, claims, key_ring):
+    """Verify with the key the token's kid (or iss, in tenant mode) names, or try each key"""
+    kid = parsed.header.get('kid')
+    iss = claims.get('iss') if kid is None and key_ring.by_issuer else None
+    candidates = key_ring.candidates(kid, iss)
+    if not candidates:
+        raise jwt.InvalidSignatureError('Unknown key ID' if kid is not None else 'Unknown issuer')
+    for key in candidates:
+        try:
+            payload = get_decoder(key)(parsed)
+        except jwt.InvalidSignatureError:
+            continue
+        secret_provider.record_match(key)
+        return payload
+    raise jwt.InvalidSignatureError('Signature verification failed')
+
+def decode_token(parsed, claims, key_ring):
+    """Verify the parsed token, refetching the key-ring once if the secret may have been rotated"""
     try:
-        get_secret_value_response = client.get_secret_value(
-            SecretId=secret_name
-        )
-    except ClientError as e:
-        # For a list of exceptions thrown, see
-        # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
-        raise e
-    else:
-        if 'SecretString' in get_secret_value_response:
-            secret_data = json.loads(get_secret_value_response['SecretString'])
-            return secret_data.get('secret', secret_data.get('JWT_SECRET'))
-        else:
-            raise ValueError("Secret value is not a string")
+        return verify_with_key_ring(parsed, claims, key_ring)
+    except jwt.InvalidSignatureError as e:
+        if not secret_provider.refresh_due():
+            raise UnconfirmedSignatureError(str(e)) from e
+        rotated = secret_provider.refresh_if_rotated()
+        jwt.instrumentation.mark('key_refresh')
+        if not rotated:
+            raise
+        return verify_with_key_ring(parsed, claims, get_key_ring())
+
+def deny_policy(error, resource):
+    """Return the Deny policy for a rejection with a fixed error message"""
+    policy = _deny_policies.get((error, resource))
+    if policy is None:
+        if len(_deny_policies) >= MAX_DENY_POLICIES:
+            _deny_policies.clear()
+        policy = generate_policy('anonymous', 'Deny', resource, {'error': error})
+        _deny_policies[(error, resource)] = policy
+    return policy
+
+def cached_allow_policy(token_key, resource):
+    """Return the cached Allow policy for a verified token, or None"""
+    cached = decision_cache.get(token_key)
+    if cached is None:
+        return None
+
+    principal_id, context, policy = cached
+    if policy['policyDocument']['Statement'][0]['Resource'] != resource:
+        # Same token on another method: no need to verify it again
+        return generate_policy(principal_id, 'Allow', resource, context)
+    return policy
 
 def lambda_handler(event, context):
     """
     Request-based Lambda authorizer for API Gateway.
     Authorizes requests with a valid JWT in the Authorization header.
     """
+    if counter_metrics:
+        counter_metrics.maybe_publish()
+
     headers = event.get('headers', {})
     auth_header = headers.get('Authorization') or headers.get('authorization', '')
-    method_arn = event.get('methodArn', '*')
-    secret = get_secret()
+    resource = policy_resource(event.get('methodArn', '*'), policy_scope)
 
     if not auth_header:
-        return generate_policy('anonymous', 'Deny', method_arn, {'error': 'Missing Authorization header'})
+        return deny_policy('Missing Authorization header', resource)
 
     if auth_header.startswith('Bearer '):
         token = auth_header.split(' ')[1]
     else:
         token = auth_header
 
+    reason = prefilter.check_size(token)
+    if reason is not None:
+        return deny_policy(REJECTION_ERRORS[reason], resource)
+
+    key_ring = get_key_ring()
+    token_key = token_digest(token, key_ring.version)
+    error = prefilter.rejected(token_key)
+    if error is not None:
+        return deny_policy(error, resource)
+    policy = cached_allow_policy(token_key, resource)
+    if policy is not None:
+        return policy
+
     try:
-        payload = jwt.decode(token, secret, algorithms=['HS256'])
+        # One decode trace from parsing to verified claims, with the prefilter
+        # and any key-ring refresh as phases of their own
+        with jwt.trace_decode(token):
+            parsed, claims = prefilter.parse(token)
+            jwt.instrumentation.mark('prefilter')
+            payload = decode_token(parsed, claims, key_ring)
         principal_id = payload.get('sub', 'user')
         context = {k: str(v) for k, v in payload.items()}
-        return generate_policy(principal_id, 'Allow', method_arn, context)
+        policy = generate_policy(principal_id, 'Allow', resource, context)
+        decision_cache.put(token_key, (principal_id, context, policy), payload.get('exp'))
+        return policy
+    except TokenRejected as e:
+        return deny_policy(REJECTION_ERRORS[e.reason], resource)
     except jwt.ExpiredSignatureError:
-        return generate_policy('anonymous', 'Deny', method_arn, {'error': 'Token expired'})
+        prefilter.reject(token_key, 'expired', 'Token expired')
+        return deny_policy('Token expired', resource)
+    except jwt.ImmatureSignatureError as e:
+        # Valid later, so not remembered as rejected
+        prefilter.count('immature')
+        return deny_policy(f'Invalid token: {str(e)}', resource)
+    except UnconfirmedSignatureError as e:
+        # May verify once the key-ring can be refreshed, so not remembered either
+        prefilter.count('unconfirmed')
+        return deny_policy(f'Invalid token: {str(e)}', resource)
     except jwt.InvalidTokenError as e:
-        return generate_policy('anonymous', 'Deny', method_arn, {'error': f'Invalid token: {str(e)}'})
+        error = f'Invalid token: {str(e)}'
+        prefilter.reject(token_key, 'invalid', error)
+        return deny_policy(error, resource)
     except Exception as e:
-        return generate_policy('anonymous', 'Deny', method_arn, {'error': f'Unexpected error: {str(e)}'})
+        return generate_policy('anonymous', 'Deny', resource, {'error': f'Unexpected error: {str(e)}'})
 
 def generate_policy(principal_id, effect, resource, context=None):
     policy = {
@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+
+from phase_metrics import DEFAULT_NAMESPACE, write_emf
+
+DEFAULT_INTERVAL_SECONDS = 60
+
+
+def flatten(stats, prefix=''):
+    """Flatten nested ``stats()`` dicts into metric names, e.g. ``prefilter_rejections_expired``"""
+    flat = {}
+    for key, value in stats.items():
+        name = f'{prefix}_{key}' if prefix else str(key)
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        else:
+            flat[name] = value
+    return flat
+
+
+class CounterMetrics:
+    """Publish the authorizer's cache and prefilter counters as CloudWatch embedded metrics.
+
+    ``sources`` maps a name to a callable returning counters, such as
+    ``DecisionCache.stats``. At most every ``interval`` seconds, ``maybe_publish``
+    writes one Embedded Metric Format record to stdout with each counter's
+    increase since the previous record, so summing a metric in CloudWatch
+    counts events across containers. Sizes are published as they are.
+    """
+
+    def __init__(self, sources, namespace=DEFAULT_NAMESPACE, interval=DEFAULT_INTERVAL_SECONDS, stream=None):
+        self.sources = sources
+        self.namespace = namespace
+        self.interval = interval
+        self.stream = stream or sys.stdout
+        self._published = {}
+        self._next_publish = time.monotonic() + interval
+
+    def counters(self):
+        counters = {}
+        for name, stats in self.sources.items():
+            counters.update(flatten(stats(), name))
+        return counters
+
+    def maybe_publish(self):
+        """Publish the counters if ``interval`` seconds passed since the last record"""
+        if time.monotonic() >= self._next_publish:
+            self.publish()
+
+    def publish(self):
+        self._next_publish = time.monotonic() + self.interval
+        record = {}
+        metrics = []
+        for name, value in self.counters().items():
+            if name.endswith('_size'):
+                record[name] = value
+            else:
+                record[name] = value - self._published.get(name, 0)
+                self._published[name] = value
+            metrics.append({'Name': name, 'Unit': 'Count'})
+        write_emf(self.stream, self.namespace, [], metrics, record)
+
+
+def counter_metrics_from_env(sources):
+    """Build CounterMetrics publishing every AUTHORIZER_METRICS_INTERVAL_SECONDS, or None if that is 0"""
+    interval = int(os.environ.get('AUTHORIZER_METRICS_INTERVAL_SECONDS', DEFAULT_INTERVAL_SECONDS))
+    if interval <= 0:
+        return None
+    return CounterMetrics(sources, os.environ.get('JWT_PHASE_METRICS_NAMESPACE', DEFAULT_NAMESPACE), interval)
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_MAX_TTL_SECONDS = 3600
+
+
+def token_digest(token, secret_version=None):
+    """Digest identifying a token verified against a given secret version.
+
+    Including the secret version means a rotated secret never reuses decisions
+    made with the previous one.
+    """
+    digest = hashlib.sha256()
+    if secret_version:
+        digest.update(secret_version.encode('utf-8'))
+        digest.update(b'\0')
+    digest.update(token.encode('utf-8'))
+    return digest.digest()
+
+
+class DecisionCache:
+    """Bounded LRU of authorizer decisions for already verified tokens.
+
+    Entries are keyed by ``token_digest`` and expire at the token's ``exp``
+    claim, or after ``max_ttl`` seconds, whichever comes first. Only Allow
+    decisions should be stored; a cached entry skips signature and claim
+    verification entirely.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, max_ttl=DEFAULT_MAX_TTL_SECONDS):
+        self.max_size = max_size
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached decision for ``key``, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, decision = entry
+        if time.time() >= expires_at:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return decision
+
+    def put(self, key, decision, exp=None):
+        """Cache ``decision`` until ``exp`` (epoch seconds) or the maximum TTL."""
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.time() + self.max_ttl
+        if isinstance(exp, (int, float)) and exp < expires_at:
+            expires_at = exp
+
+        self._entries[key] = (expires_at, decision)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters and current size of the cache"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self._entries),
+        }
+
+
+def decision_cache_from_env():
+    """Build a DecisionCache configured from the Lambda environment"""
+    return DecisionCache(
+        max_size=int(os.environ.get('DECISION_CACHE_SIZE', DEFAULT_MAX_SIZE)),
+        max_ttl=int(os.environ.get('DECISION_CACHE_MAX_TTL_SECONDS', DEFAULT_MAX_TTL_SECONDS)),
+    )
@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import time
+
+import jwt  # PyJWT
+
+DEFAULT_NAMESPACE = 'EntrixAuthorizer'
+
+
+class PhaseMetrics:
+    """Publish per-phase JWT decode timings as CloudWatch embedded metrics.
+
+    Registered as a PyJWT decode hook, it writes one Embedded Metric Format
+    record per decode to stdout, which Lambda ships to CloudWatch Logs where
+    the metrics are extracted. Timings are in microseconds with the algorithm
+    as dimension, so a p99 regression can be attributed to a single phase.
+    """
+
+    def __init__(self, namespace=DEFAULT_NAMESPACE, stream=None):
+        self.namespace = namespace
+        self.stream = stream or sys.stdout
+
+    def __call__(self, trace):
+        record = {
+            'Algorithm': trace.algorithm or 'none',
+            'TokenSize': trace.token_size,
+            'DecodeTime': round(trace.total * 1e6, 1),
+        }
+        metrics = [
+            {'Name': 'DecodeTime', 'Unit': 'Microseconds'},
+            {'Name': 'TokenSize', 'Unit': 'Bytes'},
+        ]
+        for phase, seconds in trace.phases.items():
+            name = f'{phase}_time'
+            record[name] = round(seconds * 1e6, 1)
+            metrics.append({'Name': name, 'Unit': 'Microseconds'})
+        for cache, hit in trace.cache.items():
+            name = f'{cache}_cache_hit'
+            record[name] = int(hit)
+            metrics.append({'Name': name, 'Unit': 'Count'})
+        if trace.error is not None:
+            record['Error'] = type(trace.error).__name__
+
+        write_emf(self.stream, self.namespace, ['Algorithm'], metrics, record)
+
+
+def write_emf(stream, namespace, dimensions, metrics, record):
+    """Write ``record`` as one Embedded Metric Format line declaring ``metrics``"""
+    record['_aws'] = {
+        'Timestamp': int(time.time() * 1000),
+        'CloudWatchMetrics': [{
+            'Namespace': namespace,
+            'Dimensions': [dimensions],
+            'Metrics': metrics,
+        }],
+    }
+    stream.write(json.dumps(record) + '\n')
+
+
+def phase_metrics_from_env():
+    """Register a PhaseMetrics decode hook if JWT_PHASE_METRICS is enabled"""
+    if os.environ.get('JWT_PHASE_METRICS', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    metrics = PhaseMetrics(os.environ.get('JWT_PHASE_METRICS_NAMESPACE', DEFAULT_NAMESPACE))
+    jwt.add_decode_hook(metrics)
+    return metrics
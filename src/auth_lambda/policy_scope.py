@@ -0,0 +1,45 @@
+import os
+
+# Scopes of the Resource of returned policies, narrowest first
+POLICY_SCOPES = ('method', 'resource', 'stage', 'api')
+DEFAULT_POLICY_SCOPE = 'method'
+
+
+def policy_resource(method_arn, scope=DEFAULT_POLICY_SCOPE):
+    """Return the Resource a policy for ``method_arn`` covers at ``scope``.
+
+    A methodArn is ``arn:aws:execute-api:<region>:<account>:<api-id>/<stage>/<verb>/<path>``.
+    The scopes cover:
+
+    - ``method``: only ``method_arn`` itself
+    - ``resource``: every verb on the same path, ``<api-id>/<stage>/*/<path>``
+    - ``stage``: every method of the stage, ``<api-id>/<stage>/*``
+    - ``api``: every method of every stage, ``<api-id>/*``
+
+    API Gateway caches an authorizer's policy by token, so a policy covering
+    more than one method lets requests to the other methods skip the
+    authorizer while the cached result lives. An ARN that is not an
+    execute-api methodArn is returned unchanged.
+    """
+    if scope == 'method':
+        return method_arn
+    prefix, sep, path = method_arn.partition('/')
+    fields = prefix.split(':')
+    if not sep or len(fields) != 6 or fields[0] != 'arn' or fields[2] != 'execute-api':
+        return method_arn
+
+    # <stage>, <verb>, <path>
+    parts = path.split('/', 2)
+    if scope == 'api' or not parts[0]:
+        return f'{prefix}/*'
+    if scope == 'stage' or len(parts) < 3:
+        return f'{prefix}/{parts[0]}/*'
+    return f'{prefix}/{parts[0]}/*/{parts[2]}'
+
+
+def policy_scope_from_env():
+    """Return the policy scope selected by POLICY_SCOPE, ``method`` by default"""
+    scope = os.environ.get('POLICY_SCOPE', DEFAULT_POLICY_SCOPE).lower()
+    if scope not in POLICY_SCOPES:
+        raise ValueError(f"POLICY_SCOPE must be one of {', '.join(POLICY_SCOPES)}, not {scope!r}")
+    return scope
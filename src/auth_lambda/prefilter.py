@@ -0,0 +1,152 @@
+import json
+import os
+import re
+import time
+import zlib
+
+import jwt  # PyJWT
+from decision_cache import DecisionCache
+
+DEFAULT_MAX_TOKEN_BYTES = 4096
+DEFAULT_NEGATIVE_CACHE_SIZE = 1024
+DEFAULT_NEGATIVE_CACHE_TTL_SECONDS = 60
+# Largest payload a "zip": "DEF" token may inflate to, as in PyJWT
+DEFAULT_MAX_DECOMPRESSED_BYTES = 256 * 1024
+
+# header.payload.signature, each segment unpadded base64url
+COMPACT_TOKEN = re.compile(r'[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+')
+
+# Deny context error of each prefilter rejection reason
+REJECTION_ERRORS = {
+    'oversized': 'Invalid token: Token too large',
+    'malformed': 'Invalid token: Malformed token',
+    'expired': 'Token expired',
+}
+
+
+def payload_claims(payload, zip_alg=None, max_decompressed_bytes=DEFAULT_MAX_DECOMPRESSED_BYTES):
+    """Claims of a payload not verified yet, inflating a "zip": "DEF" payload first.
+
+    Raises ValueError if the payload is not a JSON object, or is compressed
+    with another algorithm, corrupt or inflates past ``max_decompressed_bytes``.
+    """
+    if zip_alg is not None:
+        if zip_alg != 'DEF':
+            raise ValueError(f"Unsupported zip header value: {zip_alg}")
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        try:
+            # At most one byte past the limit, so a compression bomb is not expanded
+            payload = decompressor.decompress(payload, max_decompressed_bytes + 1)
+        except zlib.error as e:
+            raise ValueError(f"Invalid compressed payload: {e}") from e
+        if len(payload) > max_decompressed_bytes or not decompressor.eof:
+            raise ValueError("Invalid compressed payload")
+    claims = json.loads(payload)
+    if not isinstance(claims, dict):
+        raise ValueError("Payload is not a JSON object")
+    return claims
+
+
+class TokenRejected(Exception):
+    """A token the prefilter rejected, with the reason"""
+
+    def __init__(self, reason):
+        super().__init__(REJECTION_ERRORS[reason])
+        self.reason = reason
+
+
+class TokenPrefilter:
+    """Reject tokens that cannot verify before any crypto runs.
+
+    ``check_size`` caps the token length before it is hashed, and ``parse``
+    rejects a token that is not three base64url segments, whose header or
+    payload is not a JSON object, or whose ``exp`` has passed. A payload
+    compressed with ``"zip": "DEF"`` is inflated, up to
+    ``max_decompressed_bytes``, before its ``exp`` is read. ``parse`` returns
+    the ``ParsedToken`` and its claims, so the token is not parsed again to
+    verify it. Tokens rejected after verification are remembered by
+    ``token_digest`` in a small negative cache for ``negative_cache_ttl``
+    seconds, so a replayed bad token is denied without being verified again.
+
+    ``rejections`` counts rejected tokens per reason.
+    """
+
+    def __init__(
+        self,
+        max_token_bytes=DEFAULT_MAX_TOKEN_BYTES,
+        negative_cache_size=DEFAULT_NEGATIVE_CACHE_SIZE,
+        negative_cache_ttl=DEFAULT_NEGATIVE_CACHE_TTL_SECONDS,
+        max_decompressed_bytes=DEFAULT_MAX_DECOMPRESSED_BYTES,
+    ):
+        self.max_token_bytes = max_token_bytes
+        self.max_decompressed_bytes = max_decompressed_bytes
+        self.negative_cache = DecisionCache(max_size=negative_cache_size, max_ttl=negative_cache_ttl)
+        self.rejections = {}
+
+    def count(self, reason):
+        self.rejections[reason] = self.rejections.get(reason, 0) + 1
+
+    def check_size(self, token):
+        """Return 'oversized' if the token is longer than the cap, else None"""
+        if len(token) > self.max_token_bytes:
+            self.count('oversized')
+            return 'oversized'
+        return None
+
+    def parse(self, token, now=None):
+        """Return the ParsedToken and unverified claims of a token, or raise TokenRejected"""
+        try:
+            return self._parse(token, time.time() if now is None else now)
+        except TokenRejected as e:
+            self.count(e.reason)
+            raise
+
+    def _parse(self, token, now):
+        if not COMPACT_TOKEN.fullmatch(token):
+            raise TokenRejected('malformed')
+        try:
+            parsed = jwt.parse_token(token)
+            claims = payload_claims(parsed.payload, parsed.header.get('zip'), self.max_decompressed_bytes)
+        except (jwt.DecodeError, ValueError):
+            raise TokenRejected('malformed') from None
+        exp = claims.get('exp')
+        if isinstance(exp, (int, float)) and not isinstance(exp, bool) and exp <= now:
+            raise TokenRejected('expired')
+        return parsed, claims
+
+    def check(self, token, now=None):
+        """Return the reason to reject the token without verifying it, or None"""
+        try:
+            self.parse(token, now)
+        except TokenRejected as e:
+            return e.reason
+        return None
+
+    def rejected(self, key):
+        """Return the error a recently rejected token was denied with, or None"""
+        entry = self.negative_cache.get(key)
+        if entry is None:
+            return None
+        self.count('negative_cache')
+        return entry[1]
+
+    def reject(self, key, reason, error):
+        """Count a token rejected by verification and remember its error"""
+        self.count(reason)
+        self.negative_cache.put(key, (reason, error))
+
+    def stats(self):
+        """Rejections per reason and the negative cache counters"""
+        return {
+            'rejections': dict(self.rejections),
+            'negative_cache': self.negative_cache.stats(),
+        }
+
+
+def prefilter_from_env():
+    """Build a TokenPrefilter configured from the Lambda environment"""
+    return TokenPrefilter(
+        max_token_bytes=int(os.environ.get('JWT_MAX_TOKEN_BYTES', DEFAULT_MAX_TOKEN_BYTES)),
+        negative_cache_size=int(os.environ.get('NEGATIVE_CACHE_SIZE', DEFAULT_NEGATIVE_CACHE_SIZE)),
+        negative_cache_ttl=int(os.environ.get('NEGATIVE_CACHE_TTL_SECONDS', DEFAULT_NEGATIVE_CACHE_TTL_SECONDS)),
+    )
@@ -0,0 +1,263 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger()
+
+DEFAULT_TTL_SECONDS = 300
+DEFAULT_REFRESH_AHEAD_SECONDS = 60
+DEFAULT_MIN_REFRESH_INTERVAL_SECONDS = 10
+# Secret versions kept in the key-ring, in the order kid-less tokens try them
+DEFAULT_VERSION_STAGES = ('AWSCURRENT', 'AWSPREVIOUS')
+
+# One version of the JWT secret. ``kid`` is the secret's own "kid" field if it
+# has one, else its Secrets Manager VersionId. ``iss``, if set, is the only
+# issuer tokens verified with the key may claim.
+SigningKey = namedtuple('SigningKey', ['kid', 'version', 'stage', 'secret', 'iss'], defaults=(None,))
+
+
+class KeyRing:
+    """Versions of the JWT secret indexed by ``kid``.
+
+    Keys are in version stage order, so ``current`` (the first) is the
+    AWSCURRENT version and kid-less tokens try the newest key first.
+    """
+
+    # Keys are not selected by the token's iss claim
+    by_issuer = False
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self._by_kid = {}
+        for key in self.keys:
+            self._by_kid.setdefault(key.kid, key)
+
+    @property
+    def current(self):
+        return self.keys[0]
+
+    @property
+    def version(self):
+        """VersionId of the current key"""
+        return self.current.version
+
+    def candidates(self, kid=None, iss=None):
+        """Keys to verify a token with: the one its kid names, or all of them without a kid"""
+        if kid is None:
+            return self.keys
+        key = self._by_kid.get(kid) if isinstance(kid, str) else None
+        return (key,) if key is not None else ()
+
+    def versions(self):
+        return tuple(key.version for key in self.keys)
+
+
+class SecretProvider:
+    """Serve the JWT secret from memory of a warm Lambda container.
+
+    The secret is fetched from AWS Secrets Manager once and served from memory
+    for ``ttl`` seconds. When less than ``refresh_ahead`` seconds are left, a
+    background thread refreshes it while callers keep getting the cached value.
+    Only an expired secret makes a caller wait for Secrets Manager.
+
+    The versions in ``version_stages`` (AWSCURRENT and AWSPREVIOUS by default)
+    are kept together in a ``KeyRing``, so tokens signed with the previous
+    secret keep verifying during a rotation. A refresh describes the secret
+    and fetches only the versions it does not already hold, so a rotation
+    costs one extra GetSecretValue call for the new version.
+
+    A signature failure or an unknown ``kid`` can mean the secret was rotated,
+    so ``refresh_if_rotated`` forces a refresh, rate limited by
+    ``min_refresh_interval`` so a stream of forged tokens cannot turn into a
+    stream of Secrets Manager calls.
+
+    With ``use_extension`` the secret is read through the AWS Parameters and
+    Secrets Lambda Extension on localhost, falling back to the Secrets
+    Manager API if the extension is not running. boto3 is only imported
+    when the Secrets Manager API is used.
+    """
+
+    def __init__(
+        self,
+        secret_id,
+        ttl=DEFAULT_TTL_SECONDS,
+        refresh_ahead=DEFAULT_REFRESH_AHEAD_SECONDS,
+        min_refresh_interval=DEFAULT_MIN_REFRESH_INTERVAL_SECONDS,
+        version_stages=DEFAULT_VERSION_STAGES,
+        region_name=None,
+        endpoint_url=None,
+        use_extension=False,
+        client=None,
+    ):
+        self.secret_id = secret_id
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.min_refresh_interval = min_refresh_interval
+        self.version_stages = tuple(version_stages)
+        self.region_name = region_name or os.environ.get('AWS_REGION', 'eu-west-1')
+        self.endpoint_url = endpoint_url
+        self.use_extension = use_extension
+        self._client = client
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._key_ring = None
+        self._fetched_at = 0.0
+        # Last refresh forced by refresh_if_rotated, whether it succeeded or not
+        self._rotation_checked_at = 0.0
+        # Verified tokens per version stage of the key that matched
+        self.matches = {}
+
+    @property
+    def version(self):
+        """Secrets Manager VersionId of the cached current secret"""
+        return self._key_ring.version if self._key_ring is not None else None
+
+    def _boto3_client(self):
+        import boto3
+
+        session = boto3.session.Session()
+        return session.client(
+            service_name='secretsmanager',
+            region_name=self.region_name,
+            endpoint_url=self.endpoint_url,
+        )
+
+    def _get_client(self):
+        if self._client is None:
+            if self.use_extension:
+                from secrets_extension import SecretsExtensionClient
+
+                self._client = SecretsExtensionClient(self._boto3_client, self.version_stages)
+            else:
+                self._client = self._boto3_client()
+        return self._client
+
+    def _fetch_version(self, version, stage):
+        """Retrieve one version of the JWT secret from AWS Secrets Manager"""
+        response = self._get_client().get_secret_value(SecretId=self.secret_id, VersionId=version)
+        if 'SecretString' not in response:
+            raise ValueError("Secret value is not a string")
+
+        secret_data = json.loads(response['SecretString'])
+        secret = secret_data.get('secret', secret_data.get('JWT_SECRET'))
+        return SigningKey(secret_data.get('kid') or version, version, stage, secret)
+
+    def _fetch(self):
+        """Build a KeyRing of the configured version stages, reusing versions already held"""
+        if not self.secret_id:
+            raise ValueError("JWT_SECRET_ARN environment variable is not set")
+
+        description = self._get_client().describe_secret(SecretId=self.secret_id)
+        stage_versions = {}
+        for version, stages in description.get('VersionIdsToStages', {}).items():
+            for stage in stages:
+                stage_versions[stage] = version
+
+        held = {key.version: key for key in self._key_ring.keys} if self._key_ring else {}
+        keys = []
+        for stage in self.version_stages:
+            version = stage_versions.get(stage)
+            if version is None or any(key.version == version for key in keys):
+                continue
+            key = held.get(version)
+            if key is None:
+                try:
+                    key = self._fetch_version(version, stage)
+                except Exception as e:
+                    if not keys:
+                        raise
+                    # An older version is only a fallback; verify without it
+                    logger.warning("Could not fetch JWT secret version %s (%s): %s", version, stage, e)
+                    continue
+            keys.append(key._replace(stage=stage))
+
+        if not keys or keys[0].stage != self.version_stages[0]:
+            raise ValueError(f"Secret has no {self.version_stages[0]} version")
+        return KeyRing(keys)
+
+    def refresh(self):
+        """Fetch the key-ring now and return True if its versions changed."""
+        key_ring = self._fetch()
+        with self._lock:
+            previous = self._key_ring
+            changed = previous is not None and key_ring.versions() != previous.versions()
+            self._key_ring = key_ring
+            self._fetched_at = time.monotonic()
+        if changed:
+            logger.info("JWT secret changed, now at version %s", key_ring.version)
+        return changed
+
+    def refresh_due(self):
+        """Return True if ``refresh_if_rotated`` would fetch now instead of being rate limited.
+
+        The interval runs from the last fetch or forced refresh attempt, so a
+        Secrets Manager outage is not retried for every bad token.
+        """
+        last = max(self._fetched_at, self._rotation_checked_at)
+        return time.monotonic() - last >= self.min_refresh_interval
+
+    def refresh_if_rotated(self):
+        """Refresh after a signature failure; return True if the secret changed."""
+        if not self.refresh_due():
+            return False
+        self._rotation_checked_at = time.monotonic()
+        return self.refresh()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("Background refresh of JWT secret failed: %s", e)
+        finally:
+            self._refreshing = False
+
+    def _start_background_refresh(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def key_ring(self):
+        """Return the cached key-ring, fetching or refreshing it as needed."""
+        age = time.monotonic() - self._fetched_at
+        if self._key_ring is None or age >= self.ttl:
+            self.refresh()
+        elif age >= self.ttl - self.refresh_ahead:
+            self._start_background_refresh()
+        return self._key_ring
+
+    def get(self):
+        """Return the cached current secret, fetching or refreshing it as needed."""
+        return self.key_ring().current.secret
+
+    def record_match(self, key):
+        """Count a token verified with ``key``"""
+        self.matches[key.stage] = self.matches.get(key.stage, 0) + 1
+
+
+def refresh_settings_from_env():
+    """Cache, refresh and endpoint settings shared by the secret providers"""
+    return {
+        'ttl': int(os.environ.get('JWT_SECRET_TTL_SECONDS', DEFAULT_TTL_SECONDS)),
+        'refresh_ahead': int(os.environ.get(
+            'JWT_SECRET_REFRESH_AHEAD_SECONDS', DEFAULT_REFRESH_AHEAD_SECONDS)),
+        'min_refresh_interval': int(os.environ.get(
+            'JWT_SECRET_MIN_REFRESH_SECONDS', DEFAULT_MIN_REFRESH_INTERVAL_SECONDS)),
+        # A local stand-in for Secrets Manager, e.g. http://127.0.0.1:4566
+        'endpoint_url': os.environ.get('JWT_SECRETS_ENDPOINT_URL') or None,
+        'use_extension': os.environ.get('JWT_SECRETS_EXTENSION', '').lower() in ('1', 'true', 'yes'),
+    }
+
+
+def secret_provider_from_env():
+    """Build a SecretProvider configured from the Lambda environment"""
+    return SecretProvider(
+        secret_id=os.environ.get('JWT_SECRET_ARN'),
+        version_stages=[stage.strip() for stage in os.environ.get(
+            'JWT_SECRET_VERSION_STAGES', ','.join(DEFAULT_VERSION_STAGES)).split(',') if stage.strip()],
+        **refresh_settings_from_env(),
+    )
@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+
+logger = logging.getLogger()
+
+# Port of the AWS Parameters and Secrets Lambda Extension, unless
+# PARAMETERS_SECRETS_EXTENSION_HTTP_PORT overrides it
+DEFAULT_PORT = 2773
+DEFAULT_TIMEOUT_SECONDS = 2
+# Statuses the extension answers with for a secret or version stage that does not exist
+NOT_FOUND_STATUSES = (400, 404)
+
+# The extension is on localhost, never behind an HTTP(S)_PROXY
+_opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+
+class SecretsExtensionError(Exception):
+    """Error response of the secrets extension, with its HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(f"Secrets extension returned HTTP {status}: {message}")
+        self.status = status
+
+
+class SecretsExtensionClient:
+    """Read secrets from the AWS Parameters and Secrets Lambda Extension.
+
+    The extension caches secrets inside the Lambda execution environment and
+    serves them on localhost, so a secret costs a local HTTP request instead
+    of importing boto3 and calling Secrets Manager. The client offers the
+    ``get_secret_value`` and ``describe_secret`` calls of a boto3 Secrets
+    Manager client, so SecretProvider works with either.
+
+    The extension has no DescribeSecret: ``describe_secret`` gets each of
+    ``version_stages`` and keeps the values, so the ``get_secret_value`` by
+    VersionId that follows is answered from memory.
+
+    If the extension cannot be reached, e.g. its layer is not attached, the
+    client logs a warning and sends this and every later call to the boto3
+    client ``fallback`` returns.
+    """
+
+    def __init__(self, fallback, version_stages=('AWSCURRENT',), port=None, timeout=DEFAULT_TIMEOUT_SECONDS):
+        port = port or int(os.environ.get('PARAMETERS_SECRETS_EXTENSION_HTTP_PORT', DEFAULT_PORT))
+        self.url = f"http://localhost:{port}/secretsmanager/get"
+        self.version_stages = tuple(version_stages)
+        self.timeout = timeout
+        self._fallback = fallback
+        self._client = None
+        self._described = {}
+
+    def _get(self, secret_id, version_id=None, version_stage=None):
+        query = {'secretId': secret_id}
+        if version_id:
+            query['versionId'] = version_id
+        elif version_stage:
+            query['versionStage'] = version_stage
+        request = urllib.request.Request(
+            f"{self.url}?{urllib.parse.urlencode(query)}",
+            headers={'X-Aws-Parameters-Secrets-Token': os.environ.get('AWS_SESSION_TOKEN', '')},
+        )
+        try:
+            with _opener.open(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            raise SecretsExtensionError(e.code, e.read().decode('utf-8', 'replace').strip() or e.reason) from e
+
+    def _call(self, operation, **kwargs):
+        """Run ``operation`` against the extension, switching to the fallback client if it is unreachable"""
+        if self._client is None:
+            try:
+                return getattr(self, f'_extension_{operation}')(**kwargs)
+            except SecretsExtensionError:
+                raise
+            except (urllib.error.URLError, OSError) as e:
+                logger.warning("Secrets extension at %s unreachable (%s), using Secrets Manager API", self.url, e)
+                self._client = self._fallback()
+        return getattr(self._client, operation)(**kwargs)
+
+    def _extension_get_secret_value(self, SecretId, VersionId=None, VersionStage=None):
+        value = self._described.get((SecretId, VersionId)) if VersionId else None
+        return value if value is not None else self._get(SecretId, VersionId, VersionStage)
+
+    def _extension_describe_secret(self, SecretId):
+        described = {}
+        versions_to_stages = {}
+        value = None
+        for i, stage in enumerate(self.version_stages):
+            try:
+                value = self._get(SecretId, version_stage=stage)
+            except SecretsExtensionError as e:
+                # Only the first stage must exist; AWSPREVIOUS is missing until the first rotation
+                if i == 0 or e.status not in NOT_FOUND_STATUSES:
+                    raise
+                continue
+            versions_to_stages.setdefault(value['VersionId'], []).append(stage)
+            described[(SecretId, value['VersionId'])] = value
+        self._described = described
+        return {'ARN': value.get('ARN'), 'Name': value.get('Name'), 'VersionIdsToStages': versions_to_stages}
+
+    def get_secret_value(self, SecretId, **kwargs):
+        return self._call('get_secret_value', SecretId=SecretId, **kwargs)
+
+    def describe_secret(self, SecretId):
+        return self._call('describe_secret', SecretId=SecretId)
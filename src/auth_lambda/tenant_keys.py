@@ -0,0 +1,221 @@
+import hashlib
+import json
+import logging
+import os
+
+from secret_provider import SecretProvider, SigningKey, refresh_settings_from_env
+
+logger = logging.getLogger()
+
+# Most secrets BatchGetSecretValue and ListSecrets return per call
+BATCH_SIZE = 20
+LIST_PAGE_SIZE = 100
+
+
+class TenantKeyMap:
+    """Signing keys of many tenants, indexed by ``kid`` and by ``iss``.
+
+    ``entries`` maps a secret ARN to the VersionId it was loaded at and the
+    keys it holds, so a refresh can keep the keys of unchanged secrets.
+    """
+
+    # Tokens without a kid are matched to keys by their iss claim
+    by_issuer = True
+
+    def __init__(self, entries):
+        self.entries = entries
+        self._by_kid = {}
+        self._by_iss = {}
+        digest = hashlib.sha256()
+        for arn in sorted(entries):
+            version, keys = entries[arn]
+            digest.update(f'{arn}\0{version}\0'.encode('utf-8'))
+            for key in keys:
+                if self._by_kid.setdefault(key.kid, key) is not key:
+                    logger.warning("Duplicate tenant key ID %s in %s, ignored", key.kid, arn)
+                    continue
+                if key.iss is not None:
+                    self._by_iss.setdefault(key.iss, []).append(key)
+        self._by_iss = {iss: tuple(keys) for iss, keys in self._by_iss.items()}
+        self.version = digest.hexdigest()[:32]
+
+    def __len__(self):
+        return len(self._by_kid)
+
+    def candidates(self, kid=None, iss=None):
+        """Keys to verify a token with: the one its kid names, else those of its issuer"""
+        if kid is not None:
+            key = self._by_kid.get(kid) if isinstance(kid, str) else None
+            return (key,) if key is not None else ()
+        if isinstance(iss, str):
+            return self._by_iss.get(iss, ())
+        return ()
+
+    def versions(self):
+        return tuple(sorted((arn, version) for arn, (version, _) in self.entries.items()))
+
+
+def keys_from_secret(secret_string, version, default_kid):
+    """Parse the keys of a tenant secret.
+
+    A secret holds one key, ``{"secret": ..., "kid": ..., "iss": ...}``, or
+    several, ``{"keys": [{"secret": ..., "kid": ..., "iss": ...}, ...]}``.
+    A key without a kid gets ``default_kid``; ``iss`` is optional.
+    """
+    data = json.loads(secret_string)
+    if 'keys' in data:
+        items = data['keys']
+        if len(items) > 1 and any(not item.get('kid') for item in items):
+            raise ValueError("Every key of a multi-key secret needs a kid")
+    else:
+        items = [data]
+    keys = []
+    for item in items:
+        secret = item.get('secret', item.get('JWT_SECRET'))
+        if not secret:
+            raise ValueError("Key has no secret")
+        keys.append(SigningKey(item.get('kid') or default_kid, version, 'AWSCURRENT', secret,
+                               item.get('iss', data.get('iss'))))
+    return tuple(keys)
+
+
+class TenantKeyProvider(SecretProvider):
+    """Serve the signing keys of all tenants from memory of a warm Lambda container.
+
+    Keys come from every secret whose name starts with ``secret_prefix``, one
+    secret per tenant, or from the single secret ``secret_id`` holding a
+    ``keys`` list. The first load fetches all tenant secrets with batched
+    BatchGetSecretValue calls of up to 20 secrets each. Later refreshes list
+    the secrets and fetch only those whose current version changed, keeping
+    the keys of the others, so onboarding or rotating one tenant costs one
+    ListSecrets and one BatchGetSecretValue call. A secret that cannot be
+    fetched or parsed is logged and skipped (or keeps its previous keys)
+    rather than failing every tenant.
+
+    Caching, refresh-ahead and the rate-limited refresh on an unknown kid
+    work as in ``SecretProvider``.
+    """
+
+    def __init__(self, secret_prefix=None, secret_id=None, **kwargs):
+        if not secret_prefix and not secret_id:
+            raise ValueError("Either secret_prefix or secret_id is required")
+        super().__init__(secret_id, version_stages=('AWSCURRENT',), **kwargs)
+        self.secret_prefix = secret_prefix
+        if secret_prefix and self.use_extension:
+            # The secrets extension cannot list or batch-get secrets
+            logger.info("Tenant secrets under a prefix are read with the Secrets Manager API")
+            self.use_extension = False
+
+    def _default_kid(self, name):
+        if self.secret_prefix and name.startswith(self.secret_prefix):
+            return name[len(self.secret_prefix):]
+        return name
+
+    def _parse(self, value, held):
+        """Return the (version, keys) entry of a fetched secret.
+
+        A malformed secret keeps the keys it was held with, or has none, in
+        which case its version is remembered so it is not fetched again
+        until it changes.
+        """
+        try:
+            keys = keys_from_secret(value['SecretString'], value['VersionId'],
+                                    self._default_kid(value['Name']))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Skipping malformed tenant secret %s: %s", value.get('Name'), e)
+            return held.get(value['ARN'], (value['VersionId'], ()))
+        return value['VersionId'], keys
+
+    def _batch_get(self, **kwargs):
+        """Yield the secret values of one BatchGetSecretValue request, following pages"""
+        client = self._get_client()
+        while True:
+            response = client.batch_get_secret_value(**kwargs)
+            for error in response.get('Errors', []):
+                logger.warning("Could not fetch tenant secret %s: %s",
+                               error.get('SecretId'), error.get('Message', error.get('ErrorCode')))
+            yield from response.get('SecretValues', [])
+            if not response.get('NextToken'):
+                return
+            kwargs['NextToken'] = response['NextToken']
+
+    def _current_versions(self):
+        """Map the ARN of every tenant secret to its AWSCURRENT VersionId"""
+        client = self._get_client()
+        kwargs = {'Filters': [{'Key': 'name', 'Values': [self.secret_prefix]}], 'MaxResults': LIST_PAGE_SIZE}
+        current = {}
+        while True:
+            response = client.list_secrets(**kwargs)
+            for entry in response.get('SecretList', []):
+                # The name filter is a case-insensitive prefix match
+                if not entry['Name'].startswith(self.secret_prefix):
+                    continue
+                for version, stages in entry.get('SecretVersionsToStages', {}).items():
+                    if 'AWSCURRENT' in stages:
+                        current[entry['ARN']] = version
+            if not response.get('NextToken'):
+                return current
+            kwargs['NextToken'] = response['NextToken']
+
+    def _fetch_prefix(self):
+        held = self._key_ring.entries if self._key_ring is not None else {}
+        entries = {}
+        if not held:
+            values = self._batch_get(Filters=[{'Key': 'name', 'Values': [self.secret_prefix]}],
+                                     MaxResults=BATCH_SIZE)
+        else:
+            current = self._current_versions()
+            changed = []
+            for arn, version in current.items():
+                if arn in held and held[arn][0] == version:
+                    entries[arn] = held[arn]
+                else:
+                    changed.append(arn)
+            values = (value
+                      for start in range(0, len(changed), BATCH_SIZE)
+                      for value in self._batch_get(SecretIdList=changed[start:start + BATCH_SIZE]))
+
+        for value in values:
+            if not value['Name'].startswith(self.secret_prefix):
+                continue
+            entry = self._parse(value, held)
+            entries[value['ARN']] = entry
+        return TenantKeyMap(entries)
+
+    def _fetch_secret(self):
+        held = self._key_ring.entries if self._key_ring is not None else {}
+        client = self._get_client()
+        description = client.describe_secret(SecretId=self.secret_id)
+        arn = description.get('ARN', self.secret_id)
+        version = next((version for version, stages in description.get('VersionIdsToStages', {}).items()
+                        if 'AWSCURRENT' in stages), None)
+        if arn in held and held[arn][0] == version:
+            return self._key_ring
+
+        response = client.get_secret_value(SecretId=self.secret_id, VersionStage='AWSCURRENT')
+        if 'SecretString' not in response:
+            raise ValueError("Secret value is not a string")
+        keys = keys_from_secret(response['SecretString'], response.get('VersionId'), response.get('Name'))
+        return TenantKeyMap({arn: (response.get('VersionId'), keys)})
+
+    def _fetch(self):
+        """Build the TenantKeyMap, reusing the keys of secrets that did not change"""
+        if self.secret_prefix:
+            return self._fetch_prefix()
+        return self._fetch_secret()
+
+    def get(self):
+        raise TypeError("A tenant key map has no single secret; use key_ring().candidates()")
+
+    def record_match(self, key):
+        """Count a token verified with ``key``, by tenant key ID"""
+        self.matches[key.kid] = self.matches.get(key.kid, 0) + 1
+
+
+def tenant_key_provider_from_env():
+    """Build a TenantKeyProvider if tenant key-map mode is configured, else return None"""
+    secret_prefix = os.environ.get('JWT_TENANT_SECRET_PREFIX')
+    secret_id = os.environ.get('JWT_TENANT_KEYS_SECRET_ARN')
+    if not secret_prefix and not secret_id:
+        return None
+    return TenantKeyProvider(secret_prefix=secret_prefix, secret_id=secret_id, **refresh_settings_from_env())
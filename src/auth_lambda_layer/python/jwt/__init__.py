@@ -1,12 +1,6 @@
-from .api_jwk import PyJWK, PyJWKSet
-from .api_jws import (
-    PyJWS,
-    get_algorithm_by_name,
-    get_unverified_header,
-    register_algorithm,
-    unregister_algorithm,
-)
-from .api_jwt import PyJWT, decode, decode_complete, encode
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .exceptions import (
     DecodeError,
     ExpiredSignatureError,
@@ -25,7 +19,81 @@ from .exceptions import (
     PyJWKSetError,
     PyJWTError,
 )
-from .jwks_client import PyJWKClient
+
+if TYPE_CHECKING:
+    from .api_jwk import PyJWK, PyJWKSet
+    from .api_jws import (
+        ParsedToken,
+        PyJWS,
+        get_algorithm_by_name,
+        get_unverified_header,
+        parse_token,
+        register_algorithm,
+        unregister_algorithm,
+    )
+    from .api_jwt import PyJWT, decode, decode_complete, encode, encode_many
+    from .caches import cache_info, clear_caches
+    from .compiled_decoder import CompiledDecoder, compile_decoder
+    from .instrumentation import (
+        DecodeTrace,
+        add_decode_hook,
+        remove_decode_hook,
+        trace_decode,
+    )
+    from .json_backend import get_json_backend, set_json_backend
+    from .jwks_client import PyJWKClient
+    from .jwks_transport import PooledHTTPTransport
+
+# Everything but the exceptions is imported on first access, so that
+# ``import jwt`` does not load the JWKS client (urllib, ssl) or anything else
+# the caller never uses.
+_lazy_exports = {
+    "PyJWK": "api_jwk",
+    "PyJWKSet": "api_jwk",
+    "ParsedToken": "api_jws",
+    "PyJWS": "api_jws",
+    "get_algorithm_by_name": "api_jws",
+    "get_unverified_header": "api_jws",
+    "parse_token": "api_jws",
+    "register_algorithm": "api_jws",
+    "unregister_algorithm": "api_jws",
+    "PyJWT": "api_jwt",
+    "decode": "api_jwt",
+    "decode_complete": "api_jwt",
+    "encode": "api_jwt",
+    "encode_many": "api_jwt",
+    "cache_info": "caches",
+    "clear_caches": "caches",
+    "CompiledDecoder": "compiled_decoder",
+    "compile_decoder": "compiled_decoder",
+    "DecodeTrace": "instrumentation",
+    "add_decode_hook": "instrumentation",
+    "remove_decode_hook": "instrumentation",
+    "trace_decode": "instrumentation",
+    "get_json_backend": "json_backend",
+    "set_json_backend": "json_backend",
+    "PyJWKClient": "jwks_client",
+    "PooledHTTPTransport": "jwks_transport",
+}
+
+# Submodules that importing the package used to load, for code that reaches
+# them as attributes (``jwt.algorithms``) without importing them itself.
+_lazy_submodules = {
+    "algorithms",
+    "api_jwk",
+    "api_jws",
+    "api_jwt",
+    "caches",
+    "compiled_decoder",
+    "instrumentation",
+    "json_backend",
+    "jwk_set_cache",
+    "jwks_client",
+    "jwks_transport",
+    "types",
+    "utils",
+    "warnings",
+}
 
 __version__ = "2.10.1"
 
@@ -46,15 +114,29 @@ __all__ = [
     "PyJWS",
     "PyJWT",
     "PyJWKClient",
+    "PooledHTTPTransport",
     "PyJWK",
     "PyJWKSet",
+    "ParsedToken",
+    "CompiledDecoder",
+    "compile_decoder",
+    "DecodeTrace",
+    "add_decode_hook",
+    "remove_decode_hook",
+    "trace_decode",
+    "cache_info",
+    "clear_caches",
     "decode",
     "decode_complete",
     "encode",
+    "encode_many",
+    "get_json_backend",
     "get_unverified_header",
+    "parse_token",
     "register_algorithm",
     "unregister_algorithm",
     "get_algorithm_by_name",
+    "set_json_backend",
     # Exceptions
     "DecodeError",
     "ExpiredSignatureError",
@@ -73,3 +155,18 @@ __all__ = [
     "PyJWKSetError",
     "PyJWTError",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _lazy_exports:
+        module = importlib.import_module(f".{_lazy_exports[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    if name in _lazy_submodules:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_lazy_exports))
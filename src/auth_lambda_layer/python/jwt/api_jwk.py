@@ -4,7 +4,12 @@ import json
 import time
 from typing import Any
 
-from .algorithms import get_default_algorithms, has_crypto, requires_cryptography
+from .algorithms import (
+    Algorithm,
+    get_default_algorithms,
+    has_crypto,
+    requires_cryptography,
+)
 from .exceptions import (
     InvalidKeyError,
     MissingCryptographyError,
@@ -15,58 +20,78 @@ from .exceptions import (
 from .types import JWKDict
 
 
-class PyJWK:
-    def __init__(self, jwk_data: JWKDict, algorithm: str | None = None) -> None:
-        self._algorithms = get_default_algorithms()
-        self._jwk_data = jwk_data
-
-        kty = self._jwk_data.get("kty", None)
-        if not kty:
-            raise InvalidKeyError(f"kty is not found: {self._jwk_data}")
-
-        if not algorithm and isinstance(self._jwk_data, dict):
-            algorithm = self._jwk_data.get("alg", None)
-
-        if not algorithm:
-            # Determine alg with kty (and crv).
-            crv = self._jwk_data.get("crv", None)
-            if kty == "EC":
-                if crv == "P-256" or not crv:
-                    algorithm = "ES256"
-                elif crv == "P-384":
-                    algorithm = "ES384"
-                elif crv == "P-521":
-                    algorithm = "ES512"
-                elif crv == "secp256k1":
-                    algorithm = "ES256K"
-                else:
-                    raise InvalidKeyError(f"Unsupported crv: {crv}")
-            elif kty == "RSA":
-                algorithm = "RS256"
-            elif kty == "oct":
-                algorithm = "HS256"
-            elif kty == "OKP":
-                if not crv:
-                    raise InvalidKeyError(f"crv is not found: {self._jwk_data}")
-                if crv == "Ed25519":
-                    algorithm = "EdDSA"
-                else:
-                    raise InvalidKeyError(f"Unsupported crv: {crv}")
+_shared_algorithms: dict[str, Algorithm] | None = None
+
+
+def _get_shared_algorithms() -> dict[str, Algorithm]:
+    """
+    Returns one algorithm registry shared by every PyJWK, instead of
+    building all the algorithm objects again for each key. It must not be
+    modified.
+    """
+    global _shared_algorithms
+    if _shared_algorithms is None:
+        _shared_algorithms = get_default_algorithms()
+    return _shared_algorithms
+
+
+def _resolve_algorithm(jwk_data: JWKDict, algorithm: str | None = None) -> str:
+    """
+    Determines the algorithm name for a JWK without deserializing the key.
+    """
+    kty = jwk_data.get("kty", None)
+    if not kty:
+        raise InvalidKeyError(f"kty is not found: {jwk_data}")
+
+    if not algorithm and isinstance(jwk_data, dict):
+        algorithm = jwk_data.get("alg", None)
+
+    if not algorithm:
+        # Determine alg with kty (and crv).
+        crv = jwk_data.get("crv", None)
+        if kty == "EC":
+            if crv == "P-256" or not crv:
+                algorithm = "ES256"
+            elif crv == "P-384":
+                algorithm = "ES384"
+            elif crv == "P-521":
+                algorithm = "ES512"
+            elif crv == "secp256k1":
+                algorithm = "ES256K"
+            else:
+                raise InvalidKeyError(f"Unsupported crv: {crv}")
+        elif kty == "RSA":
+            algorithm = "RS256"
+        elif kty == "oct":
+            algorithm = "HS256"
+        elif kty == "OKP":
+            if not crv:
+                raise InvalidKeyError(f"crv is not found: {jwk_data}")
+            if crv == "Ed25519":
+                algorithm = "EdDSA"
             else:
-                raise InvalidKeyError(f"Unsupported kty: {kty}")
+                raise InvalidKeyError(f"Unsupported crv: {crv}")
+        else:
+            raise InvalidKeyError(f"Unsupported kty: {kty}")
 
-        if not has_crypto and algorithm in requires_cryptography:
-            raise MissingCryptographyError(
-                f"{algorithm} requires 'cryptography' to be installed."
-            )
+    if not has_crypto and algorithm in requires_cryptography:
+        raise MissingCryptographyError(
+            f"{algorithm} requires 'cryptography' to be installed."
+        )
 
-        self.algorithm_name = algorithm
+    if algorithm not in _get_shared_algorithms():
+        raise PyJWKError(f"Unable to find an algorithm for key: {jwk_data}")
 
-        if algorithm in self._algorithms:
-            self.Algorithm = self._algorithms[algorithm]
-        else:
-            raise PyJWKError(f"Unable to find an algorithm for key: {self._jwk_data}")
+    return algorithm
 
+
+class PyJWK:
+    def __init__(self, jwk_data: JWKDict, algorithm: str | None = None) -> None:
+        self._algorithms = _get_shared_algorithms()
+        self._jwk_data = jwk_data
+
+        self.algorithm_name = _resolve_algorithm(self._jwk_data, algorithm)
+        self.Algorithm = self._algorithms[self.algorithm_name]
         self.key = self.Algorithm.from_jwk(self._jwk_data)
 
     @staticmethod
@@ -92,29 +117,89 @@ class PyJWK:
 
 
 class PyJWKSet:
-    def __init__(self, keys: list[JWKDict]) -> None:
-        self.keys = []
+    """
+    A set of JWKs, indexed by kid.
 
+    Keys are only deserialized when first looked up (or when ``keys`` is
+    read), and memoized, so a large set costs about as much as the keys that
+    are actually used. Keys with an unsupported kty, crv or alg are skipped
+    up front; keys whose parameters turn out to be invalid are skipped when
+    they are deserialized. If none of the keys is usable, reading ``keys``
+    raises PyJWKSetError.
+    """
+
+    def __init__(self, keys: list[JWKDict]) -> None:
         if not keys:
             raise PyJWKSetError("The JWK Set did not contain any keys")
 
         if not isinstance(keys, list):
             raise PyJWKSetError("Invalid JWK Set value")
 
+        self._raw_keys: list[tuple[JWKDict, str]] = []
+        self._kid_index: dict[Any, list[int]] = {}
+        self._materialized: dict[int, PyJWK | None] = {}
+        self._keys: list[PyJWK] | None = None
+
         for key in keys:
             try:
-                self.keys.append(PyJWK(key))
+                algorithm = _resolve_algorithm(key)
             except PyJWTError as error:
                 if isinstance(error, MissingCryptographyError):
                     raise error
                 # skip unusable keys
                 continue
 
-        if len(self.keys) == 0:
+            try:
+                self._kid_index.setdefault(key.get("kid"), []).append(
+                    len(self._raw_keys)
+                )
+            except TypeError:
+                # An unhashable kid can never be looked up; the key is
+                # still listed in keys.
+                pass
+            self._raw_keys.append((key, algorithm))
+
+        if len(self._raw_keys) == 0:
             raise PyJWKSetError(
                 "The JWK Set did not contain any usable keys. Perhaps 'cryptography' is not installed?"
             )
 
+    def _materialize(self, index: int) -> PyJWK | None:
+        try:
+            return self._materialized[index]
+        except KeyError:
+            pass
+
+        jwk_data, algorithm = self._raw_keys[index]
+        try:
+            key: PyJWK | None = PyJWK(jwk_data, algorithm)
+        except PyJWTError:
+            key = None
+        self._materialized[index] = key
+        return key
+
+    @property
+    def keys(self) -> list[PyJWK]:
+        if self._keys is None:
+            materialized = (self._materialize(i) for i in range(len(self._raw_keys)))
+            keys = [key for key in materialized if key is not None]
+            if not keys:
+                raise PyJWKSetError("The JWK Set did not contain any usable keys")
+            self._keys = keys
+        return self._keys
+
+    def keys_for_kid(self, kid: str) -> list[PyJWK]:
+        """
+        Returns the usable keys with the given kid, deserializing only those.
+        """
+        try:
+            indexes = self._kid_index.get(kid, ())
+        except TypeError:
+            # kid comes from an untrusted token header and may be unhashable
+            return []
+        keys = (self._materialize(i) for i in indexes)
+        return [key for key in keys if key is not None]
+
     @staticmethod
     def from_dict(obj: dict[str, Any]) -> PyJWKSet:
         keys = obj.get("keys", [])
@@ -126,9 +211,8 @@ class PyJWKSet:
         return PyJWKSet.from_dict(obj)
 
     def __getitem__(self, kid: str) -> PyJWK:
-        for key in self.keys:
-            if key.key_id == kid:
-                return key
+        for key in self.keys_for_kid(kid):
+            return key
         raise KeyError(f"keyset has no key for kid: {kid}")
 
 
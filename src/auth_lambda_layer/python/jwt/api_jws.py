@@ -1,38 +1,66 @@
 from __future__ import annotations
 
 import binascii
+import hmac
 import json
+from binascii import a2b_base64
 import warnings
-from collections.abc import Sequence
-from typing import TYPE_CHECKING, Any
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import chain
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, NamedTuple
 
+from . import instrumentation
 from .algorithms import (
     Algorithm,
+    HMACAlgorithm,
     get_default_algorithms,
     has_crypto,
+    prepare_key_cached,
     requires_cryptography,
 )
 from .api_jwk import PyJWK
+from .caches import LRUCache, register_cache
+from .json_backend import JSONBackend, get_json_backend
 from .exceptions import (
     DecodeError,
     InvalidAlgorithmError,
     InvalidSignatureError,
     InvalidTokenError,
 )
-from .utils import base64url_decode, base64url_encode
+from .utils import base64url_encode, is_bytes_like, iter_chunks, split_token
 from .warnings import RemovedInPyjwt3Warning
 
 if TYPE_CHECKING:
     from .algorithms import AllowedPrivateKeys, AllowedPublicKeys
 
 
+class ParsedToken(NamedTuple):
+    """
+    A compact token split and decoded once, without any verification.
+
+    Anything that takes a token string - ``jwt.decode``,
+    ``get_unverified_header``, ``PyJWKClient.get_signing_key_from_jwt`` -
+    also takes a ``ParsedToken``, so a token that is inspected before it is
+    verified is only parsed once. Create one with :func:`jwt.parse_token`.
+    """
+
+    payload: bytes
+    signing_input: memoryview
+    header: Mapping[str, Any]
+    signature: bytes
+
+
 class PyJWS:
     header_typ = "JWT"
+    # Number of distinct header segments kept parsed and validated
+    header_cache_size = 32
 
     def __init__(
         self,
         algorithms: Sequence[str] | None = None,
         options: dict[str, Any] | None = None,
+        json_backend: JSONBackend | None = None,
     ) -> None:
         self._algorithms = get_default_algorithms()
         self._valid_algs = (
@@ -47,6 +75,9 @@ class PyJWS:
         if options is None:
             options = {}
         self.options = {**self._get_default_options(), **options}
+        self._header_cache = LRUCache(self.header_cache_size)
+        # None follows the module-level backend, see jwt.set_json_backend()
+        self.json_backend = json_backend
 
     @staticmethod
     def _get_default_options() -> dict[str, bool]:
@@ -102,18 +133,19 @@ class PyJWS:
                 ) from e
             raise NotImplementedError("Algorithm not supported") from e
 
-    def encode(
+    def _encode_header(
         self,
-        payload: bytes,
         key: AllowedPrivateKeys | PyJWK | str | bytes,
-        algorithm: str | None = None,
-        headers: dict[str, Any] | None = None,
-        json_encoder: type[json.JSONEncoder] | None = None,
-        is_payload_detached: bool = False,
-        sort_headers: bool = True,
-    ) -> str:
-        segments = []
-
+        algorithm: str | None,
+        headers: dict[str, Any] | None,
+        json_encoder: type[json.JSONEncoder] | None,
+        is_payload_detached: bool,
+        sort_headers: bool,
+    ) -> tuple[str, bytes, bool]:
+        """
+        Returns the algorithm name, the encoded header segment and whether the
+        payload is detached.
+        """
         # declare a new var to narrow the type for type checkers
         if algorithm is None:
             if isinstance(key, PyJWK):
@@ -149,26 +181,72 @@ class PyJWS:
             # True is the standard value for b64, so no need for it
             del header["b64"]
 
-        json_header = json.dumps(
-            header, separators=(",", ":"), cls=json_encoder, sort_keys=sort_headers
-        ).encode()
+        json_header = (self.json_backend or get_json_backend()).dumps(
+            header, sort_keys=sort_headers, json_encoder=json_encoder
+        )
+
+        return algorithm_, base64url_encode(json_header), is_payload_detached
 
-        segments.append(base64url_encode(json_header))
+    def _get_signer(
+        self, algorithm: str, key: AllowedPrivateKeys | PyJWK | str | bytes
+    ) -> Callable[[bytes], bytes]:
+        alg_obj = self.get_algorithm_by_name(algorithm)
+        if isinstance(key, PyJWK):
+            key = key.key
+        prepared_key = prepare_key_cached(alg_obj, key)
 
-        if is_payload_detached:
-            msg_payload = payload
-        else:
-            msg_payload = base64url_encode(payload)
-        segments.append(msg_payload)
+        if type(alg_obj) is HMACAlgorithm:
+            # Key the HMAC once and copy its state for every message.
+            keyed = hmac.new(prepared_key, digestmod=alg_obj.hash_alg)
 
-        # Segments
-        signing_input = b".".join(segments)
+            def sign(msg: bytes) -> bytes:
+                mac = keyed.copy()
+                mac.update(msg)
+                return mac.digest()
+
+            return sign
+
+        return lambda msg: alg_obj.sign(msg, prepared_key)
+
+    def encode(
+        self,
+        payload: bytes | BinaryIO | Iterable[bytes],
+        key: AllowedPrivateKeys | PyJWK | str | bytes,
+        algorithm: str | None = None,
+        headers: dict[str, Any] | None = None,
+        json_encoder: type[json.JSONEncoder] | None = None,
+        is_payload_detached: bool = False,
+        sort_headers: bool = True,
+    ) -> str:
+        segments = []
+
+        algorithm_, header_segment, is_payload_detached = self._encode_header(
+            key, algorithm, headers, json_encoder, is_payload_detached, sort_headers
+        )
+
+        segments.append(header_segment)
 
         alg_obj = self.get_algorithm_by_name(algorithm_)
         if isinstance(key, PyJWK):
             key = key.key
-        key = alg_obj.prepare_key(key)
-        signature = alg_obj.sign(signing_input, key)
+        key = prepare_key_cached(alg_obj, key)
+
+        if is_payload_detached and not is_bytes_like(payload):
+            # A file object or iterable of chunks is hashed as it is read.
+            segments.append(b"")
+            signature = alg_obj.sign_stream(
+                chain((header_segment, b"."), iter_chunks(payload)), key
+            )
+        else:
+            if is_payload_detached:
+                msg_payload = payload
+            else:
+                msg_payload = base64url_encode(payload)
+            segments.append(msg_payload)
+
+            # Segments
+            signing_input = b".".join(segments)
+            signature = alg_obj.sign(signing_input, key)
 
         segments.append(base64url_encode(signature))
 
@@ -179,13 +257,54 @@ class PyJWS:
 
         return encoded_string.decode("utf-8")
 
+    def encode_many(
+        self,
+        payloads: Iterable[bytes],
+        key: AllowedPrivateKeys | PyJWK | str | bytes,
+        algorithm: str | None = None,
+        headers: dict[str, Any] | None = None,
+        json_encoder: type[json.JSONEncoder] | None = None,
+        is_payload_detached: bool = False,
+        sort_headers: bool = True,
+    ) -> Iterator[str]:
+        """
+        Encodes each payload like :meth:`encode` with the same key, algorithm
+        and headers, and yields the tokens lazily.
+
+        The header segment is serialized, and the key prepared, once for the
+        whole batch; errors in either are raised by this call rather than on
+        the first iteration.
+        """
+        algorithm_, header_segment, is_payload_detached = self._encode_header(
+            key, algorithm, headers, json_encoder, is_payload_detached, sort_headers
+        )
+        sign = self._get_signer(algorithm_, key)
+        return self._encode_many(payloads, header_segment, sign, is_payload_detached)
+
+    @staticmethod
+    def _encode_many(
+        payloads: Iterable[bytes],
+        header_segment: bytes,
+        sign: Callable[[bytes], bytes],
+        is_payload_detached: bool,
+    ) -> Iterator[str]:
+        prefix = header_segment + b"."
+        for payload in payloads:
+            if is_payload_detached:
+                signature = base64url_encode(sign(prefix + payload))
+                yield (prefix + b"." + signature).decode("utf-8")
+            else:
+                signing_input = prefix + base64url_encode(payload)
+                signature = base64url_encode(sign(signing_input))
+                yield (signing_input + b"." + signature).decode("utf-8")
+
     def decode_complete(
         self,
-        jwt: str | bytes,
+        jwt: str | bytes | ParsedToken,
         key: AllowedPublicKeys | PyJWK | str | bytes = "",
         algorithms: Sequence[str] | None = None,
         options: dict[str, Any] | None = None,
-        detached_payload: bytes | None = None,
+        detached_payload: bytes | BinaryIO | Iterable[bytes] | None = None,
         **kwargs,
     ) -> dict[str, Any]:
         if kwargs:
@@ -206,32 +325,47 @@ class PyJWS:
                 'It is required that you pass in a value for the "algorithms" argument when calling decode().'
             )
 
-        payload, signing_input, header, signature = self._load(jwt)
-
-        if header.get("b64", True) is False:
-            if detached_payload is None:
-                raise DecodeError(
-                    'It is required that you pass in a value for the "detached_payload" argument to decode a message having the b64 header set to false.'
+        started = instrumentation.start(jwt) if instrumentation.hooks else None
+        try:
+            payload, signing_input, header, signature = self._load(jwt)
+
+            if header.get("b64", True) is False:
+                if detached_payload is None:
+                    raise DecodeError(
+                        'It is required that you pass in a value for the "detached_payload" argument to decode a message having the b64 header set to false.'
+                    )
+                payload = detached_payload
+                header_segment = bytes(signing_input).rsplit(b".", 1)[0]
+                if is_bytes_like(payload):
+                    signing_input = b".".join([header_segment, payload])
+                else:
+                    # A file object or iterable of chunks is hashed as it is read.
+                    signing_input = chain((header_segment, b"."), iter_chunks(payload))
+
+            if verify_signature:
+                self._verify_signature(
+                    signing_input, header, signature, key, algorithms
                 )
-            payload = detached_payload
-            signing_input = b".".join([signing_input.rsplit(b".", 1)[0], payload])
-
-        if verify_signature:
-            self._verify_signature(signing_input, header, signature, key, algorithms)
+        except BaseException as e:
+            if started is not None:
+                instrumentation.finish(started, e)
+            raise
+        if started is not None:
+            instrumentation.finish(started)
 
         return {
             "payload": payload,
-            "header": header,
+            "header": dict(header),
             "signature": signature,
         }
 
     def decode(
         self,
-        jwt: str | bytes,
+        jwt: str | bytes | ParsedToken,
         key: AllowedPublicKeys | PyJWK | str | bytes = "",
         algorithms: Sequence[str] | None = None,
         options: dict[str, Any] | None = None,
-        detached_payload: bytes | None = None,
+        detached_payload: bytes | BinaryIO | Iterable[bytes] | None = None,
         **kwargs,
     ) -> Any:
         if kwargs:
@@ -247,18 +381,36 @@ class PyJWS:
         )
         return decoded["payload"]
 
-    def get_unverified_header(self, jwt: str | bytes) -> dict[str, Any]:
-        """Returns back the JWT header parameters as a dict()
+    def get_unverified_header(self, jwt: str | bytes | ParsedToken) -> dict[str, Any]:
+        """Returns back the JWT header parameters as a dict
 
         Note: The signature is not verified so the header parameters
         should not be fully trusted until signature verification is complete
         """
-        headers = self._load(jwt)[2]
-        self._validate_headers(headers)
+        return dict(self._load(jwt, validate_headers=True).header)
+
+    def parse(self, jwt: str | bytes | ParsedToken) -> ParsedToken:
+        """
+        Splits and base64-decodes a token, and parses its header, without
+        verifying anything, so it can be inspected and then passed to
+        ``decode`` without being parsed again.
+
+        Example usage:
+
+        >>> parsed = jwt.parse_token(token)
+        >>> signing_key = jwks_client.get_signing_key_from_jwt(parsed)
+        >>> payload = jwt.decode(parsed, signing_key, algorithms=["RS256"])
+        """
+        return self._load(jwt)
 
-        return headers
+    def _load(
+        self, jwt: str | bytes | ParsedToken, validate_headers: bool = False
+    ) -> ParsedToken:
+        if isinstance(jwt, ParsedToken):
+            if validate_headers:
+                self._validate_headers(jwt.header)
+            return jwt
 
-    def _load(self, jwt: str | bytes) -> tuple[bytes, bytes, dict[str, Any], bytes]:
         if isinstance(jwt, str):
             jwt = jwt.encode("utf-8")
 
@@ -266,40 +418,72 @@ class PyJWS:
             raise DecodeError(f"Invalid token type. Token must be a {bytes}")
 
         try:
-            signing_input, crypto_segment = jwt.rsplit(b".", 1)
-            header_segment, payload_segment = signing_input.split(b".", 1)
+            signing_input, header_segment, payload_segment, crypto_segment = (
+                split_token(jwt)
+            )
         except ValueError as err:
             raise DecodeError("Not enough segments") from err
 
+        header = self._header_cache.get(header_segment)
+        trace = instrumentation.current() if instrumentation.hooks else None
+        if trace is not None:
+            trace.cache["jws_headers"] = header is not None
+        if header is None:
+            header = self._load_header(header_segment, validate_headers)
+
         try:
-            header_data = base64url_decode(header_segment)
-        except (TypeError, binascii.Error) as err:
+            payload = a2b_base64(payload_segment)
+        except binascii.Error as err:
+            raise DecodeError("Invalid payload padding") from err
+
+        try:
+            signature = a2b_base64(crypto_segment)
+        except binascii.Error as err:
+            raise DecodeError("Invalid crypto padding") from err
+
+        if trace is not None:
+            trace.mark("parse")
+        return ParsedToken(payload, signing_input, header, signature)
+
+    def _load_header(
+        self, header_segment: memoryview, validate_headers: bool
+    ) -> Mapping[str, Any]:
+        try:
+            header_data = a2b_base64(header_segment)
+        except binascii.Error as err:
             raise DecodeError("Invalid header padding") from err
 
         try:
-            header = json.loads(header_data)
+            header = (self.json_backend or get_json_backend()).loads(header_data)
         except ValueError as e:
             raise DecodeError(f"Invalid header string: {e}") from e
 
         if not isinstance(header, dict):
             raise DecodeError("Invalid header string: must be a json object")
 
+        # Only headers that pass validation are cached, so a cache hit never
+        # needs validating again. Decoding does not require valid headers.
+        trace = instrumentation.current() if instrumentation.hooks else None
+        if trace is not None:
+            trace.mark("parse")
         try:
-            payload = base64url_decode(payload_segment)
-        except (TypeError, binascii.Error) as err:
-            raise DecodeError("Invalid payload padding") from err
-
-        try:
-            signature = base64url_decode(crypto_segment)
-        except (TypeError, binascii.Error) as err:
-            raise DecodeError("Invalid crypto padding") from err
-
-        return (payload, signing_input, header, signature)
+            self._validate_headers(header)
+        except InvalidTokenError:
+            if validate_headers:
+                raise
+            return MappingProxyType(header)
+        finally:
+            if trace is not None:
+                trace.mark("header_validation")
+
+        header_view = MappingProxyType(header)
+        self._header_cache.put(bytes(header_segment), header_view)
+        return header_view
 
     def _verify_signature(
         self,
-        signing_input: bytes,
-        header: dict[str, Any],
+        signing_input: bytes | memoryview | Iterable[bytes],
+        header: Mapping[str, Any],
         signature: bytes,
         key: AllowedPublicKeys | PyJWK | str | bytes = "",
         algorithms: Sequence[str] | None = None,
@@ -314,6 +498,10 @@ class PyJWS:
         if not alg or (algorithms is not None and alg not in algorithms):
             raise InvalidAlgorithmError("The specified alg value is not allowed")
 
+        trace = instrumentation.current() if instrumentation.hooks else None
+        if trace is not None:
+            trace.algorithm = alg
+
         if isinstance(key, PyJWK):
             alg_obj = key.Algorithm
             prepared_key = key.key
@@ -322,12 +510,22 @@ class PyJWS:
                 alg_obj = self.get_algorithm_by_name(alg)
             except NotImplementedError as e:
                 raise InvalidAlgorithmError("Algorithm not supported") from e
-            prepared_key = alg_obj.prepare_key(key)
+            prepared_key = prepare_key_cached(alg_obj, key)
+
+        if trace is not None:
+            trace.mark("key_preparation")
+
+        if isinstance(signing_input, (bytes, memoryview)):
+            verified = alg_obj.verify(signing_input, prepared_key, signature)
+        else:
+            verified = alg_obj.verify_stream(signing_input, prepared_key, signature)
 
-        if not alg_obj.verify(signing_input, prepared_key, signature):
+        if trace is not None:
+            trace.mark("verify")
+        if not verified:
             raise InvalidSignatureError("Signature verification failed")
 
-    def _validate_headers(self, headers: dict[str, Any]) -> None:
+    def _validate_headers(self, headers: Mapping[str, Any]) -> None:
         if "kid" in headers:
             self._validate_kid(headers["kid"])
 
@@ -337,10 +535,13 @@ class PyJWS:
 
 
 _jws_global_obj = PyJWS()
+register_cache("jws_headers", _jws_global_obj._header_cache)
 encode = _jws_global_obj.encode
+encode_many = _jws_global_obj.encode_many
 decode_complete = _jws_global_obj.decode_complete
 decode = _jws_global_obj.decode
 register_algorithm = _jws_global_obj.register_algorithm
 unregister_algorithm = _jws_global_obj.unregister_algorithm
 get_algorithm_by_name = _jws_global_obj.get_algorithm_by_name
 get_unverified_header = _jws_global_obj.get_unverified_header
+parse_token = _jws_global_obj.parse
@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import json
 import warnings
+import zlib
 from calendar import timegm
-from collections.abc import Iterable, Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from datetime import datetime, timedelta, timezone
 from typing import TYPE_CHECKING, Any
 
-from . import api_jws
+from . import api_jws, instrumentation
 from .exceptions import (
     DecodeError,
     ExpiredSignatureError,
@@ -19,21 +20,43 @@ from .exceptions import (
     InvalidSubjectError,
     MissingRequiredClaimError,
 )
+from .json_backend import JSONBackend, get_json_backend
+from .utils import is_bytes_like
 from .warnings import RemovedInPyjwt3Warning
 
 if TYPE_CHECKING:
     from .algorithms import AllowedPrivateKeys, AllowedPublicKeys
     from .api_jwk import PyJWK
+    from .api_jws import ParsedToken
+
+# A streamed detached payload can be verified by PyJWS, but not read as claims
+STREAMED_CLAIMS_ERROR = (
+    "The detached payload of a JWT must be bytes to be decoded as claims; "
+    "verify streamed payloads with PyJWS.decode"
+)
 
 
 class PyJWT:
-    def __init__(self, options: dict[str, Any] | None = None) -> None:
+    def __init__(
+        self,
+        options: dict[str, Any] | None = None,
+        json_backend: JSONBackend | None = None,
+    ) -> None:
         if options is None:
             options = {}
         self.options: dict[str, Any] = {**self._get_default_options(), **options}
+        # None follows the module-level backend, see jwt.set_json_backend()
+        self.json_backend = json_backend
+        # Headers are serialized and parsed by the JWS layer, so a backend
+        # given here needs its own PyJWS to apply to them too
+        self._jws = (
+            api_jws._jws_global_obj
+            if json_backend is None
+            else api_jws.PyJWS(json_backend=json_backend)
+        )
 
     @staticmethod
-    def _get_default_options() -> dict[str, bool | list[str]]:
+    def _get_default_options() -> dict[str, bool | int | list[str]]:
         return {
             "verify_signature": True,
             "verify_exp": True,
@@ -44,6 +67,8 @@ class PyJWT:
             "verify_sub": True,
             "verify_jti": True,
             "require": [],
+            # Largest payload a "zip": "DEF" token may inflate to, in bytes
+            "max_decompressed_size": 256 * 1024,
         }
 
     def encode(
@@ -55,27 +80,13 @@ class PyJWT:
         json_encoder: type[json.JSONEncoder] | None = None,
         sort_headers: bool = True,
     ) -> str:
-        # Check that we get a dict
-        if not isinstance(payload, dict):
-            raise TypeError(
-                "Expecting a dict object, as JWT only supports "
-                "JSON objects as payloads."
-            )
-
-        # Payload
-        payload = payload.copy()
-        for time_claim in ["exp", "iat", "nbf"]:
-            # Convert datetime to a intDate value in known time-format claims
-            if isinstance(payload.get(time_claim), datetime):
-                payload[time_claim] = timegm(payload[time_claim].utctimetuple())
-
         json_payload = self._encode_payload(
-            payload,
+            self._prepare_payload(payload),
             headers=headers,
             json_encoder=json_encoder,
         )
 
-        return api_jws.encode(
+        return self._jws.encode(
             json_payload,
             key,
             algorithm,
@@ -84,6 +95,59 @@ class PyJWT:
             sort_headers=sort_headers,
         )
 
+    def encode_many(
+        self,
+        payloads: Iterable[dict[str, Any]],
+        key: AllowedPrivateKeys | PyJWK | str | bytes,
+        algorithm: str | None = None,
+        headers: dict[str, Any] | None = None,
+        json_encoder: type[json.JSONEncoder] | None = None,
+        sort_headers: bool = True,
+    ) -> Iterator[str]:
+        """
+        Encodes each payload like :meth:`encode` with the same key, algorithm
+        and headers, yielding the tokens lazily. The header is serialized and
+        the key prepared only once for the whole batch.
+
+        Example usage:
+
+        >>> tokens = jwt.encode_many(({"sub": str(i)} for i in range(1000)), key)
+        """
+        return self._jws.encode_many(
+            (
+                self._encode_payload(
+                    self._prepare_payload(payload),
+                    headers=headers,
+                    json_encoder=json_encoder,
+                )
+                for payload in payloads
+            ),
+            key,
+            algorithm,
+            headers,
+            json_encoder,
+            sort_headers=sort_headers,
+        )
+
+    @staticmethod
+    def _prepare_payload(payload: dict[str, Any]) -> dict[str, Any]:
+        # Check that we get a dict
+        if not isinstance(payload, dict):
+            raise TypeError(
+                "Expecting a dict object, as JWT only supports "
+                "JSON objects as payloads."
+            )
+
+        # Convert datetime to a intDate value in known time-format claims
+        converted = None
+        for time_claim in ("exp", "iat", "nbf"):
+            value = payload.get(time_claim)
+            if isinstance(value, datetime):
+                if converted is None:
+                    converted = payload.copy()
+                converted[time_claim] = timegm(value.utctimetuple())
+        return payload if converted is None else converted
+
     def _encode_payload(
         self,
         payload: dict[str, Any],
@@ -96,15 +160,46 @@ class PyJWT:
         This method is intended to be overridden by subclasses that need to
         encode the payload in a different way, e.g. compress the payload.
         """
-        return json.dumps(
-            payload,
-            separators=(",", ":"),
-            cls=json_encoder,
-        ).encode("utf-8")
+        json_payload = (self.json_backend or get_json_backend()).dumps(
+            payload, json_encoder=json_encoder
+        )
+        if headers and "zip" in headers:
+            return self._compress_payload(json_payload, headers["zip"])
+        return json_payload
+
+    @staticmethod
+    def _compress_payload(payload: bytes, zip_alg: Any) -> bytes:
+        if zip_alg != "DEF":
+            raise NotImplementedError(f"Unsupported zip header value: {zip_alg}")
+
+        # "DEF" is raw DEFLATE (RFC 1951): no zlib header or checksum
+        compressor = zlib.compressobj(9, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(payload) + compressor.flush()
+
+    def _decompress_payload(
+        self, payload: bytes, zip_alg: Any, max_size: int | None = None
+    ) -> bytes:
+        if zip_alg != "DEF":
+            raise DecodeError(f"Unsupported zip header value: {zip_alg}")
+
+        if max_size is None:
+            max_size = self.options["max_decompressed_size"]
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        try:
+            # Inflate at most one byte past the limit, so a compression bomb
+            # is rejected without being expanded.
+            data = decompressor.decompress(payload, max_size + 1)
+        except zlib.error as e:
+            raise DecodeError(f"Invalid compressed payload: {e}") from e
+        if len(data) > max_size:
+            raise DecodeError(f"Decompressed payload exceeds {max_size} bytes")
+        if not decompressor.eof:
+            raise DecodeError("Invalid compressed payload: truncated data")
+        return data
 
     def decode_complete(
         self,
-        jwt: str | bytes,
+        jwt: str | bytes | ParsedToken,
         key: AllowedPublicKeys | PyJWK | str | bytes = "",
         algorithms: Sequence[str] | None = None,
         options: dict[str, Any] | None = None,
@@ -129,6 +224,10 @@ class PyJWT:
                 RemovedInPyjwt3Warning,
                 stacklevel=2,
             )
+        if detached_payload is not None and not is_bytes_like(detached_payload):
+            # Verifying would consume a stream that is then needed as the claims
+            raise DecodeError(STREAMED_CLAIMS_ERROR)
+
         options = dict(options or {})  # shallow-copy or initialize an empty dict
         options.setdefault("verify_signature", True)
 
@@ -153,39 +252,67 @@ class PyJWT:
             options.setdefault("verify_sub", False)
             options.setdefault("verify_jti", False)
 
-        decoded = api_jws.decode_complete(
-            jwt,
-            key=key,
-            algorithms=algorithms,
-            options=options,
-            detached_payload=detached_payload,
-        )
-
-        payload = self._decode_payload(decoded)
+        started = instrumentation.start(jwt) if instrumentation.hooks else None
+        trace = instrumentation.current() if instrumentation.hooks else None
+        try:
+            decoded = self._jws.decode_complete(
+                jwt,
+                key=key,
+                algorithms=algorithms,
+                options=options,
+                detached_payload=detached_payload,
+            )
 
-        merged_options = {**self.options, **options}
-        self._validate_claims(
-            payload,
-            merged_options,
-            audience=audience,
-            issuer=issuer,
-            leeway=leeway,
-            subject=subject,
-        )
+            # Only pass the per-call limit when given, so subclasses that
+            # override _decode_payload(decoded) keep working
+            if "max_decompressed_size" in options:
+                payload = self._decode_payload(
+                    decoded, max_decompressed_size=options["max_decompressed_size"]
+                )
+            else:
+                payload = self._decode_payload(decoded)
+            if trace is not None:
+                trace.mark("payload")
+
+            merged_options = {**self.options, **options}
+            self._validate_claims(
+                payload,
+                merged_options,
+                audience=audience,
+                issuer=issuer,
+                leeway=leeway,
+                subject=subject,
+            )
+        except BaseException as e:
+            if started is not None:
+                instrumentation.finish(started, e)
+            raise
+        if trace is not None:
+            trace.mark("claims")
+        if started is not None:
+            instrumentation.finish(started)
 
         decoded["payload"] = payload
         return decoded
 
-    def _decode_payload(self, decoded: dict[str, Any]) -> Any:
+    def _decode_payload(
+        self, decoded: dict[str, Any], max_decompressed_size: int | None = None
+    ) -> Any:
         """
         Decode the payload from a JWS dictionary (payload, signature, header).
 
         This method is intended to be overridden by subclasses that need to
         decode the payload in a different way, e.g. decompress compressed
-        payloads.
+        payloads. ``max_decompressed_size`` overrides the
+        ``max_decompressed_size`` option for one call.
         """
+        payload = decoded["payload"]
+        zip_alg = decoded["header"].get("zip")
+        if zip_alg is not None:
+            payload = self._decompress_payload(payload, zip_alg, max_decompressed_size)
+
         try:
-            payload = json.loads(decoded["payload"])
+            payload = (self.json_backend or get_json_backend()).loads(payload)
         except ValueError as e:
             raise DecodeError(f"Invalid payload string: {e}") from e
         if not isinstance(payload, dict):
@@ -194,7 +321,7 @@ class PyJWT:
 
     def decode(
         self,
-        jwt: str | bytes,
+        jwt: str | bytes | ParsedToken,
         key: AllowedPublicKeys | PyJWK | str | bytes = "",
         algorithms: Sequence[str] | None = None,
         options: dict[str, Any] | None = None,
@@ -429,5 +556,6 @@ class PyJWT:
 
 _jwt_global_obj = PyJWT()
 encode = _jwt_global_obj.encode
+encode_many = _jwt_global_obj.encode_many
 decode_complete = _jwt_global_obj.decode_complete
 decode = _jwt_global_obj.decode
@@ -0,0 +1,244 @@
+"""
+Verifies large batches of tokens in parallel.
+
+Reads newline-delimited tokens from a file (memory-mapped) or stdin, shards
+them across a process pool in which every worker builds one
+:class:`~jwt.CompiledDecoder` (so the key is prepared once per worker), and
+writes one ``<line>\\t<verdict>`` line per token, in input order, as results
+come in. Verdicts are ``valid``, ``expired``, ``bad_signature``,
+``malformed`` and ``invalid`` (any other failed claim or algorithm check).
+A token that makes decoding fail in any other way is reported ``malformed``
+rather than stopping the run.
+
+Example usage::
+
+    python -m jwt.bulkverify tokens.txt --algorithms RS256 --key-file pub.pem
+    cat tokens.txt | python -m jwt.bulkverify --key-env JWT_SECRET
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import sys
+from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import IO, Any, Optional
+
+from .compiled_decoder import CompiledDecoder
+from .exceptions import (
+    DecodeError,
+    ExpiredSignatureError,
+    InvalidSignatureError,
+    InvalidTokenError,
+)
+
+VERDICTS = ("valid", "expired", "bad_signature", "malformed", "invalid")
+_VALID, _EXPIRED, _BAD_SIGNATURE, _MALFORMED, _INVALID = range(len(VERDICTS))
+# Code for blank lines, which get no verdict
+_SKIPPED = 255
+
+_decoder: Optional[CompiledDecoder] = None
+_mapped: Optional[mmap.mmap] = None
+
+
+def _init_worker(decoder_kwargs: dict[str, Any], path: Optional[str]) -> None:
+    global _decoder, _mapped
+    _decoder = CompiledDecoder(**decoder_kwargs)
+    if path is not None:
+        with open(path, "rb") as f:
+            _mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _verdict(decoder: CompiledDecoder, token: bytes) -> int:
+    if token.startswith(b"Bearer "):
+        token = token[7:]
+    try:
+        decoder.decode(token)
+    except ExpiredSignatureError:
+        return _EXPIRED
+    except InvalidSignatureError:
+        return _BAD_SIGNATURE
+    except DecodeError:
+        return _MALFORMED
+    except InvalidTokenError:
+        return _INVALID
+    except Exception:
+        # Hostile input must not abort the whole run
+        return _MALFORMED
+    return _VALID
+
+
+def _verify_lines(lines: Iterable[bytes]) -> bytes:
+    decoder = _decoder
+    assert decoder is not None
+    return bytes(
+        _verdict(decoder, line) if line else _SKIPPED
+        for line in (line.strip() for line in lines)
+    )
+
+
+def _verify_range(start: int, end: int) -> bytes:
+    assert _mapped is not None
+    return _verify_lines(_mapped[start:end].split(b"\n"))
+
+
+def _file_shards(path: str, shard_size: int) -> Iterator[tuple[int, int]]:
+    """
+    Splits a file into (start, end) byte ranges of about shard_size bytes
+    that end on a line boundary, not including the newline.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    with open(path, "rb") as f, mmap.mmap(
+        f.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mapped:
+        start = 0
+        while start < size:
+            end = mapped.find(b"\n", min(start + shard_size, size - 1))
+            if end == -1:
+                end = size
+            yield start, end
+            start = end + 1
+
+
+def _line_batches(stream: IO[bytes], batch_size: int) -> Iterator[list[bytes]]:
+    batch = []
+    for line in stream:
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _bounded_map(
+    executor: ProcessPoolExecutor, tasks: Iterable[tuple[Any, ...]], window: int
+) -> Iterator[bytes]:
+    """
+    Like ``executor.map`` but keeps at most ``window`` tasks in flight, so
+    a large input is not read (and queued) all at once.
+    """
+    pending: deque[Future[bytes]] = deque()
+    for task in tasks:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(*task))
+    while pending:
+        yield pending.popleft().result()
+
+
+def verify(
+    decoder_kwargs: dict[str, Any],
+    path: Optional[str] = None,
+    stream: Optional[IO[bytes]] = None,
+    workers: Optional[int] = None,
+    batch_size: int = 2000,
+) -> Iterator[tuple[int, str]]:
+    """
+    Yields ``(line_number, verdict)`` for each non-blank line of the file at
+    ``path`` (or of ``stream``), in input order.
+
+    ``decoder_kwargs`` are the arguments of :class:`~jwt.CompiledDecoder`.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(decoder_kwargs, path),
+    ) as executor:
+        if path is not None:
+            # Workers read their shard from their own mapping of the file, so
+            # only byte offsets and verdict codes cross process boundaries.
+            # Shards are sized assuming tokens of about 200 bytes.
+            tasks: Iterator[tuple[Any, ...]] = (
+                (_verify_range, start, end)
+                for start, end in _file_shards(path, batch_size * 200)
+            )
+        else:
+            assert stream is not None
+            tasks = (
+                (_verify_lines, batch) for batch in _line_batches(stream, batch_size)
+            )
+
+        line_number = 0
+        for codes in _bounded_map(executor, tasks, 4 * workers):
+            for code in codes:
+                line_number += 1
+                if code != _SKIPPED:
+                    yield line_number, VERDICTS[code]
+
+
+def _read_key(args: argparse.Namespace) -> bytes | str:
+    if args.key_file:
+        with open(args.key_file, "rb") as f:
+            return f.read()
+    if args.key_env:
+        try:
+            return os.environ[args.key_env]
+        except KeyError:
+            raise SystemExit(f"{args.key_env} is not set") from None
+    if args.key is not None:
+        return args.key
+    raise SystemExit("One of --key, --key-file or --key-env is required")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m jwt.bulkverify",
+        description="Verify newline-delimited tokens in parallel.",
+    )
+    parser.add_argument(
+        "input", nargs="?", default="-", help="token file, or - for stdin"
+    )
+    parser.add_argument("--key", help="HMAC secret or key (prefer --key-env)")
+    parser.add_argument("--key-file", help="file holding the key, e.g. a PEM")
+    parser.add_argument("--key-env", help="environment variable holding the key")
+    parser.add_argument(
+        "--algorithms", default="HS256", help="comma-separated allowed algorithms"
+    )
+    parser.add_argument("--audience", action="append")
+    parser.add_argument("--issuer")
+    parser.add_argument("--leeway", type=float, default=0)
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: CPUs)"
+    )
+    parser.add_argument("--batch-size", type=int, default=2000)
+    parser.add_argument(
+        "--failures-only", action="store_true", help="only print invalid tokens"
+    )
+    args = parser.parse_args(argv)
+
+    decoder_kwargs = {
+        "key": _read_key(args),
+        "algorithms": args.algorithms.split(","),
+        "audience": args.audience,
+        "issuer": args.issuer,
+        "leeway": args.leeway,
+    }
+    path = None if args.input == "-" else args.input
+
+    counts = dict.fromkeys(VERDICTS, 0)
+    out = sys.stdout
+    for line_number, verdict in verify(
+        decoder_kwargs,
+        path=path,
+        stream=sys.stdin.buffer if path is None else None,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    ):
+        counts[verdict] += 1
+        if not (args.failures_only and verdict == "valid"):
+            out.write(f"{line_number}\t{verdict}\n")
+    out.flush()
+
+    summary = ", ".join(f"{verdict}={count}" for verdict, count in counts.items())
+    print(summary, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+
+class LRUCache:
+    """
+    A small thread-safe least-recently-used mapping with hit and miss counters.
+    """
+
+    def __init__(self, maxsize: int = 128) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def info(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+        }
+
+
+_registry: dict[str, LRUCache] = {}
+
+
+def register_cache(name: str, cache: LRUCache) -> None:
+    """
+    Makes a cache visible through :func:`cache_info` under the given name.
+    """
+    _registry[name] = cache
+
+
+def cache_info() -> dict[str, dict[str, int]]:
+    """
+    Returns the hit/miss counters and size of every library cache.
+
+    Example usage:
+
+    >>> jwt.cache_info()["jws_headers"]["hits"]
+    """
+    return {name: cache.info() for name, cache in _registry.items()}
+
+
+def clear_caches() -> None:
+    """
+    Empties every library cache and resets its counters.
+    """
+    for cache in _registry.values():
+        cache.clear()
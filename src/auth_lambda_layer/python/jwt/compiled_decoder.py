@@ -0,0 +1,309 @@
+from __future__ import annotations
+
+import hmac
+import time
+from collections.abc import Iterable, Sequence
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable
+
+from . import api_jws, api_jwt, instrumentation
+from .algorithms import Algorithm, HMACAlgorithm, prepare_key_cached
+from .api_jwk import PyJWK
+from .api_jws import ParsedToken
+from .exceptions import (
+    DecodeError,
+    InvalidAlgorithmError,
+    InvalidSignatureError,
+)
+from .utils import is_bytes_like
+
+if TYPE_CHECKING:
+    from .algorithms import AllowedPublicKeys
+
+Verifier = Callable[[bytes, bytes], bool]
+ClaimValidator = Callable[[dict[str, Any], float], None]
+
+
+def _hmac_verifier(key: bytes, alg_obj: HMACAlgorithm) -> Verifier:
+    # Keying HMAC hashes the key and sets up the inner/outer pads; do it once
+    # and copy the prepared state for every token instead.
+    keyed = hmac.new(key, digestmod=alg_obj.hash_alg)
+    compare_digest = hmac.compare_digest
+
+    def verify(signing_input: bytes, signature: bytes) -> bool:
+        mac = keyed.copy()
+        mac.update(signing_input)
+        return compare_digest(signature, mac.digest())
+
+    return verify
+
+
+def _timestamp_validator(
+    claim: str, validate: Callable[[dict[str, Any], float, float], None], leeway: float
+) -> ClaimValidator:
+    def validator(payload: dict[str, Any], now: float) -> None:
+        if claim in payload:
+            validate(payload, now, leeway)
+
+    return validator
+
+
+def _algorithm_verifier(prepared_key: Any, alg_obj: Algorithm) -> Verifier:
+    def verify(signing_input: bytes, signature: bytes) -> bool:
+        return alg_obj.verify(signing_input, prepared_key, signature)
+
+    return verify
+
+
+class CompiledDecoder:
+    """
+    Decodes tokens with a fixed key, algorithm list and set of options.
+
+    Everything that ``jwt.decode`` resolves on each call - merged options,
+    algorithm lookup, key preparation and the list of claim checks - is
+    resolved once when the decoder is built, so decoding a token only parses
+    it, verifies the signature and runs the claim validators.
+
+    Instances are callable and behave like ``jwt.decode`` with the arguments
+    given to :func:`compile_decoder`.
+    """
+
+    def __init__(
+        self,
+        key: AllowedPublicKeys | PyJWK | str | bytes = "",
+        algorithms: Sequence[str] | None = None,
+        options: dict[str, Any] | None = None,
+        audience: str | Iterable[str] | None = None,
+        issuer: str | Sequence[str] | None = None,
+        subject: str | None = None,
+        leeway: float | timedelta = 0,
+        jwt_obj: api_jwt.PyJWT | None = None,
+        jws_obj: api_jws.PyJWS | None = None,
+    ) -> None:
+        self._jwt = jwt_obj if jwt_obj is not None else api_jwt._jwt_global_obj
+        self._jws = jws_obj if jws_obj is not None else self._jwt._jws
+
+        options = dict(options or {})
+        options.setdefault("verify_signature", True)
+        if not options["verify_signature"]:
+            for option in (
+                "verify_exp",
+                "verify_nbf",
+                "verify_iat",
+                "verify_aud",
+                "verify_iss",
+                "verify_sub",
+                "verify_jti",
+            ):
+                options.setdefault(option, False)
+
+        self._verify_signature = bool(
+            {**self._jws.options, **options}["verify_signature"]
+        )
+        self.options: dict[str, Any] = {**self._jwt.options, **options}
+        self._max_decompressed_size: int | None = options.get("max_decompressed_size")
+
+        if algorithms is None and isinstance(key, PyJWK):
+            algorithms = [key.algorithm_name]
+
+        if self._verify_signature and not algorithms:
+            raise DecodeError(
+                'It is required that you pass in a value for the "algorithms" argument when calling decode().'
+            )
+
+        self._verifiers: dict[str, Verifier] = {}
+        self._unsupported: set[str] = set()
+        if self._verify_signature:
+            self._compile_verifiers(key, algorithms or [])
+
+        self._validators = self._compile_validators(audience, issuer, subject, leeway)
+
+    def _compile_verifiers(
+        self, key: AllowedPublicKeys | PyJWK | str | bytes, algorithms: Sequence[str]
+    ) -> None:
+        for alg in algorithms:
+            if not alg:
+                continue
+
+            if isinstance(key, PyJWK):
+                alg_obj = key.Algorithm
+                prepared_key = key.key
+            else:
+                try:
+                    alg_obj = self._jws.get_algorithm_by_name(alg)
+                except NotImplementedError:
+                    self._unsupported.add(alg)
+                    continue
+                prepared_key = prepare_key_cached(alg_obj, key)
+
+            if type(alg_obj) is HMACAlgorithm:
+                self._verifiers[alg] = _hmac_verifier(prepared_key, alg_obj)
+            else:
+                self._verifiers[alg] = _algorithm_verifier(prepared_key, alg_obj)
+
+    def _compile_validators(
+        self,
+        audience: str | Iterable[str] | None,
+        issuer: str | Sequence[str] | None,
+        subject: str | None,
+        leeway: float | timedelta,
+    ) -> list[ClaimValidator]:
+        if isinstance(leeway, timedelta):
+            leeway = leeway.total_seconds()
+
+        if audience is not None and not isinstance(audience, (str, Iterable)):
+            raise TypeError("audience must be a string, iterable or None")
+
+        jwt_obj = self._jwt
+        options = self.options
+        validators: list[ClaimValidator] = []
+
+        if options["require"]:
+            validators.append(
+                lambda payload, now: jwt_obj._validate_required_claims(payload, options)
+            )
+
+        # Same order as PyJWT._validate_claims so errors match jwt.decode
+        for claim, validate in (
+            ("iat", jwt_obj._validate_iat),
+            ("nbf", jwt_obj._validate_nbf),
+            ("exp", jwt_obj._validate_exp),
+        ):
+            if options[f"verify_{claim}"]:
+                validators.append(_timestamp_validator(claim, validate, leeway))
+
+        if options["verify_iss"] and issuer is not None:
+            validators.append(
+                lambda payload, now: jwt_obj._validate_iss(payload, issuer)
+            )
+
+        if options["verify_aud"]:
+            strict = options.get("strict_aud", False)
+            validators.append(
+                lambda payload, now: jwt_obj._validate_aud(
+                    payload, audience, strict=strict
+                )
+            )
+
+        if options["verify_sub"]:
+            validators.append(
+                lambda payload, now: jwt_obj._validate_sub(payload, subject)
+            )
+
+        if options["verify_jti"]:
+            validators.append(lambda payload, now: jwt_obj._validate_jti(payload))
+
+        return validators
+
+    def decode_complete(
+        self, jwt: str | bytes | ParsedToken, detached_payload: bytes | None = None
+    ) -> dict[str, Any]:
+        started = instrumentation.start(jwt) if instrumentation.hooks else None
+        try:
+            decoded = self._decode_complete(jwt, detached_payload)
+        except BaseException as e:
+            if started is not None:
+                instrumentation.finish(started, e)
+            raise
+        if started is not None:
+            instrumentation.finish(started)
+        return decoded
+
+    def _decode_complete(
+        self,
+        jwt: str | bytes | ParsedToken,
+        detached_payload: bytes | None,
+    ) -> dict[str, Any]:
+        # Also the trace of a caller's trace_decode block, if one is running
+        trace = instrumentation.current() if instrumentation.hooks else None
+        payload, signing_input, header, signature = self._jws._load(jwt)
+
+        if header.get("b64", True) is False:
+            if detached_payload is None:
+                raise DecodeError(
+                    'It is required that you pass in a value for the "detached_payload" argument to decode a message having the b64 header set to false.'
+                )
+            if not is_bytes_like(detached_payload):
+                raise DecodeError(api_jwt.STREAMED_CLAIMS_ERROR)
+            payload = detached_payload
+            signing_input = b".".join(
+                [bytes(signing_input).rsplit(b".", 1)[0], payload]
+            )
+
+        if self._verify_signature:
+            try:
+                alg = header["alg"]
+            except KeyError:
+                raise InvalidAlgorithmError("Algorithm not specified") from None
+            if not isinstance(alg, str):
+                # An unhashable alg would break the lookups below
+                raise InvalidAlgorithmError("The specified alg value is not allowed")
+
+            verifier = self._verifiers.get(alg)
+            if verifier is None:
+                if alg in self._unsupported:
+                    raise InvalidAlgorithmError("Algorithm not supported")
+                raise InvalidAlgorithmError("The specified alg value is not allowed")
+
+            if trace is not None:
+                trace.algorithm = alg
+            verified = verifier(signing_input, signature)
+            if trace is not None:
+                trace.mark("verify")
+            if not verified:
+                raise InvalidSignatureError("Signature verification failed")
+
+        decoded = {"payload": payload, "header": dict(header), "signature": signature}
+        if self._max_decompressed_size is None:
+            claims = self._jwt._decode_payload(decoded)
+        else:
+            claims = self._jwt._decode_payload(
+                decoded, max_decompressed_size=self._max_decompressed_size
+            )
+        if trace is not None:
+            trace.mark("payload")
+
+        now = time.time()
+        for validate in self._validators:
+            validate(claims, now)
+        if trace is not None:
+            trace.mark("claims")
+
+        decoded["payload"] = claims
+        return decoded
+
+    def decode(
+        self, jwt: str | bytes | ParsedToken, detached_payload: bytes | None = None
+    ) -> Any:
+        return self.decode_complete(jwt, detached_payload)["payload"]
+
+    __call__ = decode
+
+
+def compile_decoder(
+    key: AllowedPublicKeys | PyJWK | str | bytes = "",
+    algorithms: Sequence[str] | None = None,
+    options: dict[str, Any] | None = None,
+    audience: str | Iterable[str] | None = None,
+    issuer: str | Sequence[str] | None = None,
+    subject: str | None = None,
+    leeway: float | timedelta = 0,
+) -> CompiledDecoder:
+    """
+    Returns a :class:`CompiledDecoder` for repeatedly decoding tokens with the
+    same key and settings.
+
+    Example usage:
+
+    >>> decode = jwt.compile_decoder(secret, algorithms=["HS256"])
+    >>> payload = decode(token)
+    """
+    return CompiledDecoder(
+        key,
+        algorithms,
+        options,
+        audience=audience,
+        issuer=issuer,
+        subject=subject,
+        leeway=leeway,
+    )
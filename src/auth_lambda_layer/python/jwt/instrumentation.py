@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Iterator, Optional
+
+# Registered hooks. Instrumented code checks this list before doing any
+# work, so decoding costs one truthiness test per phase when it is empty.
+hooks: list[Callable[[DecodeTrace], None]] = []
+
+_current: ContextVar[Optional[DecodeTrace]] = ContextVar("jwt_trace", default=None)
+
+
+class DecodeTrace:
+    """
+    Timings of one decode, passed to every hook when the decode finishes.
+
+    ``phases`` maps a phase name to the seconds spent in it: ``parse``
+    (splitting and base64/JSON decoding of the token), ``header_validation``,
+    ``key_preparation``, ``verify`` (the signature check), ``payload``
+    (payload JSON decoding) and ``claims`` (claim validation). A phase that
+    did not run is absent. ``cache`` maps a cache name (``jws_headers``,
+    ``prepared_keys``) to whether it was hit. ``error`` is the exception the
+    decode raised, if any. Code that traces its own work around a decode
+    with :func:`trace_decode` can add phases of its own with :func:`mark`.
+    """
+
+    __slots__ = ("algorithm", "token_size", "phases", "cache", "error", "_last")
+
+    def __init__(self, token_size: int) -> None:
+        self.algorithm: Optional[str] = None
+        self.token_size = token_size
+        self.phases: dict[str, float] = {}
+        self.cache: dict[str, bool] = {}
+        self.error: Optional[BaseException] = None
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """Adds the time since the previous mark to ``phase``."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+
+def add_decode_hook(hook: Callable[[DecodeTrace], None]) -> None:
+    """
+    Registers a callable that receives a :class:`DecodeTrace` after every
+    decode. Hooks run synchronously on the decoding thread and should be
+    cheap; exceptions they raise are ignored.
+
+    Example usage:
+
+    >>> jwt.add_decode_hook(lambda trace: print(trace.algorithm, trace.phases))
+    """
+    if hook not in hooks:
+        hooks.append(hook)
+
+
+def remove_decode_hook(hook: Callable[[DecodeTrace], None]) -> None:
+    try:
+        hooks.remove(hook)
+    except ValueError:
+        pass
+
+
+def current() -> Optional[DecodeTrace]:
+    """Returns the trace of the decode in progress, if hooks are registered."""
+    return _current.get() if hooks else None
+
+
+def start(jwt: Any) -> Optional[tuple[DecodeTrace, Token[Optional[DecodeTrace]]]]:
+    """
+    Starts a trace for a decode entry point, unless one is already running
+    (e.g. ``PyJWS.decode_complete`` called by ``PyJWT.decode_complete``).
+    """
+    if _current.get() is not None:
+        return None
+    if isinstance(jwt, tuple):
+        # ParsedToken: signing input plus the "." and the signature
+        token_size = len(jwt.signing_input) + 1 + (len(jwt.signature) * 4 + 2) // 3
+    else:
+        token_size = len(jwt)
+    trace = DecodeTrace(token_size)
+    return trace, _current.set(trace)
+
+
+def finish(
+    started: tuple[DecodeTrace, Token[Optional[DecodeTrace]]],
+    error: Optional[BaseException] = None,
+) -> None:
+    trace, token = started
+    _current.reset(token)
+    trace.error = error
+    for hook in list(hooks):
+        try:
+            hook(trace)
+        except Exception:
+            pass
+
+
+def mark(phase: str) -> None:
+    """Adds the time since the previous mark to ``phase`` of the trace in progress, if any."""
+    trace = current()
+    if trace is not None:
+        trace.mark(phase)
+
+
+@contextmanager
+def trace_decode(jwt: Any) -> Iterator[Optional[DecodeTrace]]:
+    """
+    Traces the ``with`` block as one decode of ``jwt``, so that work done
+    before the decode itself - parsing the token to pick its key, say - is
+    timed in the same trace. Decodes inside the block add their phases to it
+    instead of starting traces of their own, and an exception leaving the
+    block is recorded as the trace's error.
+
+    Example usage:
+
+    >>> with jwt.trace_decode(token):
+    ...     parsed = jwt.parse_token(token)
+    ...     payload = jwt.decode(parsed, keys[parsed.header["kid"]], algorithms=["HS256"])
+    """
+    started = start(jwt) if hooks else None
+    if started is None:
+        yield current()
+        return
+    try:
+        yield started[0]
+    except BaseException as e:
+        finish(started, e)
+        raise
+    finish(started)
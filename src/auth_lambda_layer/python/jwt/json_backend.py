@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from typing import Any
+
+try:
+    import orjson
+
+    has_orjson = True
+except ImportError:
+    # Also an orjson built for another platform, e.g. the Lambda wheel in the
+    # layer directory on a developer machine
+    has_orjson = False
+
+
+class JSONBackend:
+    """
+    Serializes and parses token headers and payloads using the stdlib ``json``.
+
+    Parsing errors are raised as ``ValueError`` so callers can turn them into
+    ``DecodeError`` the same way whichever backend is selected.
+    """
+
+    name = "json"
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+    def dumps(
+        self,
+        obj: Any,
+        sort_keys: bool = False,
+        json_encoder: type[json.JSONEncoder] | None = None,
+    ) -> bytes:
+        return json.dumps(
+            obj, separators=(",", ":"), cls=json_encoder, sort_keys=sort_keys
+        ).encode("utf-8")
+
+
+# Integers orjson serializes; it refuses larger ones and parses them as floats
+_ORJSON_INT_MIN = -(2**63)
+_ORJSON_INT_MAX = 2**64 - 1
+# A run of 19 digits may be an integer beyond 64 bits
+_LONG_NUMBER = re.compile(rb"\d{19}")
+_LONG_NUMBER_STR = re.compile(r"\d{19}")
+
+
+def _orjson_encodes_like_json(obj: Any) -> bool:
+    """
+    Returns whether orjson encodes ``obj`` to the same JSON value as the
+    stdlib: only plain JSON types, string keys, finite floats and integers
+    orjson supports. orjson would silently turn NaN into ``null`` and
+    serialize datetimes, UUIDs, enums and dataclasses the stdlib rejects.
+    """
+    obj_type = type(obj)
+    if obj_type is str or obj_type is bool or obj is None:
+        return True
+    if obj_type is int:
+        return _ORJSON_INT_MIN <= obj <= _ORJSON_INT_MAX
+    if obj_type is float:
+        return math.isfinite(obj)
+    if obj_type is dict:
+        return all(
+            type(key) is str and _orjson_encodes_like_json(value)
+            for key, value in obj.items()
+        )
+    if obj_type is list or obj_type is tuple:
+        return all(_orjson_encodes_like_json(value) for value in obj)
+    return False
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Serializes and parses token headers and payloads using ``orjson``.
+
+    Documents parse to the same values as with the stdlib backend, and values
+    serialize to the same JSON values, but not always to the same bytes:
+    orjson writes non-ASCII characters as UTF-8 where the stdlib escapes them
+    (``ensure_ascii``), so a token with non-ASCII claims or headers is encoded,
+    and signed, differently by each backend. Either backend decodes both.
+
+    Values orjson would encode differently (non-finite floats, integers
+    beyond 64 bits, non-string keys, or types the stdlib rejects such as
+    datetimes and UUIDs) and any custom ``json_encoder`` go through the
+    stdlib. Documents with a number of 19 or more digits, which orjson would
+    parse as a float, and documents orjson refuses (e.g. ``NaN`` literals
+    or lone surrogates) are parsed by the stdlib too.
+    """
+
+    name = "orjson"
+
+    def loads(self, data: bytes | str) -> Any:
+        long_number = _LONG_NUMBER_STR if isinstance(data, str) else _LONG_NUMBER
+        if long_number.search(data) is None:
+            try:
+                return orjson.loads(data)
+            except ValueError:
+                # orjson.JSONDecodeError subclasses ValueError
+                pass
+        return super().loads(data)
+
+    def dumps(
+        self,
+        obj: Any,
+        sort_keys: bool = False,
+        json_encoder: type[json.JSONEncoder] | None = None,
+    ) -> bytes:
+        if json_encoder is None and _orjson_encodes_like_json(obj):
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return super().dumps(obj, sort_keys=sort_keys, json_encoder=json_encoder)
+
+
+_backend: JSONBackend | None = None
+
+
+def _load_backend(name: str) -> JSONBackend:
+    if name == "auto":
+        return OrjsonBackend() if has_orjson else JSONBackend()
+    if name == "json":
+        return JSONBackend()
+    if name == "orjson":
+        if not has_orjson:
+            raise ValueError("The orjson JSON backend requires orjson to be installed.")
+        return OrjsonBackend()
+    raise ValueError(f"Unknown JSON backend: {name}")
+
+
+def get_json_backend() -> JSONBackend:
+    """
+    Returns the JSON backend used when a PyJWS/PyJWT instance has none set.
+
+    Unless :func:`set_json_backend` was called, this is picked from the
+    ``PYJWT_JSON_BACKEND`` environment variable (``auto``, ``json`` or
+    ``orjson``); ``auto`` uses orjson when it is installed.
+    """
+    global _backend
+    if _backend is None:
+        _backend = _load_backend(os.environ.get("PYJWT_JSON_BACKEND", "auto"))
+    return _backend
+
+
+def set_json_backend(backend: str | JSONBackend | None) -> None:
+    """
+    Sets the module-level JSON backend by name or instance. ``None`` goes
+    back to the environment/auto selection.
+
+    Example usage:
+
+    >>> jwt.set_json_backend("json")
+    """
+    global _backend
+    _backend = _load_backend(backend) if isinstance(backend, str) else backend
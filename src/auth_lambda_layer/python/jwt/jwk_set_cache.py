@@ -1,5 +1,8 @@
+import json
+import os
+import tempfile
 import time
-from typing import Optional
+from typing import Any, Optional
 
 from .api_jwk import PyJWKSet, PyJWTSetWithTimestamp
 
@@ -8,10 +11,22 @@ class JWKSetCache:
     def __init__(self, lifespan: int) -> None:
         self.jwk_set_with_timestamp: Optional[PyJWTSetWithTimestamp] = None
         self.lifespan = lifespan
+        self._entry_lifespan: float = lifespan
 
-    def put(self, jwk_set: PyJWKSet) -> None:
+    def put(
+        self, jwk_set: PyJWKSet, max_age: Optional[float] = None, age: float = 0
+    ) -> None:
+        """
+        Caches the key set. ``max_age`` (e.g. from ``Cache-Control``) shortens
+        the lifespan of this entry, and ``age`` is how old the key set already
+        is, for key sets loaded from a persistent cache.
+        """
         if jwk_set is not None:
             self.jwk_set_with_timestamp = PyJWTSetWithTimestamp(jwk_set)
+            self.jwk_set_with_timestamp.timestamp -= age
+            self._entry_lifespan = self.lifespan
+            if max_age is not None and self.lifespan > -1:
+                self._entry_lifespan = min(self.lifespan, max_age)
         else:
             # clear cache
             self.jwk_set_with_timestamp = None
@@ -22,10 +37,110 @@ class JWKSetCache:
 
         return self.jwk_set_with_timestamp.get_jwk_set()
 
+    def get_stale(self, max_stale: float) -> Optional[PyJWKSet]:
+        """
+        Returns the cached key set even if it has expired, as long as it
+        expired no more than max_stale seconds ago.
+        """
+        if self.jwk_set_with_timestamp is None:
+            return None
+
+        if self.lifespan > -1 and (
+            time.monotonic()
+            > self.jwk_set_with_timestamp.get_timestamp()
+            + self._entry_lifespan
+            + max_stale
+        ):
+            return None
+
+        return self.jwk_set_with_timestamp.get_jwk_set()
+
     def is_expired(self) -> bool:
         return (
             self.jwk_set_with_timestamp is not None
             and self.lifespan > -1
             and time.monotonic()
-            > self.jwk_set_with_timestamp.get_timestamp() + self.lifespan
+            > self.jwk_set_with_timestamp.get_timestamp() + self._entry_lifespan
         )
+
+
+class JWKSDocument:
+    """A fetched JWKS document with the HTTP metadata needed to revalidate it."""
+
+    def __init__(
+        self,
+        jwk_set: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        max_age: Optional[float] = None,
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        self.jwk_set = jwk_set
+        self.etag = etag
+        self.last_modified = last_modified
+        self.max_age = max_age
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def age(self) -> float:
+        return max(0.0, time.time() - self.fetched_at)
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class JWKSFileCache:
+    """
+    Persists the last fetched JWKS document to a file (e.g. under ``/tmp``) so
+    that a new process can reuse or revalidate it instead of downloading it.
+
+    The file is replaced atomically; a missing, unreadable or foreign file is
+    treated as an empty cache.
+    """
+
+    def __init__(self, path: str, uri: str) -> None:
+        self.path = path
+        self.uri = uri
+
+    def load(self) -> Optional[JWKSDocument]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                record = json.load(f)
+            if record["uri"] != self.uri:
+                return None
+            return JWKSDocument(
+                record["jwk_set"],
+                etag=record.get("etag"),
+                last_modified=record.get("last_modified"),
+                max_age=record.get("max_age"),
+                fetched_at=float(record["fetched_at"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, document: JWKSDocument) -> None:
+        record = {
+            "uri": self.uri,
+            "jwk_set": document.jwk_set,
+            "etag": document.etag,
+            "last_modified": document.last_modified,
+            "max_age": document.max_age,
+            "fetched_at": document.fetched_at,
+        }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".jwks-")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(record, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # The cache is an optimization; failing to write it is not an error.
+            pass
@@ -1,14 +1,44 @@
 import json
+import threading
+import time
 import urllib.request
 from functools import lru_cache
 from ssl import SSLContext
-from typing import Any, Dict, List, Optional
-from urllib.error import URLError
+from typing import Any, Dict, List, Optional, Union
+from urllib.error import HTTPError, URLError
 
 from .api_jwk import PyJWK, PyJWKSet
-from .api_jwt import decode_complete as decode_token
+from .api_jws import ParsedToken, parse_token
+from .caches import LRUCache
 from .exceptions import PyJWKClientConnectionError, PyJWKClientError
-from .jwk_set_cache import JWKSetCache
+from .jwk_set_cache import JWKSDocument, JWKSetCache, JWKSFileCache
+from .jwks_transport import PooledHTTPTransport
+
+
+def _parse_max_age(cache_control: Optional[str]) -> Optional[float]:
+    if not cache_control:
+        return None
+
+    max_age = None
+    for directive in cache_control.lower().split(","):
+        name, _, value = directive.strip().partition("=")
+        if name in ("no-cache", "no-store"):
+            return 0
+        if name == "max-age":
+            try:
+                max_age = max(0, int(value.strip('"')))
+            except ValueError:
+                pass
+    return max_age
+
+
+class _Fetch:
+    """A JWKS fetch that concurrent callers can wait on instead of repeating."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
 
 
 class PyJWKClient:
@@ -22,6 +52,12 @@ class PyJWKClient:
         headers: Optional[Dict[str, Any]] = None,
         timeout: int = 30,
         ssl_context: Optional[SSLContext] = None,
+        stale_while_revalidate: bool = False,
+        max_stale: int = 3600,
+        cache_path: Optional[str] = None,
+        transport: Union[PooledHTTPTransport, str, None] = None,
+        min_refresh_interval: float = 30,
+        negative_cache_size: int = 256,
     ):
         if headers is None:
             headers = {}
@@ -30,6 +66,39 @@ class PyJWKClient:
         self.headers = headers
         self.timeout = timeout
         self.ssl_context = ssl_context
+        # Serve an expired key set for up to max_stale seconds while a single
+        # background fetch refreshes it, instead of blocking every caller.
+        self.stale_while_revalidate = stale_while_revalidate
+        self.max_stale = max_stale
+        self._fetch_lock = threading.Lock()
+        self._fetch: Optional[_Fetch] = None
+        # The key set built from the last JWKS document, reused for as long
+        # as the same document is served from the cache.
+        self._jwk_set: Optional[tuple[Any, PyJWKSet]] = None
+        # The last fetched document and its validators, used to revalidate
+        # with If-None-Match/If-Modified-Since; kept in cache_path if given.
+        self._document: Optional[JWKSDocument] = None
+        self._file_cache: Optional[JWKSFileCache] = None
+        # "pooled" keeps connections alive between fetches; None uses urllib.
+        if transport == "pooled":
+            transport = PooledHTTPTransport(
+                read_timeout=timeout, ssl_context=ssl_context
+            )
+        elif isinstance(transport, str):
+            raise PyJWKClientError(f'Unknown transport "{transport}"')
+        self.transport: Optional[PooledHTTPTransport] = transport
+        # An unknown kid forces a refresh at most once per min_refresh_interval
+        # seconds; kids that were still missing after such a refresh are
+        # remembered for as long, so tokens with bogus kids are rejected
+        # without any I/O.
+        # suppressed_refreshes counts every unknown kid lookup that did not
+        # refresh, whether rate limited or rejected by missed_kids.
+        self.min_refresh_interval = min_refresh_interval
+        self.missed_kids = LRUCache(maxsize=negative_cache_size)
+        self.forced_refreshes = 0
+        self.suppressed_refreshes = 0
+        self._last_forced_refresh: Optional[float] = None
+        self._refresh_lock = threading.Lock()
 
         if cache_jwk_set:
             # Init jwt set cache with default or given lifespan.
@@ -49,14 +118,66 @@ class PyJWKClient:
                 self.get_signing_key
             )  # type: ignore
 
+        if cache_path:
+            self._file_cache = JWKSFileCache(cache_path, uri)
+            self._load_file_cache()
+
+    def _load_file_cache(self) -> None:
+        document = self._file_cache.load() if self._file_cache else None
+        if document is None:
+            return
+
+        self._document = document
+        if self.jwk_set_cache is not None:
+            age = document.age()
+            max_age = document.max_age
+            if age < (self.jwk_set_cache.lifespan if max_age is None else max_age):
+                self.jwk_set_cache.put(document.jwk_set, max_age=max_age, age=age)
+
+    def _request(self) -> JWKSDocument:
+        previous = self._document
+        headers = dict(self.headers)
+        if previous is not None:
+            headers.update(previous.conditional_headers())
+
+        try:
+            if self.transport is not None:
+                response_headers, body = self.transport.get(self.uri, headers)
+                jwk_set = json.loads(body)
+            else:
+                r = urllib.request.Request(url=self.uri, headers=headers)
+                with urllib.request.urlopen(
+                    r, timeout=self.timeout, context=self.ssl_context
+                ) as response:
+                    jwk_set = json.load(response)
+                    response_headers = response.headers
+        except HTTPError as e:
+            with e:
+                if e.code != 304 or previous is None:
+                    raise
+                # Not modified: keep the parsed document (and the PyJWKSet
+                # built from it) and only refresh its metadata.
+                jwk_set = previous.jwk_set
+                response_headers = e.headers
+
+        return JWKSDocument(
+            jwk_set,
+            etag=response_headers.get("ETag") or (previous and previous.etag),
+            last_modified=response_headers.get("Last-Modified")
+            or (previous and previous.last_modified),
+            max_age=_parse_max_age(response_headers.get("Cache-Control")),
+        )
+
     def fetch_data(self) -> Any:
         jwk_set: Any = None
+        max_age = None
         try:
-            r = urllib.request.Request(url=self.uri, headers=self.headers)
-            with urllib.request.urlopen(
-                r, timeout=self.timeout, context=self.ssl_context
-            ) as response:
-                jwk_set = json.load(response)
+            document = self._request()
+            jwk_set = document.jwk_set
+            max_age = document.max_age
+            self._document = document
+            if self._file_cache is not None:
+                self._file_cache.save(document)
         except (URLError, TimeoutError) as e:
             raise PyJWKClientConnectionError(
                 f'Fail to fetch data from the url, err: "{e}"'
@@ -64,21 +185,73 @@ class PyJWKClient:
         else:
             return jwk_set
         finally:
-            if self.jwk_set_cache is not None:
-                self.jwk_set_cache.put(jwk_set)
+            # A failed fetch clears the cache, unless stale key sets are
+            # being served, in which case the last good one is kept.
+            if self.jwk_set_cache is not None and (
+                jwk_set is not None or not self.stale_while_revalidate
+            ):
+                self.jwk_set_cache.put(jwk_set, max_age=max_age)
+
+    def _join_or_start_fetch(self) -> tuple[_Fetch, bool]:
+        with self._fetch_lock:
+            if self._fetch is not None:
+                return self._fetch, False
+            self._fetch = _Fetch()
+            return self._fetch, True
+
+    def _run_fetch(self, fetch: _Fetch) -> None:
+        try:
+            fetch.result = self.fetch_data()
+        except Exception as e:
+            fetch.error = e
+        finally:
+            with self._fetch_lock:
+                self._fetch = None
+            fetch.done.set()
+
+    def _fetch_single_flight(self) -> Any:
+        """
+        Fetches the JWKS, or waits for the fetch already in flight so that
+        concurrent misses cost a single request.
+        """
+        fetch, started = self._join_or_start_fetch()
+        if started:
+            self._run_fetch(fetch)
+        else:
+            fetch.done.wait()
+
+        if fetch.error is not None:
+            raise fetch.error
+        return fetch.result
+
+    def _refresh_in_background(self) -> None:
+        fetch, started = self._join_or_start_fetch()
+        if started:
+            threading.Thread(target=self._run_fetch, args=(fetch,), daemon=True).start()
 
     def get_jwk_set(self, refresh: bool = False) -> PyJWKSet:
         data = None
         if self.jwk_set_cache is not None and not refresh:
             data = self.jwk_set_cache.get()
 
+            if data is None and self.stale_while_revalidate:
+                data = self.jwk_set_cache.get_stale(self.max_stale)
+                if data is not None:
+                    self._refresh_in_background()
+
         if data is None:
-            data = self.fetch_data()
+            data = self._fetch_single_flight()
 
         if not isinstance(data, dict):
             raise PyJWKClientError("The JWKS endpoint did not return a JSON object")
 
-        return PyJWKSet.from_dict(data)
+        memo = self._jwk_set
+        if memo is not None and memo[0] is data:
+            return memo[1]
+
+        jwk_set = PyJWKSet.from_dict(data)
+        self._jwk_set = (data, jwk_set)
+        return jwk_set
 
     def get_signing_keys(self, refresh: bool = False) -> List[PyJWK]:
         jwk_set = self.get_jwk_set(refresh)
@@ -93,14 +266,61 @@ class PyJWKClient:
 
         return signing_keys
 
+    @staticmethod
+    def _find_signing_key(jwk_set: PyJWKSet, kid: str) -> Optional[PyJWK]:
+        # Only the keys sharing this kid are deserialized.
+        if not kid:
+            return None
+
+        for key in jwk_set.keys_for_kid(kid):
+            if key.public_key_use in ["sig", None]:
+                return key
+
+        return None
+
+    def _refresh_for_unknown_kid(self, kid: str) -> Optional[PyJWKSet]:
+        """
+        Returns a freshly fetched key set, or None if the kid missed recently
+        or the key set was already refreshed within min_refresh_interval.
+        """
+        now = time.monotonic()
+        try:
+            missed_at = self.missed_kids.get(kid)
+        except TypeError:
+            # An unhashable kid cannot match any key, nor be kept in
+            # missed_kids, so it never forces a refresh.
+            recently_missed = True
+        else:
+            recently_missed = (
+                missed_at is not None and now - missed_at < self.min_refresh_interval
+            )
+        if recently_missed:
+            with self._refresh_lock:
+                self.suppressed_refreshes += 1
+            return None
+
+        with self._refresh_lock:
+            last = self._last_forced_refresh
+            if last is not None and now - last < self.min_refresh_interval:
+                # Not remembered as missed: the key set was not fetched for it.
+                self.suppressed_refreshes += 1
+                return None
+            self._last_forced_refresh = now
+            self.forced_refreshes += 1
+
+        return self.get_jwk_set(refresh=True)
+
     def get_signing_key(self, kid: str) -> PyJWK:
-        signing_keys = self.get_signing_keys()
-        signing_key = self.match_kid(signing_keys, kid)
+        signing_key = self._find_signing_key(self.get_jwk_set(), kid)
 
         if not signing_key:
-            # If no matching signing key from the jwk set, refresh the jwk set and try again.
-            signing_keys = self.get_signing_keys(refresh=True)
-            signing_key = self.match_kid(signing_keys, kid)
+            # If no matching signing key from the jwk set, refresh the jwk set
+            # (rate limited) and try again.
+            jwk_set = self._refresh_for_unknown_kid(kid)
+            if jwk_set is not None:
+                signing_key = self._find_signing_key(jwk_set, kid)
+                if not signing_key:
+                    self.missed_kids.put(kid, time.monotonic())
 
             if not signing_key:
                 raise PyJWKClientError(
@@ -109,9 +329,9 @@ class PyJWKClient:
 
         return signing_key
 
-    def get_signing_key_from_jwt(self, token: str) -> PyJWK:
-        unverified = decode_token(token, options={"verify_signature": False})
-        header = unverified["header"]
+    def get_signing_key_from_jwt(self, token: Union[str, bytes, ParsedToken]) -> PyJWK:
+        # Only the header is needed; a ParsedToken is not parsed again.
+        header = parse_token(token).header
         return self.get_signing_key(header.get("kid"))
 
     @staticmethod
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import http.client
+import io
+import threading
+from collections.abc import Mapping
+from email.message import Message
+from ssl import SSLContext
+from typing import Optional, Union
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+_Connection = Union[http.client.HTTPConnection, http.client.HTTPSConnection]
+
+_REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+# Errors a kept-alive connection raises when the server has already closed it.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class PooledHTTPTransport:
+    """
+    Fetches JWKS documents over persistent keep-alive connections.
+
+    Idle connections are pooled per origin (scheme, host and port), at most
+    ``max_idle_connections`` each, so refreshes and unknown-kid retries reuse
+    an open TCP/TLS connection instead of handshaking again. A reused
+    connection that turns out to have been closed by the server is retried
+    once on a new one.
+
+    Errors are raised the way ``urllib`` raises them - ``HTTPError`` for a
+    non-2xx status (including 304) and ``URLError`` for connection failures -
+    so ``PyJWKClient`` handles both transports the same way.
+    """
+
+    def __init__(
+        self,
+        max_idle_connections: int = 2,
+        connect_timeout: float = 5,
+        read_timeout: float = 30,
+        ssl_context: Optional[SSLContext] = None,
+        max_redirects: int = 5,
+    ) -> None:
+        self.max_idle_connections = max_idle_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.ssl_context = ssl_context
+        self.max_redirects = max_redirects
+        self.connections_created = 0
+        self.requests = 0
+        self._idle: dict[tuple[str, str, int], list[_Connection]] = {}
+        self._lock = threading.Lock()
+
+    def _connect(self, origin: tuple[str, str, int]) -> _Connection:
+        scheme, host, port = origin
+        conn: _Connection
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                host, port, timeout=self.connect_timeout, context=self.ssl_context
+            )
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.connect_timeout)
+        conn.connect()
+        conn.sock.settimeout(self.read_timeout)
+        with self._lock:
+            self.connections_created += 1
+        return conn
+
+    def _acquire(self, origin: tuple[str, str, int]) -> Optional[_Connection]:
+        with self._lock:
+            idle = self._idle.get(origin)
+            return idle.pop() if idle else None
+
+    def _release(self, origin: tuple[str, str, int], conn: _Connection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.max_idle_connections:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _send(
+        self,
+        origin: tuple[str, str, int],
+        conn: _Connection,
+        target: str,
+        headers: Mapping[str, str],
+    ) -> tuple[int, str, Message, bytes]:
+        conn.request("GET", target, headers=dict(headers))
+        response = conn.getresponse()
+        body = response.read()
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(origin, conn)
+        return response.status, response.reason, response.msg, body
+
+    def _get_once(
+        self, url: str, headers: Mapping[str, str]
+    ) -> tuple[int, str, Message, bytes]:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise URLError(f"unsupported URL: {url}")
+
+        default_port = 443 if parts.scheme == "https" else 80
+        origin = (parts.scheme, parts.hostname, parts.port or default_port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        with self._lock:
+            self.requests += 1
+
+        try:
+            conn = self._acquire(origin)
+            if conn is not None:
+                try:
+                    return self._send(origin, conn, target, headers)
+                except _STALE_CONNECTION_ERRORS:
+                    conn.close()
+            conn = self._connect(origin)
+            try:
+                return self._send(origin, conn, target, headers)
+            except BaseException:
+                conn.close()
+                raise
+        except (OSError, http.client.HTTPException) as e:
+            if isinstance(e, TimeoutError):
+                raise
+            raise URLError(e) from e
+
+    def get(self, url: str, headers: Mapping[str, str]) -> tuple[Message, bytes]:
+        """
+        Performs a GET, following redirects, and returns the response headers
+        and body of a 2xx response.
+        """
+        for _ in range(self.max_redirects + 1):
+            status, reason, response_headers, body = self._get_once(url, headers)
+            location = response_headers.get("Location")
+            if status in _REDIRECT_CODES and location:
+                url = urljoin(url, location)
+                continue
+            if not 200 <= status < 300:
+                raise HTTPError(url, status, reason, response_headers, io.BytesIO(body))
+            return response_headers, body
+
+        raise HTTPError(
+            url, status, "Too many redirects", response_headers, io.BytesIO(body)
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
@@ -1,16 +1,10 @@
 import base64
 import binascii
 import re
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, Optional, Union
 
-try:
+if TYPE_CHECKING:
     from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurve
-    from cryptography.hazmat.primitives.asymmetric.utils import (
-        decode_dss_signature,
-        encode_dss_signature,
-    )
-except ModuleNotFoundError:
-    pass
 
 
 def force_bytes(value: Union[bytes, str]) -> bytes:
@@ -33,6 +27,82 @@ def base64url_decode(input: Union[bytes, str]) -> bytes:
     return base64.urlsafe_b64decode(input_bytes)
 
 
+def iter_chunks(data: Any, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """
+    Yields the bytes of ``data``, which may be bytes, a binary file object or
+    an iterable of bytes chunks, without reading it all into memory.
+    """
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        yield bytes(data) if isinstance(data, memoryview) else data
+    elif hasattr(data, "read"):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                break
+            yield force_bytes(chunk)
+    elif isinstance(data, Iterable):
+        for chunk in data:
+            yield force_bytes(chunk)
+    else:
+        raise TypeError("Expected bytes, a file object or an iterable of bytes")
+
+
+def is_bytes_like(data: Any) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview))
+
+
+_URLSAFE_TO_STANDARD = bytes.maketrans(b"-_", b"+/")
+_PADDING = (b"", b"=", b"==", b"===")
+
+
+def split_token(
+    token: bytes,
+) -> tuple[memoryview, memoryview, memoryview, memoryview]:
+    """
+    Splits a compact token into its signing input and base64 segments.
+
+    The token is walked once to find the first and last ``.``. The signing
+    input is returned as a view over ``token`` itself. The header, payload and
+    signature segments are returned as views over one scratch buffer that
+    holds all three padded and translated to the standard base64 alphabet, so
+    they can go straight to ``binascii.a2b_base64`` without further copies.
+
+    Raises ValueError if the token has fewer than three segments.
+    """
+    header_end = token.find(b".")
+    signature_start = token.rfind(b".")
+    if header_end == signature_start:
+        raise ValueError("Not enough segments")
+
+    view = memoryview(token)
+    header_pad = -header_end % 4
+    payload_len = signature_start - header_end - 1
+    payload_pad = -payload_len % 4
+    signature_pad = -(len(token) - signature_start - 1) % 4
+
+    segments = memoryview(
+        b"".join(
+            (
+                view[:header_end],
+                _PADDING[header_pad],
+                view[header_end + 1 : signature_start],
+                _PADDING[payload_pad],
+                view[signature_start + 1 :],
+                _PADDING[signature_pad],
+            )
+        ).translate(_URLSAFE_TO_STANDARD)
+    )
+    payload_start = header_end + header_pad
+    payload_end = payload_start + payload_len + payload_pad
+
+    return (
+        view[:signature_start],
+        segments[:payload_start],
+        segments[payload_start:payload_end],
+        segments[payload_end:],
+    )
+
+
 def base64url_encode(input: bytes) -> bytes:
     return base64.urlsafe_b64encode(input).replace(b"=", b"")
 
@@ -72,6 +142,8 @@ def bytes_from_int(val: int, *, bit_length: Optional[int] = None) -> bytes:
 
 
 def der_to_raw_signature(der_sig: bytes, curve: "EllipticCurve") -> bytes:
+    from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+
     num_bits = curve.key_size
     num_bytes = (num_bits + 7) // 8
 
@@ -81,6 +153,8 @@ def der_to_raw_signature(der_sig: bytes, curve: "EllipticCurve") -> bytes:
 
 
 def raw_to_der_signature(raw_sig: bytes, curve: "EllipticCurve") -> bytes:
+    from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
     num_bits = curve.key_size
     num_bytes = (num_bits + 7) // 8
 
@@ -114,9 +188,7 @@ _PEMS = {
 }
 
 _PEM_RE = re.compile(
-    b"----[- ]BEGIN ("
-    + b"|".join(_PEMS)
-    + b""")[- ]----\r?
+    b"----[- ]BEGIN (" + b"|".join(_PEMS) + b""")[- ]----\r?
 .+?\r?
 ----[- ]END \\1[- ]----\r?\n?""",
     re.DOTALL,
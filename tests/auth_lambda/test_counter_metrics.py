@@ -0,0 +1,86 @@
+import io
+import json
+
+import jwt
+import pytest
+from conftest import SECRET, FakeClock, authorizer_event
+from counter_metrics import CounterMetrics, flatten
+
+
+@pytest.fixture
+def metrics_clock(monkeypatch):
+    import counter_metrics
+    import phase_metrics
+
+    clock = FakeClock()
+    monkeypatch.setattr(counter_metrics, 'time', clock)
+    monkeypatch.setattr(phase_metrics, 'time', clock)
+    return clock
+
+
+def records(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_flatten_names_nested_counters():
+    stats = {'rejections': {'expired': 2}, 'negative_cache': {'hits': 1, 'size': 3}}
+    assert flatten(stats, 'prefilter') == {
+        'prefilter_rejections_expired': 2,
+        'prefilter_negative_cache_hits': 1,
+        'prefilter_negative_cache_size': 3,
+    }
+
+
+def test_publishes_counter_increases_every_interval(metrics_clock):
+    stats = {'hits': 0, 'size': 0}
+    stream = io.StringIO()
+    metrics = CounterMetrics({'decision_cache': lambda: dict(stats)}, interval=60, stream=stream)
+
+    stats.update(hits=5, size=5)
+    metrics.maybe_publish()
+    assert stream.getvalue() == ''
+
+    metrics_clock.advance(60)
+    metrics.maybe_publish()
+    stats.update(hits=7, size=4)
+    metrics_clock.advance(60)
+    metrics.maybe_publish()
+
+    first, second = records(stream)
+    assert (first['decision_cache_hits'], first['decision_cache_size']) == (5, 5)
+    assert (second['decision_cache_hits'], second['decision_cache_size']) == (2, 4)
+    assert second['_aws'] == {
+        'Timestamp': int(metrics_clock.now * 1000),
+        'CloudWatchMetrics': [{
+            'Namespace': 'EntrixAuthorizer',
+            'Dimensions': [[]],
+            'Metrics': [
+                {'Name': 'decision_cache_hits', 'Unit': 'Count'},
+                {'Name': 'decision_cache_size', 'Unit': 'Count'},
+            ],
+        }],
+    }
+
+
+def test_handler_publishes_cache_and_prefilter_counters(authorizer, monkeypatch, metrics_clock):
+    stream = io.StringIO()
+    monkeypatch.setattr(authorizer, 'counter_metrics', CounterMetrics(
+        {'decision_cache': authorizer.decision_cache.stats, 'prefilter': authorizer.prefilter.stats},
+        interval=60,
+        stream=stream,
+    ))
+
+    token = jwt.encode({'sub': 'u1'}, SECRET, algorithm='HS256')
+    for _ in range(3):
+        authorizer.lambda_handler(authorizer_event(token), None)
+    authorizer.lambda_handler(authorizer_event('not-a-token'), None)
+    assert stream.getvalue() == ''
+
+    # Published by the first invocation after the interval
+    metrics_clock.advance(60)
+    authorizer.lambda_handler(authorizer_event(token), None)
+    [record] = records(stream)
+    assert record['decision_cache_hits'] == 2
+    assert record['decision_cache_misses'] == 2
+    assert record['decision_cache_size'] == 1
+    assert record['prefilter_rejections_malformed'] == 1
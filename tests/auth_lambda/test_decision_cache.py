@@ -0,0 +1,76 @@
+import jwt
+import pytest
+from conftest import SECRET, FakeClock, authorizer_event
+from decision_cache import DecisionCache, token_digest
+
+
+@pytest.fixture
+def cache_clock(monkeypatch):
+    import decision_cache
+
+    clock = FakeClock()
+    monkeypatch.setattr(decision_cache, 'time', clock)
+    return clock
+
+
+def test_entry_expires_at_exp(cache_clock):
+    cache = DecisionCache(max_ttl=3600)
+    cache.put(b'key', 'allow', exp=cache_clock.now + 30)
+
+    cache_clock.advance(29)
+    assert cache.get(b'key') == 'allow'
+    cache_clock.advance(1)
+    assert cache.get(b'key') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'expirations': 1, 'size': 0}
+
+
+def test_entry_expires_after_max_ttl_before_exp(cache_clock):
+    cache = DecisionCache(max_ttl=60)
+    cache.put(b'key', 'allow', exp=cache_clock.now + 3600)
+    cache_clock.advance(60)
+    assert cache.get(b'key') is None
+
+
+def test_least_recently_used_entry_is_evicted(cache_clock):
+    cache = DecisionCache(max_size=2)
+    cache.put(b'a', 'a')
+    cache.put(b'b', 'b')
+    cache.get(b'a')
+    cache.put(b'c', 'c')
+    assert cache.get(b'b') is None
+    assert cache.get(b'a') == 'a'
+    assert cache.evictions == 1
+
+
+def test_token_digest_depends_on_secret_version():
+    assert token_digest('token', 'v1') != token_digest('token', 'v2')
+    assert token_digest('token', 'v1') == token_digest('token', 'v1')
+
+
+def test_authorizer_serves_repeated_token_from_cache(authorizer):
+    token = jwt.encode({'sub': 'u1'}, SECRET, algorithm='HS256')
+    first = authorizer.lambda_handler(authorizer_event(token), None)
+    second = authorizer.lambda_handler(authorizer_event(token), None)
+    assert first['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+    assert second == first
+    assert (authorizer.decision_cache.hits, authorizer.decision_cache.misses) == (1, 1)
+
+
+def test_key_ring_version_change_invalidates_cached_decisions(authorizer, secrets_manager, clock):
+    token = jwt.encode({'sub': 'u1'}, SECRET, algorithm='HS256')
+    authorizer.lambda_handler(authorizer_event(token), None)
+
+    # Once the rotation is picked up the token is verified again, with the previous key
+    secrets_manager.rotate('second-secret', 'v2')
+    clock.advance(authorizer.secret_provider.ttl)
+    policy = authorizer.lambda_handler(authorizer_event(token), None)
+    assert policy['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+    assert (authorizer.decision_cache.hits, authorizer.decision_cache.misses) == (0, 2)
+    assert authorizer.secret_provider.matches == {'AWSCURRENT': 1, 'AWSPREVIOUS': 1}
+
+    # A second rotation drops the token's key, and no cached Allow outlives it
+    secrets_manager.rotate('third-secret', 'v3')
+    clock.advance(authorizer.secret_provider.ttl)
+    policy = authorizer.lambda_handler(authorizer_event(token), None)
+    assert policy['policyDocument']['Statement'][0]['Effect'] == 'Deny'
+    assert authorizer.decision_cache.hits == 0
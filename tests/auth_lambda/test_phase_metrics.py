@@ -0,0 +1,72 @@
+import io
+import json
+
+import jwt
+import pytest
+from conftest import SECRET, authorizer_event
+from phase_metrics import PhaseMetrics
+
+
+@pytest.fixture
+def traces():
+    # Start from an empty header cache
+    jwt.clear_caches()
+    traces = []
+    jwt.add_decode_hook(traces.append)
+    yield traces
+    jwt.remove_decode_hook(traces.append)
+
+
+def test_handler_traces_every_phase_of_a_decode(authorizer, traces):
+    token = jwt.encode({'sub': 'u1'}, SECRET, algorithm='HS256')
+    authorizer.lambda_handler(authorizer_event(token), None)
+
+    [trace] = traces
+    assert trace.error is None
+    assert trace.algorithm == 'HS256'
+    assert trace.token_size == len(token)
+    assert list(trace.phases) == ['parse', 'header_validation', 'prefilter', 'verify', 'payload', 'claims']
+    assert trace.cache['jws_headers'] is False
+
+
+def test_handler_trace_records_header_cache_hit(authorizer, traces):
+    for sub in ('u1', 'u2'):
+        token = jwt.encode({'sub': sub}, SECRET, algorithm='HS256')
+        authorizer.lambda_handler(authorizer_event(token), None)
+
+    assert [trace.cache['jws_headers'] for trace in traces] == [False, True]
+    assert 'header_validation' not in traces[1].phases
+
+
+def test_handler_trace_records_rejection(authorizer, traces):
+    token = jwt.encode({'sub': 'u1'}, 'wrong-secret', algorithm='HS256')
+    authorizer.lambda_handler(authorizer_event(token), None)
+
+    [trace] = traces
+    assert isinstance(trace.error, jwt.InvalidSignatureError)
+
+
+def test_key_refresh_is_a_phase(authorizer, secrets_manager, clock, traces):
+    authorizer.get_key_ring()
+    clock.advance(authorizer.secret_provider.min_refresh_interval)
+    secrets_manager.rotate('rotated-secret', 'v2')
+    token = jwt.encode({'sub': 'u1'}, 'rotated-secret', algorithm='HS256')
+    policy = authorizer.lambda_handler(authorizer_event(token), None)
+
+    assert policy['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+    [trace] = traces
+    assert 'key_refresh' in trace.phases
+
+
+def test_phase_metrics_publishes_handler_phases(authorizer):
+    stream = io.StringIO()
+    metrics = PhaseMetrics(stream=stream)
+    jwt.add_decode_hook(metrics)
+    try:
+        authorizer.lambda_handler(authorizer_event(jwt.encode({'sub': 'u1'}, SECRET, algorithm='HS256')), None)
+    finally:
+        jwt.remove_decode_hook(metrics)
+
+    record = json.loads(stream.getvalue())
+    names = {metric['Name'] for metric in record['_aws']['CloudWatchMetrics'][0]['Metrics']}
+    assert {'parse_time', 'prefilter_time', 'verify_time', 'jws_headers_cache_hit'} <= names
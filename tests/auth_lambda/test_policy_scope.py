@@ -0,0 +1,64 @@
+import pytest
+from policy_scope import policy_resource, policy_scope_from_env
+
+API = 'arn:aws:execute-api:eu-west-1:123456789012:abc123'
+METHOD_ARN = f'{API}/prod/POST/orders'
+
+
+@pytest.mark.parametrize('scope, expected', [
+    ('method', METHOD_ARN),
+    ('resource', f'{API}/prod/*/orders'),
+    ('stage', f'{API}/prod/*'),
+    ('api', f'{API}/*'),
+])
+def test_scopes(scope, expected):
+    assert policy_resource(METHOD_ARN, scope) == expected
+
+
+def test_nested_path_keeps_the_whole_path():
+    assert policy_resource(f'{API}/prod/GET/orders/42/items', 'resource') == f'{API}/prod/*/orders/42/items'
+
+
+@pytest.mark.parametrize('scope, expected', [
+    ('method', f'{API}/prod/GET/'),
+    ('resource', f'{API}/prod/*/'),
+    ('stage', f'{API}/prod/*'),
+    ('api', f'{API}/*'),
+])
+def test_root_path(scope, expected):
+    assert policy_resource(f'{API}/prod/GET/', scope) == expected
+
+
+@pytest.mark.parametrize('scope, expected', [
+    ('resource', f'{API}/*'),
+    ('stage', f'{API}/*'),
+    ('api', f'{API}/*'),
+])
+def test_arn_without_stage(scope, expected):
+    assert policy_resource(f'{API}/', scope) == expected
+
+
+def test_arn_with_stage_only():
+    assert policy_resource(f'{API}/prod', 'resource') == f'{API}/prod/*'
+
+
+@pytest.mark.parametrize('arn', [
+    '*',
+    'arn:aws:lambda:eu-west-1:123456789012:function:authorizer',
+    'arn:aws:s3:eu-west-1:123456789012:bucket/prod/GET/orders',
+    'arn:aws:execute-api:eu-west-1:abc123/prod/GET/orders',
+    'not-an-arn/prod/GET/orders',
+])
+@pytest.mark.parametrize('scope', ['resource', 'stage', 'api'])
+def test_other_arns_are_unchanged(arn, scope):
+    assert policy_resource(arn, scope) == arn
+
+
+def test_scope_from_env(monkeypatch):
+    monkeypatch.delenv('POLICY_SCOPE', raising=False)
+    assert policy_scope_from_env() == 'method'
+    monkeypatch.setenv('POLICY_SCOPE', 'Stage')
+    assert policy_scope_from_env() == 'stage'
+    monkeypatch.setenv('POLICY_SCOPE', 'everything')
+    with pytest.raises(ValueError):
+        policy_scope_from_env()
@@ -0,0 +1,129 @@
+import time
+
+import jwt
+import pytest
+from conftest import SECRET, authorizer_event
+from prefilter import TokenPrefilter, TokenRejected, payload_claims
+
+
+def make_token(claims, secret=SECRET, **headers):
+    return jwt.encode(claims, secret, algorithm='HS256', headers=headers or None)
+
+
+@pytest.fixture
+def prefilter():
+    return TokenPrefilter()
+
+
+def test_accepts_well_formed_token(prefilter):
+    assert prefilter.check(make_token({'sub': 'u1', 'exp': time.time() + 60})) is None
+
+
+@pytest.mark.parametrize('token', ['hello', 'abc.def', 'a$b.c.d', 'eyJhbGciOiJIUzI1NiJ9.aGVsbG8.c2ln', 'WzFd.e30.c2ln'])
+def test_rejects_malformed_token(prefilter, token):
+    assert prefilter.check(token) == 'malformed'
+    assert prefilter.rejections == {'malformed': 1}
+
+
+def test_rejects_expired_token(prefilter):
+    assert prefilter.check(make_token({'exp': int(time.time()) - 10})) == 'expired'
+
+
+def test_rejects_oversized_token():
+    assert TokenPrefilter(max_token_bytes=10).check_size('a' * 11) == 'oversized'
+
+
+def test_compressed_token_is_inflated(prefilter):
+    token = make_token({'sub': 'u1', 'exp': int(time.time()) + 60}, zip='DEF')
+    assert prefilter.check(token) is None
+    expired = make_token({'sub': 'u1', 'exp': int(time.time()) - 10}, zip='DEF')
+    assert prefilter.check(expired) == 'expired'
+
+
+def test_compression_bomb_is_malformed():
+    token = make_token({'data': 'x' * 10000}, zip='DEF')
+    assert TokenPrefilter(max_decompressed_bytes=1000).check(token) == 'malformed'
+
+
+def test_payload_claims_rejects_unknown_zip():
+    with pytest.raises(ValueError):
+        payload_claims(b'{}', 'GZ')
+
+
+def test_negative_cache(prefilter):
+    prefilter.reject(b'key', 'invalid', 'Invalid token: Signature verification failed')
+    assert prefilter.rejected(b'key') == 'Invalid token: Signature verification failed'
+    assert prefilter.rejected(b'other') is None
+    assert prefilter.rejections == {'invalid': 1, 'negative_cache': 1}
+
+
+def test_authorizer_allows_compressed_token(authorizer):
+    token = make_token({'sub': 'u1', 'exp': int(time.time()) + 60}, zip='DEF')
+    policy = authorizer.lambda_handler(authorizer_event(token), None)
+    assert policy['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+    assert policy['principalId'] == 'u1'
+
+
+def test_authorizer_denies_replayed_bad_signature_from_negative_cache(authorizer, clock):
+    authorizer.get_key_ring()
+    clock.advance(authorizer.secret_provider.min_refresh_interval)
+
+    # The key-ring is refreshed before the failure is remembered
+    token = make_token({'sub': 'u1'}, secret='wrong')
+    first = authorizer.lambda_handler(authorizer_event(token), None)
+    second = authorizer.lambda_handler(authorizer_event(token), None)
+    assert first is second
+    assert first['context'] == {'error': 'Invalid token: Signature verification failed'}
+    assert authorizer.prefilter.rejections == {'invalid': 1, 'negative_cache': 1}
+
+
+@pytest.mark.parametrize('headers', [{}, {'kid': 'v2'}])
+def test_token_of_rotated_secret_is_not_denied_from_negative_cache(authorizer, secrets_manager, clock, headers):
+    authorizer.get_key_ring()
+
+    # Rotated right after the key-ring was fetched, so it cannot be refreshed yet
+    secrets_manager.rotate('rotated-secret', 'v2')
+    token = make_token({'sub': 'u1'}, secret='rotated-secret', **headers)
+    for _ in range(2):
+        policy = authorizer.lambda_handler(authorizer_event(token), None)
+        assert policy['policyDocument']['Statement'][0]['Effect'] == 'Deny'
+    assert authorizer.prefilter.rejections == {'unconfirmed': 2}
+
+    clock.advance(authorizer.secret_provider.min_refresh_interval)
+    policy = authorizer.lambda_handler(authorizer_event(token), None)
+    assert policy['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+
+
+def test_parse_returns_parsed_token_and_claims_of_compressed_token(prefilter):
+    token = make_token({'iss': 'https://desk-7.entrix.local'}, zip='DEF')
+    parsed, claims = prefilter.parse(token)
+    assert isinstance(parsed, jwt.api_jws.ParsedToken)
+    assert parsed.header['zip'] == 'DEF'
+    assert claims == {'iss': 'https://desk-7.entrix.local'}
+
+
+def test_parse_raises_token_rejected(prefilter):
+    with pytest.raises(TokenRejected) as rejected:
+        prefilter.parse(make_token({'exp': int(time.time()) - 10}))
+    assert rejected.value.reason == 'expired'
+    assert str(rejected.value) == 'Token expired'
+    assert prefilter.rejections == {'expired': 1}
+
+
+def test_authorizer_parses_token_once(authorizer, monkeypatch):
+    parse_token = jwt.parse_token
+    calls = []
+    monkeypatch.setattr(jwt, 'parse_token', lambda token: calls.append(token) or parse_token(token))
+    token = make_token({'sub': 'u1'})
+    policy = authorizer.lambda_handler(authorizer_event(token), None)
+    assert policy['policyDocument']['Statement'][0]['Effect'] == 'Allow'
+    assert calls == [token]
+
+
+def test_authorizer_denies_list_alg_as_invalid_token(authorizer):
+    header = jwt.utils.base64url_encode(b'{"alg":["HS256"],"typ":"JWT"}').decode()
+    payload = jwt.utils.base64url_encode(b'{"sub":"u1"}').decode()
+    token = f'{header}.{payload}.c2lnbmF0dXJl'
+    policy = authorizer.lambda_handler(authorizer_event(token), None)
+    assert policy['context'] == {'error': 'Invalid token: The specified alg value is not allowed'}
+    assert authorizer.prefilter.rejections == {'invalid': 1}
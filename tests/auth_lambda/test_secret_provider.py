@@ -0,0 +1,118 @@
+import types
+
+import pytest
+from conftest import SECRET
+from secret_provider import SecretProvider
+
+
+@pytest.fixture
+def provider(secrets_manager, clock):
+    provider = SecretProvider('arn:test', ttl=300, refresh_ahead=60, min_refresh_interval=10, client=secrets_manager)
+    provider.key_ring()
+    return provider
+
+
+@pytest.fixture
+def threads(monkeypatch):
+    """Background refreshes started, run when their thread is joined"""
+    import secret_provider
+
+    started = []
+
+    class Thread:
+        def __init__(self, target, daemon):
+            self.join = target
+
+        def start(self):
+            started.append(self)
+
+    monkeypatch.setattr(secret_provider, 'threading', types.SimpleNamespace(Thread=Thread))
+    return started
+
+
+def test_key_ring_is_served_from_memory_until_refresh_ahead(provider, secrets_manager, clock, threads):
+    calls = secrets_manager.calls
+    clock.advance(239)
+    assert provider.key_ring().current.secret == SECRET
+    assert secrets_manager.calls == calls
+    assert threads == []
+
+
+def test_refresh_ahead_refreshes_in_background(provider, secrets_manager, clock, threads):
+    secrets_manager.rotate('new-secret', 'v2')
+    clock.advance(240)
+
+    # The cached key-ring is served while one background refresh runs
+    assert provider.key_ring().version == 'v1'
+    assert provider.key_ring().version == 'v1'
+    [thread] = threads
+    thread.join()
+    assert provider.key_ring().version == 'v2'
+    assert provider._refreshing is False
+
+
+def test_failed_background_refresh_keeps_cached_key_ring(provider, secrets_manager, clock, threads):
+    clock.advance(240)
+    provider.key_ring()
+    secrets_manager.error = ConnectionError('Secrets Manager unavailable')
+    threads[0].join()
+    assert provider.key_ring().current.secret == SECRET
+
+    # Once expired, callers wait for the fetch and see its error
+    clock.advance(60)
+    with pytest.raises(ConnectionError):
+        provider.key_ring()
+
+
+def test_rotation_keeps_previous_version(provider, secrets_manager, clock):
+    clock.advance(300)
+    secrets_manager.rotate('new-secret', 'v2')
+    calls = secrets_manager.calls
+    key_ring = provider.key_ring()
+
+    assert [(key.version, key.stage, key.secret) for key in key_ring.keys] == [
+        ('v2', 'AWSCURRENT', 'new-secret'),
+        ('v1', 'AWSPREVIOUS', SECRET),
+    ]
+    # DescribeSecret and GetSecretValue of the new version only
+    assert secrets_manager.calls == calls + 2
+    assert key_ring.candidates('v1') == (key_ring.keys[1],)
+    assert key_ring.candidates() == key_ring.keys
+
+
+def test_rotation_tolerates_unavailable_previous_version(secrets_manager, clock):
+    secrets_manager.rotate('new-secret', 'v2')
+    del secrets_manager.values['v1']
+    provider = SecretProvider('arn:test', client=secrets_manager)
+    assert provider.key_ring().versions() == ('v2',)
+
+
+def test_rotation_check_is_rate_limited(provider, secrets_manager, clock):
+    calls = secrets_manager.calls
+    assert provider.refresh_if_rotated() is False
+    assert secrets_manager.calls == calls
+
+    clock.advance(10)
+    secrets_manager.rotate('new-secret', 'v2')
+    assert provider.refresh_if_rotated() is True
+    assert provider.key_ring().versions() == ('v2', 'v1')
+
+
+def test_failed_rotation_check_is_rate_limited_too(provider, secrets_manager, clock):
+    clock.advance(10)
+    secrets_manager.error = ConnectionError('Secrets Manager unavailable')
+    with pytest.raises(ConnectionError):
+        provider.refresh_if_rotated()
+    calls = secrets_manager.calls
+
+    # Every bad token during the outage would otherwise call Secrets Manager again
+    for _ in range(5):
+        clock.advance(1)
+        assert provider.refresh_if_rotated() is False
+    assert secrets_manager.calls == calls
+
+    clock.advance(5)
+    secrets_manager.error = None
+    assert provider.refresh_if_rotated() is False
+    assert secrets_manager.calls > calls
+    assert provider.key_ring().current.secret == SECRET
@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [
+    os.path.join(ROOT, 'src', 'auth_lambda'),
+    os.path.join(ROOT, 'src', 'auth_lambda_layer', 'python'),
+]
+
+SECRET = 'ExtrixApiLambdaSecret#1230001'
+METHOD_ARN = 'arn:aws:execute-api:eu-west-1:123456789012:abc123/prod/POST/orders'
+
+
+class FakeSecretsManager:
+    """Secrets Manager client holding one secret, starting with a single AWSCURRENT version"""
+
+    def __init__(self, secret=SECRET, version='v1'):
+        self.values = {version: secret}
+        self.stages = {version: ['AWSCURRENT']}
+        self.calls = 0
+        # Exception every call raises, to simulate an outage
+        self.error = None
+
+    def rotate(self, secret, version):
+        """Add ``secret`` as the AWSCURRENT version, moving the current one to AWSPREVIOUS"""
+        self.stages = {old: ['AWSPREVIOUS'] for old, stages in self.stages.items() if 'AWSCURRENT' in stages}
+        self.stages[version] = ['AWSCURRENT']
+        self.values[version] = secret
+
+    def _call(self):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+
+    def describe_secret(self, SecretId):
+        self._call()
+        return {'ARN': SecretId, 'VersionIdsToStages': {version: list(stages) for version, stages in self.stages.items()}}
+
+    def get_secret_value(self, SecretId, VersionId=None, VersionStage=None):
+        self._call()
+        if VersionId is None:
+            VersionId = next(version for version, stages in self.stages.items() if 'AWSCURRENT' in stages)
+        return {'ARN': SecretId, 'VersionId': VersionId, 'SecretString': json.dumps({'secret': self.values[VersionId]})}
+
+
+class FakeClock:
+    """Stand-in for the time module whose clock only moves when advanced"""
+
+    def __init__(self, now=1000000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A FakeClock driving the secret provider's refresh timing"""
+    import secret_provider
+
+    clock = FakeClock()
+    monkeypatch.setattr(secret_provider, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def secrets_manager():
+    return FakeSecretsManager()
+
+
+@pytest.fixture
+def authorizer(monkeypatch, secrets_manager):
+    """The authorizer module, serving SECRET from a fake Secrets Manager with empty caches"""
+    import app
+    from decision_cache import DecisionCache
+    from prefilter import TokenPrefilter
+    from secret_provider import SecretProvider
+
+    monkeypatch.setattr(app, 'secret_provider', SecretProvider('arn:test', client=secrets_manager))
+    monkeypatch.setattr(app, 'decision_cache', DecisionCache())
+    monkeypatch.setattr(app, 'prefilter', TokenPrefilter())
+    monkeypatch.setattr(app, 'counter_metrics', None)
+    return app
+
+
+def authorizer_event(token, method_arn=METHOD_ARN):
+    return {'headers': {'Authorization': f'Bearer {token}'}, 'methodArn': method_arn}
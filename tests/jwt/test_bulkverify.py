@@ -0,0 +1,46 @@
+import io
+import time
+
+import jwt
+import pytest
+from conftest import SECRET
+from jwt import bulkverify
+
+NOW = int(time.time())
+TOKENS = [
+    jwt.encode({'sub': 'u1', 'exp': NOW + 3600}, SECRET, algorithm='HS256'),
+    jwt.encode({'sub': 'u1', 'exp': NOW - 10}, SECRET, algorithm='HS256'),
+    jwt.encode({'sub': 'u1'}, 'wrong', algorithm='HS256'),
+    # List alg and garbage headers
+    'eyJhbGciOlsiSFMyNTYiXSwidHlwIjoiSldUIn0.eyJzdWIiOiJ1MSJ9.c2ln',
+    '/////.eyJzdWIiOiJ1MSJ9.c2ln',
+    '',
+    'not a token',
+]
+EXPECTED = [(1, 'valid'), (2, 'expired'), (3, 'bad_signature'), (4, 'invalid'), (5, 'malformed'), (7, 'malformed')]
+DECODER_KWARGS = {'key': SECRET, 'algorithms': ['HS256']}
+
+
+def test_verify_file(tmp_path):
+    path = tmp_path / 'tokens.txt'
+    path.write_text('\n'.join(TOKENS) + '\n')
+    assert list(bulkverify.verify(DECODER_KWARGS, path=str(path), workers=1)) == EXPECTED
+
+
+def test_verify_stream():
+    stream = io.BytesIO(('\n'.join(TOKENS) + '\n').encode())
+    assert list(bulkverify.verify(DECODER_KWARGS, stream=stream, workers=1)) == EXPECTED
+
+
+def test_unexpected_decoder_error_is_malformed():
+    class BrokenDecoder:
+        def decode(self, token):
+            raise RuntimeError('boom')
+
+    assert bulkverify.VERDICTS[bulkverify._verdict(BrokenDecoder(), b'a.b.c')] == 'malformed'
+
+
+@pytest.mark.parametrize('token', [b'\xff\xfe.\x00.\x01', b'e30.W10.c2ln', b'a.b'])
+def test_garbage_never_raises(token):
+    decoder = jwt.CompiledDecoder(**DECODER_KWARGS)
+    assert bulkverify.VERDICTS[bulkverify._verdict(decoder, token)] in ('malformed', 'invalid')
@@ -0,0 +1,50 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import jwt
+import pytest
+from conftest import SECRET
+
+
+def b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def forge_token(header, claims, secret=SECRET):
+    """Sign a token with an arbitrary header, which jwt.encode would refuse"""
+    signing_input = f"{b64(json.dumps(header).encode())}.{b64(json.dumps(claims).encode())}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{b64(signature)}"
+
+
+@pytest.fixture
+def decoder():
+    return jwt.compile_decoder(SECRET, algorithms=['HS256'])
+
+
+def test_decodes_like_jwt_decode(decoder):
+    token = jwt.encode({'sub': 'u1', 'exp': int(time.time()) + 60}, SECRET, algorithm='HS256')
+    assert decoder(token) == jwt.decode(token, SECRET, algorithms=['HS256'])
+
+
+@pytest.mark.parametrize('alg', [['HS256'], {'HS256': 1}, 256, None, ''])
+def test_non_string_alg_is_invalid_algorithm(decoder, alg):
+    token = forge_token({'alg': alg, 'typ': 'JWT'}, {'sub': 'u1'})
+    with pytest.raises(jwt.InvalidAlgorithmError) as compiled_error:
+        decoder(token)
+    with pytest.raises(jwt.InvalidAlgorithmError) as decode_error:
+        jwt.decode(token, SECRET, algorithms=['HS256'])
+    assert str(compiled_error.value) == str(decode_error.value)
+
+
+def test_missing_alg(decoder):
+    with pytest.raises(jwt.InvalidAlgorithmError, match='Algorithm not specified'):
+        decoder(forge_token({'typ': 'JWT'}, {'sub': 'u1'}))
+
+
+def test_bad_signature(decoder):
+    with pytest.raises(jwt.InvalidSignatureError):
+        decoder(forge_token({'alg': 'HS256'}, {'sub': 'u1'}, secret='wrong'))
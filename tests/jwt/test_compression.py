@@ -0,0 +1,45 @@
+import jwt
+import pytest
+from conftest import SECRET
+
+PAYLOAD = {'sub': 'u1', 'data': 'x' * 5000}
+
+
+@pytest.fixture
+def token():
+    return jwt.encode(PAYLOAD, SECRET, algorithm='HS256', headers={'zip': 'DEF'})
+
+
+def test_round_trip(token):
+    assert jwt.decode(token, SECRET, algorithms=['HS256']) == PAYLOAD
+
+
+def test_per_call_limit(token):
+    with pytest.raises(jwt.DecodeError, match='exceeds 100 bytes'):
+        jwt.decode(token, SECRET, algorithms=['HS256'], options={'max_decompressed_size': 100})
+
+
+def test_instance_limit(token):
+    with pytest.raises(jwt.DecodeError, match='exceeds 100 bytes'):
+        jwt.PyJWT(options={'max_decompressed_size': 100}).decode(token, SECRET, algorithms=['HS256'])
+
+
+def test_per_call_limit_overrides_instance_limit(token):
+    pyjwt = jwt.PyJWT(options={'max_decompressed_size': 100})
+    assert pyjwt.decode(token, SECRET, algorithms=['HS256'], options={'max_decompressed_size': 10000}) == PAYLOAD
+
+
+def test_compiled_decoder_limit(token):
+    decoder = jwt.compile_decoder(SECRET, algorithms=['HS256'], options={'max_decompressed_size': 100})
+    with pytest.raises(jwt.DecodeError, match='exceeds 100 bytes'):
+        decoder(token)
+    assert jwt.compile_decoder(SECRET, algorithms=['HS256'])(token) == PAYLOAD
+
+
+def test_subclass_overriding_decode_payload(token):
+    class Uppercase(jwt.PyJWT):
+        def _decode_payload(self, decoded):
+            payload = super()._decode_payload(decoded)
+            return {key: value.upper() for key, value in payload.items()}
+
+    assert Uppercase().decode(token, SECRET, algorithms=['HS256'])['sub'] == 'U1'
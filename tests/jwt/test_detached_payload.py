@@ -0,0 +1,33 @@
+import io
+import json
+
+import jwt
+import pytest
+from conftest import SECRET
+
+CLAIMS = {'sub': 'u1', 'scope': 'orders'}
+
+
+@pytest.fixture
+def detached_token():
+    payload = json.dumps(CLAIMS).encode()
+    token = jwt.api_jws.encode(payload, SECRET, algorithm='HS256', is_payload_detached=True)
+    return token, payload
+
+
+def test_decode_with_bytes_detached_payload(detached_token):
+    token, payload = detached_token
+    assert jwt.decode(token, SECRET, algorithms=['HS256'], detached_payload=payload) == CLAIMS
+    assert jwt.compile_decoder(SECRET, algorithms=['HS256']).decode(token, payload) == CLAIMS
+
+
+def test_decode_rejects_streamed_detached_payload(detached_token):
+    token, payload = detached_token
+    stream = io.BytesIO(payload)
+    with pytest.raises(jwt.DecodeError, match='must be bytes'):
+        jwt.decode(token, SECRET, algorithms=['HS256'], detached_payload=stream)
+    with pytest.raises(jwt.DecodeError, match='must be bytes'):
+        jwt.compile_decoder(SECRET, algorithms=['HS256']).decode(token, iter([payload]))
+    # Nothing was read, so the stream can still be verified by PyJWS
+    decoded = jwt.api_jws.decode_complete(token, SECRET, algorithms=['HS256'], detached_payload=stream)
+    assert decoded['signature']
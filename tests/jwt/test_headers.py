@@ -0,0 +1,37 @@
+import json
+
+import jwt
+import pytest
+from conftest import SECRET
+
+
+@pytest.fixture
+def token():
+    return jwt.encode({'sub': 'u1'}, SECRET, algorithm='HS256', headers={'kid': 'k1'})
+
+
+def headers_of(token):
+    return {
+        'get_unverified_header': jwt.get_unverified_header(token),
+        'api_jws.decode_complete': jwt.api_jws.decode_complete(token, SECRET, algorithms=['HS256'])['header'],
+        'decode_complete': jwt.decode_complete(token, SECRET, algorithms=['HS256'])['header'],
+        'compiled decode_complete': jwt.compile_decoder(SECRET, algorithms=['HS256']).decode_complete(token)[
+            'header'
+        ],
+    }
+
+
+def test_headers_are_json_serialisable_dicts(token):
+    # Parsed twice so the second read comes from the header cache
+    for _ in range(2):
+        for source, header in headers_of(token).items():
+            assert type(header) is dict, source
+            assert json.loads(json.dumps(header)) == {'alg': 'HS256', 'typ': 'JWT', 'kid': 'k1'}, source
+
+
+def test_changing_a_returned_header_leaves_the_cache_alone(token):
+    jwt.get_unverified_header(token)['kid'] = 'changed'
+    jwt.decode_complete(token, SECRET, algorithms=['HS256'])['header']['alg'] = 'none'
+
+    assert jwt.get_unverified_header(token)['kid'] == 'k1'
+    assert jwt.decode(token, SECRET, algorithms=['HS256']) == {'sub': 'u1'}
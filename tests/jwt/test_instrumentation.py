@@ -0,0 +1,43 @@
+import jwt
+import pytest
+from conftest import SECRET
+
+
+@pytest.fixture
+def traces():
+    traces = []
+    jwt.add_decode_hook(traces.append)
+    yield traces
+    jwt.remove_decode_hook(traces.append)
+
+
+@pytest.mark.parametrize('decode', [
+    lambda parsed: jwt.decode(parsed, SECRET, algorithms=['HS256']),
+    lambda parsed: jwt.compile_decoder(SECRET, algorithms=['HS256'])(parsed),
+])
+def test_trace_decode_includes_parsing_before_the_decode(traces, decode):
+    token = jwt.encode({'sub': 'u1', 'n': len(traces)}, SECRET, algorithm='HS256', headers={'kid': 'trace'})
+    with jwt.trace_decode(token) as trace:
+        parsed = jwt.parse_token(token)
+        jwt.instrumentation.mark('lookup')
+        decode(parsed)
+
+    assert traces == [trace]
+    assert trace.algorithm == 'HS256'
+    assert {'parse', 'lookup', 'verify', 'payload', 'claims'} <= set(trace.phases)
+    assert 'jws_headers' in trace.cache
+
+
+def test_trace_decode_records_the_error(traces):
+    with pytest.raises(jwt.DecodeError):
+        with jwt.trace_decode('not a token'):
+            jwt.parse_token('not a token')
+
+    [trace] = traces
+    assert isinstance(trace.error, jwt.DecodeError)
+
+
+def test_trace_decode_without_hooks():
+    with jwt.trace_decode('token') as trace:
+        jwt.instrumentation.mark('lookup')
+    assert trace is None
@@ -0,0 +1,114 @@
+import datetime
+import enum
+import json
+import uuid
+
+import jwt
+import pytest
+from conftest import SECRET
+from jwt.json_backend import JSONBackend, OrjsonBackend, has_orjson
+
+pytestmark = pytest.mark.skipif(not has_orjson, reason='orjson is not installed')
+
+
+class Color(enum.Enum):
+    RED = 'red'
+
+
+@pytest.fixture
+def orjson_backend():
+    return OrjsonBackend()
+
+
+@pytest.mark.parametrize('value', [
+    {'sub': 'u1', 'exp': 1700000000, 'scope': ['a', 'b'], 'ratio': 0.5, 'ok': True, 'none': None},
+    {'big': 2**64},
+    {'small': -(2**63) - 1},
+    {1: 'int key'},
+    {'inf': [float('inf')]},
+])
+def test_dumps_matches_stdlib(orjson_backend, value):
+    assert json.loads(orjson_backend.dumps(value)) == json.loads(JSONBackend().dumps(value))
+
+
+def test_dumps_keeps_nan(orjson_backend):
+    assert orjson_backend.dumps({'nan': float('nan')}) == b'{"nan":NaN}'
+
+
+@pytest.mark.parametrize('value', [datetime.datetime.now(), uuid.uuid4(), Color.RED, {1, 2}])
+def test_dumps_rejects_what_stdlib_rejects(orjson_backend, value):
+    with pytest.raises(TypeError):
+        JSONBackend().dumps({'value': value})
+    with pytest.raises(TypeError):
+        orjson_backend.dumps({'value': value})
+
+
+@pytest.mark.parametrize('data', [
+    b'{"big":123456789012345678901234567890}',
+    b'{"big":18446744073709551616}',
+    b'{"small":-9223372036854775809}',
+    '{"big":123456789012345678901234567890}',
+    b'{"nan":NaN}',
+    b'{"lone":"\\ud800"}',
+    b'{"float":1e29,"int":42}',
+])
+def test_loads_matches_stdlib(orjson_backend, data):
+    loaded = orjson_backend.loads(data)
+    expected = json.loads(data)
+    assert repr(loaded) == repr(expected)
+
+
+def test_loads_error_is_value_error(orjson_backend):
+    with pytest.raises(ValueError):
+        orjson_backend.loads(b'{"a":')
+
+
+class RecordingBackend(JSONBackend):
+    def __init__(self):
+        self.calls = []
+
+    def loads(self, data):
+        self.calls.append(('loads', bytes(data)))
+        return super().loads(data)
+
+    def dumps(self, obj, sort_keys=False, json_encoder=None):
+        self.calls.append(('dumps', obj))
+        return super().dumps(obj, sort_keys=sort_keys, json_encoder=json_encoder)
+
+
+def test_instance_backend_applies_to_headers():
+    backend = RecordingBackend()
+    pyjwt = jwt.PyJWT(json_backend=backend)
+    jwt.clear_caches()
+
+    token = pyjwt.encode({'sub': 'u1'}, SECRET, algorithm='HS256', headers={'kid': 'k1'})
+    assert [call[0] for call in backend.calls] == ['dumps', 'dumps']
+    assert backend.calls[1][1]['kid'] == 'k1'
+
+    backend.calls.clear()
+    decoded = pyjwt.decode_complete(token, SECRET, algorithms=['HS256'])
+    assert decoded['payload'] == {'sub': 'u1'}
+    assert [call[0] for call in backend.calls] == ['loads', 'loads']
+
+    backend.calls.clear()
+    list(pyjwt.encode_many([{'sub': 'a'}], SECRET, algorithm='HS256', headers={'kid': 'k2'}))
+    assert ('dumps', {'alg': 'HS256', 'kid': 'k2', 'typ': 'JWT'}) in backend.calls
+
+
+def test_dumps_writes_non_ascii_as_utf8(orjson_backend):
+    # Unlike the stdlib, which escapes it; the JSON value is the same
+    value = {'name': 'Zoë'}
+    assert orjson_backend.dumps(value) == '{"name":"Zoë"}'.encode('utf-8')
+    assert JSONBackend().dumps(value) == b'{"name":"Zo\\u00eb"}'
+    assert orjson_backend.loads(JSONBackend().dumps(value)) == value
+
+
+def test_non_ascii_token_differs_between_backends_but_decodes_with_both(orjson_backend):
+    claims = {'sub': 'u1', 'name': 'Zoë'}
+    orjson_token = jwt.PyJWT(json_backend=orjson_backend).encode(claims, SECRET, algorithm='HS256')
+    json_token = jwt.PyJWT(json_backend=JSONBackend()).encode(claims, SECRET, algorithm='HS256')
+
+    assert orjson_token != json_token
+    for token in (orjson_token, json_token):
+        assert jwt.PyJWT(json_backend=orjson_backend).decode(token, SECRET, algorithms=['HS256']) == claims
+        assert jwt.PyJWT(json_backend=JSONBackend()).decode(token, SECRET, algorithms=['HS256']) == claims
@@ -0,0 +1,45 @@
+import base64
+
+import pytest
+from conftest import SECRET
+from jwt import PyJWKSet, PyJWKSetError
+
+GOOD_KEY = {
+    'kty': 'oct',
+    'kid': 'k1',
+    'alg': 'HS256',
+    'k': base64.urlsafe_b64encode(SECRET.encode()).rstrip(b'=').decode('ascii'),
+}
+# Supported kty and alg, so only deserializing the key finds it invalid
+BAD_KEY = {'kty': 'RSA', 'kid': 'bad', 'alg': 'RS256'}
+
+
+def test_set_without_usable_keys_raises_on_keys():
+    jwk_set = PyJWKSet([BAD_KEY, dict(BAD_KEY, kid='bad2')])
+
+    with pytest.raises(PyJWKSetError, match='did not contain any usable keys'):
+        jwk_set.keys
+    assert jwk_set.keys_for_kid('bad') == []
+
+
+def test_set_with_unsupported_keys_only_raises_up_front():
+    with pytest.raises(PyJWKSetError, match='did not contain any usable keys'):
+        PyJWKSet([{'kty': 'unknown', 'kid': 'k1'}])
+
+
+def test_invalid_keys_are_skipped():
+    jwk_set = PyJWKSet([BAD_KEY, GOOD_KEY])
+
+    assert [key.key_id for key in jwk_set.keys] == ['k1']
+    assert jwk_set['k1'].key_id == 'k1'
+    with pytest.raises(KeyError):
+        jwk_set['bad']
+
+
+@pytest.mark.parametrize('kid', [['k1'], {'k': 1}])
+def test_unhashable_kid_is_listed_but_not_indexed(kid):
+    jwk_set = PyJWKSet([dict(GOOD_KEY, kid=kid), dict(GOOD_KEY, kid='k2')])
+
+    assert [key.key_id for key in jwk_set.keys] == [kid, 'k2']
+    assert jwk_set.keys_for_kid(kid) == []
+    assert jwk_set['k2'].key_id == 'k2'
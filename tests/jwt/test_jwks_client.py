@@ -0,0 +1,103 @@
+import base64
+import copy
+
+import pytest
+from conftest import SECRET, FakeClock
+from jwt import PyJWKClient, PyJWKClientError, jwks_client
+from jwt.jwk_set_cache import JWKSDocument
+
+
+def oct_key(kid):
+    return {
+        'kty': 'oct',
+        'kid': kid,
+        'alg': 'HS256',
+        'k': base64.urlsafe_b64encode(SECRET.encode()).rstrip(b'=').decode('ascii'),
+    }
+
+
+JWKS = {'keys': [oct_key('k1')]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(jwks_client, 'time', clock)
+    return clock
+
+
+def make_client(min_refresh_interval=30):
+    client = PyJWKClient('https://example.invalid/jwks.json', min_refresh_interval=min_refresh_interval)
+    client.fetches = 0
+    client.jwks = copy.deepcopy(JWKS)
+
+    def request():
+        client.fetches += 1
+        return JWKSDocument(copy.deepcopy(client.jwks))
+
+    client._request = request
+    return client
+
+
+@pytest.fixture
+def client():
+    return make_client()
+
+
+def test_known_kid_does_not_refresh(client):
+    assert client.get_signing_key('k1').key_id == 'k1'
+    assert (client.fetches, client.forced_refreshes, client.suppressed_refreshes) == (1, 0, 0)
+
+
+def test_repeated_bogus_kid_refreshes_once_and_counts_the_rest(client):
+    for _ in range(5):
+        with pytest.raises(PyJWKClientError):
+            client.get_signing_key('bogus')
+
+    # One fetch for the cached key set, one forced refresh for the first miss
+    assert client.fetches == 2
+    assert client.forced_refreshes == 1
+    assert client.suppressed_refreshes == 4
+
+
+def test_distinct_bogus_kids_are_rate_limited(client):
+    for kid in ('a', 'b', 'c'):
+        with pytest.raises(PyJWKClientError):
+            client.get_signing_key(kid)
+
+    assert client.forced_refreshes == 1
+    assert client.suppressed_refreshes == 2
+
+
+def test_unhashable_kid_is_counted_without_refreshing(client):
+    with pytest.raises(PyJWKClientError):
+        client.get_signing_key(['k1'])
+
+    assert client.forced_refreshes == 0
+    assert client.suppressed_refreshes == 1
+
+
+def test_rotated_kid_first_seen_while_rate_limited_resolves_after_the_interval(clock):
+    client = make_client(min_refresh_interval=1)
+    with pytest.raises(PyJWKClientError):
+        client.get_signing_key('bogus')
+    assert client.forced_refreshes == 1
+
+    clock.advance(0.5)
+    client.jwks['keys'].append(oct_key('k2'))
+    with pytest.raises(PyJWKClientError):
+        client.get_signing_key('k2')
+    assert client.suppressed_refreshes == 1
+
+    clock.advance(0.6)
+    assert client.get_signing_key('k2').key_id == 'k2'
+    assert client.forced_refreshes == 2
+
+
+def test_unhashable_kid_without_rate_limit_does_not_refresh():
+    client = make_client(min_refresh_interval=0)
+    with pytest.raises(PyJWKClientError):
+        client.get_signing_key(['k1'])
+
+    assert client.forced_refreshes == 0
+    assert client.suppressed_refreshes == 1
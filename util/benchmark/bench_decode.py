@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-token decode cost of jwt.decode against a compiled decoder,
+for each available JSON backend, using the vendored PyJWT from the
+authorizer Lambda layer.
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+
+LAYER_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'auth_lambda_layer', 'python')
+sys.path.insert(0, os.path.abspath(LAYER_PATH))
+
+import jwt  # noqa: E402
+from jwt.json_backend import has_orjson  # noqa: E402
+
+SECRET = 'ExtrixApiLambdaSecret#1230001'
+
+
+def make_token():
+    """Create a token shaped like the ones minted by util/create_api_token"""
+    now = int(time.time())
+    payload = {"sub": "test-user", "iat": now, "exp": now + 12 * 3600}
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+def bench(name, func, number, repeat):
+    """Run func `number` times, `repeat` times, and print the best per-call cost"""
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print(f"{name:<24} {best * 1e6:8.2f} us/token  {1 / best:12,.0f} tokens/s")
+    return best
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000, help='decodes per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements to take the best of')
+    args = parser.parse_args()
+
+    token = make_token()
+    decoder = jwt.compile_decoder(SECRET, algorithms=['HS256'])
+    backends = ['json', 'orjson'] if has_orjson else ['json']
+
+    print(f"PyJWT {jwt.__version__}, Python {sys.version.split()[0]}")
+    for backend in backends:
+        jwt.set_json_backend(backend)
+        print("-" * 64)
+        print(f"JSON backend: {backend}")
+        baseline = bench("jwt.decode", lambda: jwt.decode(token, SECRET, algorithms=['HS256']),
+                         args.number, args.repeat)
+        compiled = bench("jwt.compile_decoder", lambda: decoder(token), args.number, args.repeat)
+        print(f"compiled decoder speed-up: {baseline / compiled:.2f}x")
+    if not has_orjson:
+        print("-" * 64)
+        print("orjson is not installed; only the stdlib json backend was measured")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold-start import cost of the vendored PyJWT in the authorizer
+Lambda layer. Every measurement runs in a fresh interpreter, like a Lambda
+INIT, and times the import plus the first decode the authorizer performs.
+The "eager" scenario also imports the modules that `import jwt` used to load
+up front (the JWKS client and the cryptography-backed algorithms), as a
+reference for the lazy imports.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+LAYER_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'auth_lambda_layer', 'python'))
+
+SECRET = 'ExtrixApiLambdaSecret#1230001'
+
+# Each scenario is the code timed in a fresh interpreter; TOKEN is an HS256 token.
+SCENARIOS = {
+    "import jwt": "import jwt",
+    "authorizer (HS256)": (
+        "import jwt\n"
+        "decoder = jwt.compile_decoder(SECRET, algorithms=['HS256'])\n"
+        "decoder(TOKEN)"
+    ),
+    "eager (all modules)": (
+        "import jwt\n"
+        "import jwt.jwks_client\n"
+        "from jwt.algorithms import has_crypto\n"
+        "if has_crypto:\n"
+        "    import jwt._crypto_algorithms\n"
+        "decoder = jwt.compile_decoder(SECRET, algorithms=['HS256'])\n"
+        "decoder(TOKEN)"
+    ),
+}
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {layer!r})
+SECRET, TOKEN = {secret!r}, {token!r}
+start = time.perf_counter()
+exec(compile({code!r}, "<scenario>", "exec"))
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "modules": len(sys.modules),
+    "cryptography": "cryptography" in sys.modules,
+    "ssl": "ssl" in sys.modules,
+}}))
+"""
+
+
+def make_token():
+    """Create an HS256 token shaped like the ones minted by util/create_api_token"""
+    sys.path.insert(0, LAYER_PATH)
+    import jwt
+
+    now = int(time.time())
+    return jwt.encode({"sub": "test-user", "iat": now, "exp": now + 12 * 3600}, SECRET, algorithm="HS256")
+
+
+def run_scenario(code, token):
+    """Run the scenario in a fresh interpreter and return its measurement"""
+    child = CHILD.format(layer=LAYER_PATH, secret=SECRET, token=token, code=code)
+    output = subprocess.run([sys.executable, '-c', child], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=15, help='fresh interpreters per scenario')
+    args = parser.parse_args()
+
+    token = make_token()
+    print(f"Python {sys.version.split()[0]}, median of {args.repeat} fresh interpreters")
+    medians = {}
+    for name, code in SCENARIOS.items():
+        runs = [run_scenario(code, token) for _ in range(args.repeat)]
+        medians[name] = statistics.median(run["seconds"] for run in runs)
+        last = runs[-1]
+        print(f"{name:<22} {medians[name] * 1e3:8.2f} ms  {last['modules']:4d} modules  "
+              f"cryptography={'yes' if last['cryptography'] else 'no':<3}  ssl={'yes' if last['ssl'] else 'no'}")
+
+    saved = medians["eager (all modules)"] - medians["authorizer (HS256)"]
+    print(f"lazy imports save {saved * 1e3:.2f} ms of authorizer cold start "
+          f"({saved / medians['eager (all modules)']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark JWKS refresh latency of PyJWKClient with the default urllib
+transport against the pooled keep-alive transport, using a local HTTPS
+stand-in for the JWKS endpoint with a throwaway self-signed certificate.
+Requires the cryptography package to generate the certificate.
+"""
+import argparse
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LAYER_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'auth_lambda_layer', 'python')
+sys.path.insert(0, os.path.abspath(LAYER_PATH))
+
+import jwt  # noqa: E402
+
+JWKS = {"keys": [{"kty": "oct", "kid": "bench", "k": "RXh0cml4QXBpTGFtYmRhU2VjcmV0IzEyMzAwMDE"}]}
+
+
+def write_self_signed_cert(directory):
+    """Write a self-signed certificate and key for 127.0.0.1 and return their paths"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), False)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class JWKSHandler(BaseHTTPRequestHandler):
+    """Serves the JWKS document over HTTP/1.1 keep-alive and counts connections"""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, Nagle's algorithm
+    # delays every keep-alive response by the client's delayed ACK.
+    disable_nagle_algorithm = True
+    connections = set()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        JWKSHandler.connections.add(self.client_address)
+        body = json.dumps(JWKS).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_server(cert_path, key_path):
+    """Start the HTTPS stand-in on a free port and return its JWKS URL"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), JWKSHandler)
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"https://127.0.0.1:{server.server_address[1]}/.well-known/jwks.json"
+
+
+def bench(name, client, number):
+    """Time `number` forced refreshes and print latency and connections opened"""
+    JWKSHandler.connections.clear()
+    client.get_jwk_set(refresh=True)  # warm up
+    start = time.perf_counter()
+    for _ in range(number):
+        client.get_jwk_set(refresh=True)
+    elapsed = (time.perf_counter() - start) / number
+    print(f"{name:<10} {elapsed * 1e3:8.3f} ms/refresh  {len(JWKSHandler.connections):5d} connections")
+    return elapsed
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=200, help='refreshes per transport')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cert_path, key_path = write_self_signed_cert(directory)
+        url = start_server(cert_path, key_path)
+        ssl_context = ssl.create_default_context(cafile=cert_path)
+
+        urllib_client = jwt.PyJWKClient(url, ssl_context=ssl_context)
+        pooled_client = jwt.PyJWKClient(url, ssl_context=ssl_context, transport="pooled")
+
+        print(f"{args.number} forced refreshes against {url}")
+        baseline = bench("urllib", urllib_client, args.number)
+        pooled = bench("pooled", pooled_client, args.number)
+        print(f"pooled transport speed-up: {baseline / pooled:.2f}x "
+              f"({pooled_client.transport.connections_created} connection(s) created)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the vendored PyJWT in the authorizer Lambda layer.
+
+Measures encode and decode throughput and per-call memory for each algorithm
+and payload size, decode with cold versus warm key preparation, and JWKS set
+construction. Results are written as JSON and can be compared against a
+stored baseline, exiting non-zero when a measurement regresses by more than
+the threshold. Asymmetric algorithms need the cryptography package.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+import tracemalloc
+
+LAYER_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'src', 'auth_lambda_layer', 'python')
+sys.path.insert(0, os.path.abspath(LAYER_PATH))
+
+import jwt  # noqa: E402
+from jwt.algorithms import has_crypto  # noqa: E402
+from jwt.json_backend import get_json_backend  # noqa: E402
+
+SECRET = 'ExtrixApiLambdaSecret#1230001'
+ALGORITHMS = ['HS256', 'HS384', 'HS512', 'RS256', 'PS256', 'ES256', 'EdDSA']
+# Payload sizes in bytes of JSON; "tiny" is the bare claims, the others pad it
+PAYLOAD_SIZES = {'tiny': 0, 'small': 256, '1k': 1024, '4k': 4096}
+JWKS_SIZES = [1, 8, 32]
+
+
+def make_keys():
+    """Return {algorithm: (signing key, verifying key)}, with keys as PEM like the authorizer gets them"""
+    keys = {alg: (SECRET, SECRET) for alg in ('HS256', 'HS384', 'HS512')}
+    if not has_crypto:
+        return keys
+
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+
+    def pem_pair(private_key):
+        private_pem = private_key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                                serialization.NoEncryption())
+        public_pem = private_key.public_key().public_bytes(serialization.Encoding.PEM,
+                                                           serialization.PublicFormat.SubjectPublicKeyInfo)
+        return private_pem, public_pem
+
+    rsa_pair = pem_pair(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+    keys['RS256'] = rsa_pair
+    keys['PS256'] = rsa_pair
+    keys['ES256'] = pem_pair(ec.generate_private_key(ec.SECP256R1()))
+    keys['EdDSA'] = pem_pair(ed25519.Ed25519PrivateKey.generate())
+    return keys
+
+
+def make_payload(size):
+    """Create a payload whose JSON is about `size` bytes (or just the claims for 0)"""
+    now = int(time.time())
+    payload = {"sub": "bench-user", "iat": now, "exp": now + 12 * 3600}
+    padding = size - len(json.dumps(payload))
+    if padding > 0:
+        payload["data"] = "x" * max(padding - len(', "data": ""'), 0)
+    return payload
+
+
+def make_jwks(count):
+    """Create a JWKS document of `count` keys, alternating oct, EC and RSA when available"""
+    keys = []
+    public_keys = []
+    if has_crypto:
+        from cryptography.hazmat.primitives.asymmetric import ec, rsa
+        public_keys = [
+            ('ES256', ec.generate_private_key(ec.SECP256R1()).public_key()),
+            ('RS256', rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key()),
+        ]
+    for i in range(count):
+        if public_keys and i % 3:
+            alg, key = public_keys[i % 3 - 1]
+            jwk = jwt.get_algorithm_by_name(alg).to_jwk(key, as_dict=True)
+        else:
+            alg = 'HS256'
+            jwk = jwt.get_algorithm_by_name(alg).to_jwk(f"{SECRET}-{i}", as_dict=True)
+        jwk.update(kid=f"key-{i}", alg=alg, use="sig")
+        keys.append(jwk)
+    return {"keys": keys}
+
+
+def measure(func, min_time, repeat):
+    """Return ops/s (best of `repeat` runs of at least `min_time` s) and peak bytes of one call"""
+    func()  # warm up
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time / 5:
+        number *= 2
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return {"ops_per_sec": round(1 / best, 1), "peak_bytes": peak}
+
+
+def cold(func):
+    """Wrap func so every call starts with empty key and header caches"""
+    def run():
+        jwt.clear_caches()
+        return func()
+    return run
+
+
+def run_suite(args):
+    """Run every selected benchmark and return {name: measurement}"""
+    keys = make_keys()
+    algorithms = [alg for alg in ALGORITHMS if alg in keys and (not args.only or alg in args.only)]
+    results = {}
+
+    def record(name, func):
+        results[name] = measure(func, args.min_time, args.repeat)
+        print(f"{name:<32} {results[name]['ops_per_sec']:>12,.0f} ops/s  {results[name]['peak_bytes']:>8,} B peak")
+
+    for alg in algorithms:
+        signing_key, verifying_key = keys[alg]
+        for size_name, size in PAYLOAD_SIZES.items():
+            payload = make_payload(size)
+            token = jwt.encode(payload, signing_key, algorithm=alg)
+            record(f"encode/{alg}/{size_name}", lambda: jwt.encode(payload, signing_key, algorithm=alg))
+            record(f"decode/{alg}/{size_name}",
+                   lambda: jwt.decode(token, verifying_key, algorithms=[alg]))
+
+        token = jwt.encode(make_payload(PAYLOAD_SIZES['small']), signing_key, algorithm=alg)
+        record(f"decode_cold/{alg}/small",
+               cold(lambda: jwt.decode(token, verifying_key, algorithms=[alg])))
+        decoder = jwt.compile_decoder(verifying_key, algorithms=[alg])
+        record(f"compiled/{alg}/small", lambda: decoder(token))
+
+    if not args.only:
+        for count in JWKS_SIZES:
+            document = make_jwks(count)
+            record(f"jwks/from_dict/{count}", lambda: jwt.PyJWKSet.from_dict(document))
+            record(f"jwks/lookup/{count}",
+                   lambda: jwt.PyJWKSet.from_dict(document)[f"key-{count - 1}"])
+            record(f"jwks/all_keys/{count}", lambda: jwt.PyJWKSet.from_dict(document).keys)
+
+    jwt.clear_caches()
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Print the change against the baseline and return the names of regressed benchmarks"""
+    regressions = []
+    print("-" * 72)
+    print(f"Comparison with baseline (regression threshold {threshold:.0%})")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        speed = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        memory = (result["peak_bytes"] - base["peak_bytes"]) / max(base["peak_bytes"], 1)
+        regressed = speed < -threshold or memory > threshold
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<32} {speed:+8.1%} ops/s  {memory:+8.1%} peak{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', default='bench_results.json', help='file to write the results to')
+    parser.add_argument('--baseline', help='results file of an earlier run to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='relative slowdown or memory growth reported as a regression (default: 0.10)')
+    parser.add_argument('--only', nargs='+', choices=ALGORITHMS, help='algorithms to benchmark (skips JWKS)')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='measurements to take the best of')
+    args = parser.parse_args()
+
+    print(f"PyJWT {jwt.__version__}, Python {sys.version.split()[0]}, JSON backend {get_json_backend().name}")
+    if not has_crypto:
+        print("cryptography is not installed; only HMAC algorithms and oct JWKS keys are measured")
+    results = run_suite(args)
+
+    with open(args.output, 'w') as f:
+        json.dump({
+            "meta": {
+                "pyjwt": jwt.__version__,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "json_backend": get_json_backend().name,
+                "timestamp": int(time.time()),
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
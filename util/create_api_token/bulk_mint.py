@@ -0,0 +1,58 @@
+"""
+Bulk token minting shared by the generate_bearer_token_* scripts
+"""
+import argparse
+import datetime
+import sys
+import uuid
+
+import jwt
+
+
+def add_bulk_arguments(parser):
+    """Add the --count/--output options of the bulk-mint mode to an argument parser"""
+    parser.add_argument('--count', type=int, default=1,
+                        help='number of tokens to mint, each with a distinct sub and jti')
+    parser.add_argument('--output', help='file to write the tokens to, one per line (default: stdout)')
+    parser.add_argument('--sub-prefix', default='load-user', help='prefix of the sub claim in bulk mode')
+
+
+def iter_payloads(count, sub_prefix='load-user', hours=12):
+    """Yield `count` payloads with distinct sub/jti claims and a shared iat/exp"""
+    now = datetime.datetime.now(datetime.UTC)
+    iat = int(now.timestamp())
+    exp = int((now + datetime.timedelta(hours=hours)).timestamp())
+    run_id = uuid.uuid4().hex[:12]
+    for i in range(count):
+        yield {"sub": f"{sub_prefix}-{i}", "jti": f"{run_id}-{i}", "iat": iat, "exp": exp}
+
+
+def iter_tokens(payloads, secret, headers=None):
+    """Encode payloads with HS256, serializing the header and keying HMAC once"""
+    encode_many = getattr(jwt, 'encode_many', None)
+    if encode_many is None:
+        # PyJWT releases without encode_many: encode one token at a time
+        return (jwt.encode(payload, secret, algorithm="HS256", headers=headers) for payload in payloads)
+    return encode_many(payloads, secret, algorithm="HS256", headers=headers)
+
+
+def write_tokens(args, secret, headers=None):
+    """Mint args.count tokens and write them to args.output (or stdout), one per line"""
+    tokens = iter_tokens(iter_payloads(args.count, args.sub_prefix), secret, headers)
+    out = open(args.output, 'w', buffering=1 << 20) if args.output else sys.stdout
+    try:
+        for token in tokens:
+            out.write(token)
+            out.write('\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.output:
+        print(f"Wrote {args.count} tokens to {args.output}", file=sys.stderr)
+
+
+def parse_args(description):
+    """Parse the command line of a generate_bearer_token_* script"""
+    parser = argparse.ArgumentParser(description=description)
+    add_bulk_arguments(parser)
+    return parser.parse_args()
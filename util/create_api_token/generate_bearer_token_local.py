@@ -1,6 +1,11 @@
 import jwt
 import datetime
 import os
+import sys
+
+from bulk_mint import parse_args, write_tokens
+
+args = parse_args("Generate JWT bearer tokens with the SECRET_TOKEN secret")
 
 # Use the same secret as your Lambda authorizer
 secret = os.environ.get('SECRET_TOKEN')
@@ -8,6 +13,11 @@ secret = os.environ.get('SECRET_TOKEN')
 if not secret:
     raise ValueError("SECRET_TOKEN environment variable is not set")
 
+# Bulk-mint mode: write --count tokens with distinct sub/jti to --output
+if args.count > 1 or args.output:
+    write_tokens(args, secret)
+    sys.exit(0)
+
 # Create the payload
 payload = {
     "sub": "test-user",  # Subject (user id or username)
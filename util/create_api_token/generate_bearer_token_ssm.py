@@ -1,40 +1,87 @@
 import jwt
 import datetime
-import boto3
 import json
 import os
-from botocore.exceptions import ClientError
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from bulk_mint import parse_args, write_tokens
+
+def get_secret_value_from_extension(secret_name):
+    """Retrieve the secret through the Parameters and Secrets Lambda Extension, or None if it is not running"""
+    port = os.environ.get('PARAMETERS_SECRETS_EXTENSION_HTTP_PORT', '2773')
+    request = urllib.request.Request(
+        f"http://localhost:{port}/secretsmanager/get?{urllib.parse.urlencode({'secretId': secret_name})}",
+        headers={'X-Aws-Parameters-Secrets-Token': os.environ.get('AWS_SESSION_TOKEN', '')}
+    )
+    try:
+        # The extension is on localhost, never behind an HTTP(S)_PROXY
+        opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+        with opener.open(request, timeout=2) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        print(f"Error retrieving secret: HTTP {e.code} {e.read().decode('utf-8', 'replace')}")
+        raise
+    except (urllib.error.URLError, OSError) as e:
+        print(f"Secrets extension unreachable ({e}), using AWS Secrets Manager", file=sys.stderr)
+        return None
+
+def get_secret_value_from_secrets_manager(secret_name):
+    """Retrieve the secret from AWS Secrets Manager"""
+    # boto3 is only imported when the secrets extension is not used
+    import boto3
+    from botocore.exceptions import ClientError
 
-def get_secret():
-    """Retrieve JWT secret from AWS Secrets Manager"""
-    # Try to get secret name from environment variable
-    secret_name = os.environ.get('JWT_SECRET_ARN')
-    
-    if not secret_name:
-        raise ValueError("JWT_SECRET_ARN environment variable is not set")
-    
     session = boto3.session.Session()
     client = session.client(
         service_name='secretsmanager',
-        region_name=os.environ.get('AWS_REGION', 'eu-west-1')
+        region_name=os.environ.get('AWS_REGION', 'eu-west-1'),
+        endpoint_url=os.environ.get('JWT_SECRETS_ENDPOINT_URL') or None
     )
-    
+
     try:
-        get_secret_value_response = client.get_secret_value(
+        return client.get_secret_value(
             SecretId=secret_name
         )
     except ClientError as e:
         print(f"Error retrieving secret: {e}")
         raise e
+
+def get_secret():
+    """Retrieve the current JWT secret and its key ID from AWS Secrets Manager"""
+    # Try to get secret name from environment variable
+    secret_name = os.environ.get('JWT_SECRET_ARN')
+    
+    if not secret_name:
+        raise ValueError("JWT_SECRET_ARN environment variable is not set")
+    
+    get_secret_value_response = None
+    if os.environ.get('JWT_SECRETS_EXTENSION', '').lower() in ('1', 'true', 'yes'):
+        get_secret_value_response = get_secret_value_from_extension(secret_name)
+    if get_secret_value_response is None:
+        get_secret_value_response = get_secret_value_from_secrets_manager(secret_name)
+
+    if 'SecretString' in get_secret_value_response:
+        secret_data = json.loads(get_secret_value_response['SecretString'])
+        secret = secret_data.get('secret', secret_data.get('JWT_SECRET'))
+        # The authorizer picks the secret version named by the token's kid
+        kid = secret_data.get('kid') or get_secret_value_response.get('VersionId')
+        return secret, kid
     else:
-        if 'SecretString' in get_secret_value_response:
-            secret_data = json.loads(get_secret_value_response['SecretString'])
-            return secret_data.get('secret', secret_data.get('JWT_SECRET'))
-        else:
-            raise ValueError("Secret value is not a string")
+        raise ValueError("Secret value is not a string")
+
+args = parse_args("Generate JWT bearer tokens with the secret from AWS Secrets Manager")
+
+# Get the secret from AWS Secrets Manager (once, also in bulk mode)
+secret, kid = get_secret()
+headers = {"kid": kid} if kid else None
 
-# Get the secret from AWS Secrets Manager
-secret = get_secret()
+# Bulk-mint mode: write --count tokens with distinct sub/jti to --output
+if args.count > 1 or args.output:
+    write_tokens(args, secret, headers)
+    sys.exit(0)
 
 # Create the payload
 payload = {
@@ -44,6 +91,6 @@ payload = {
 }
 
 # Generate the token
-token = jwt.encode(payload, secret, algorithm="HS256")
+token = jwt.encode(payload, secret, algorithm="HS256", headers=headers)
 
 print(token if isinstance(token, str) else token.decode())
\ No newline at end of file
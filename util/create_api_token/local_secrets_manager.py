@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for AWS Secrets Manager, for testing the authorizer's secret
+loading without an AWS account. Serves the subset of the Secrets Manager JSON
+API the authorizer and these scripts use (GetSecretValue, DescribeSecret,
+ListSecrets, BatchGetSecretValue, CreateSecret and PutSecretValue) from
+memory, so boto3 clients work against it with endpoint_url set to its URL.
+It also answers GET /secretsmanager/get like the AWS Parameters and Secrets
+Lambda Extension, so the authorizer's extension client can be tested too.
+"""
+import argparse
+import datetime
+import json
+import secrets
+import sys
+import threading
+import urllib.parse
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ACCOUNT_ID = '000000000000'
+# Page size limits of ListSecrets and BatchGetSecretValue
+LIST_PAGE_SIZE = 100
+BATCH_PAGE_SIZE = 20
+
+
+class SecretNotFound(Exception):
+    """Raised for a SecretId or VersionId the store does not have"""
+
+
+class SecretStore:
+    """Secrets with their versions and version stages, kept in memory"""
+
+    def __init__(self, region='eu-west-1'):
+        self.region = region
+        self._secrets = {}
+        self._lock = threading.Lock()
+
+    def create(self, name, secret_string):
+        """Create a secret with one AWSCURRENT version and return its description"""
+        with self._lock:
+            if name in self._secrets:
+                raise ValueError(f"Secret {name} already exists")
+            arn = f"arn:aws:secretsmanager:{self.region}:{ACCOUNT_ID}:secret:{name}-{secrets.token_hex(3)}"
+            self._secrets[name] = {'ARN': arn, 'Name': name, 'versions': {}, 'stages': {}}
+        return self.put(name, secret_string)
+
+    def put(self, secret_id, secret_string):
+        """Add a new AWSCURRENT version, moving the current one to AWSPREVIOUS"""
+        with self._lock:
+            secret = self._find(secret_id)
+            version = str(uuid.uuid4())
+            stages = secret['stages']
+            for version_stages in stages.values():
+                if 'AWSPREVIOUS' in version_stages:
+                    version_stages.remove('AWSPREVIOUS')
+            for version_stages in stages.values():
+                if 'AWSCURRENT' in version_stages:
+                    version_stages.remove('AWSCURRENT')
+                    version_stages.append('AWSPREVIOUS')
+            secret['versions'][version] = secret_string
+            stages[version] = ['AWSCURRENT']
+            secret['changed'] = datetime.datetime.now(datetime.timezone.utc).timestamp()
+            return {'ARN': secret['ARN'], 'Name': secret['Name'], 'VersionId': version}
+
+    def _find(self, secret_id):
+        secret = self._secrets.get(secret_id)
+        if secret is None:
+            secret = next((s for s in self._secrets.values() if s['ARN'] == secret_id), None)
+        if secret is None:
+            raise SecretNotFound(f"Secrets Manager can't find the specified secret: {secret_id}")
+        return secret
+
+    def _value(self, secret, version=None, stage=None):
+        if version is None:
+            stage = stage or 'AWSCURRENT'
+            version = next((v for v, stages in secret['stages'].items() if stage in stages), None)
+        if version not in secret['versions']:
+            raise SecretNotFound(f"Secrets Manager can't find the specified secret value: {version or stage}")
+        return {
+            'ARN': secret['ARN'],
+            'Name': secret['Name'],
+            'VersionId': version,
+            'SecretString': secret['versions'][version],
+            'VersionStages': list(secret['stages'][version]),
+            'CreatedDate': secret['changed'],
+        }
+
+    def _versions_to_stages(self, secret):
+        return {version: list(stages) for version, stages in secret['stages'].items() if stages}
+
+    def get_value(self, secret_id, version=None, stage=None):
+        with self._lock:
+            return self._value(self._find(secret_id), version, stage)
+
+    def describe(self, secret_id):
+        with self._lock:
+            secret = self._find(secret_id)
+            return {'ARN': secret['ARN'], 'Name': secret['Name'], 'LastChangedDate': secret['changed'],
+                    'VersionIdsToStages': self._versions_to_stages(secret)}
+
+    def _matching(self, filters):
+        """Secrets matching name-prefix filters (case-insensitive, like Secrets Manager), by name"""
+        prefixes = [value.lower() for f in filters or [] if f.get('Key') == 'name' for value in f.get('Values', [])]
+        return [secret for name, secret in sorted(self._secrets.items())
+                if not prefixes or any(name.lower().startswith(prefix) for prefix in prefixes)]
+
+    @staticmethod
+    def _page(items, next_token, max_results, limit):
+        start = int(next_token or 0)
+        end = start + min(max_results or limit, limit)
+        return items[start:end], (str(end) if end < len(items) else None)
+
+    def list(self, filters=None, next_token=None, max_results=None):
+        with self._lock:
+            page, next_token = self._page(self._matching(filters), next_token, max_results, LIST_PAGE_SIZE)
+            response = {'SecretList': [
+                {'ARN': secret['ARN'], 'Name': secret['Name'], 'LastChangedDate': secret['changed'],
+                 'SecretVersionsToStages': self._versions_to_stages(secret)}
+                for secret in page
+            ]}
+        if next_token:
+            response['NextToken'] = next_token
+        return response
+
+    def batch_get(self, secret_ids=None, filters=None, next_token=None, max_results=None):
+        values, errors = [], []
+        with self._lock:
+            if secret_ids:
+                for secret_id in secret_ids:
+                    try:
+                        values.append(self._value(self._find(secret_id)))
+                    except SecretNotFound as e:
+                        errors.append({'SecretId': secret_id, 'ErrorCode': 'ResourceNotFoundException',
+                                       'Message': str(e)})
+                next_token = None
+            else:
+                page, next_token = self._page(self._matching(filters), next_token, max_results, BATCH_PAGE_SIZE)
+                values = [self._value(secret) for secret in page]
+        response = {'SecretValues': values, 'Errors': errors}
+        if next_token:
+            response['NextToken'] = next_token
+        return response
+
+
+class SecretsManagerHandler(BaseHTTPRequestHandler):
+    """Answers Secrets Manager JSON API requests from the server's SecretStore"""
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def send_json(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/x-amz-json-1.1')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        """Serve a secret like the Parameters and Secrets Lambda Extension does"""
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != '/secretsmanager/get':
+            self.send_json(404, {'message': f"Not found: {url.path}"})
+            return
+        token = self.headers.get('X-Aws-Parameters-Secrets-Token')
+        if not token or (self.server.session_token and token != self.server.session_token):
+            self.send_json(401, {'message': 'Missing or invalid X-Aws-Parameters-Secrets-Token header'})
+            return
+        query = dict(urllib.parse.parse_qsl(url.query))
+        if 'secretId' not in query:
+            self.send_json(400, {'message': 'secretId is required'})
+            return
+        try:
+            body = self.server.store.get_value(query['secretId'], query.get('versionId'), query.get('versionStage'))
+        except SecretNotFound as e:
+            self.send_json(400, {'__type': 'ResourceNotFoundException', 'message': str(e)})
+            return
+        self.send_json(200, body)
+
+    def do_POST(self):
+        operation = self.headers.get('X-Amz-Target', '').rpartition('.')[2]
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        store = self.server.store
+        try:
+            if operation == 'GetSecretValue':
+                body = store.get_value(request['SecretId'], request.get('VersionId'), request.get('VersionStage'))
+            elif operation == 'DescribeSecret':
+                body = store.describe(request['SecretId'])
+            elif operation == 'ListSecrets':
+                body = store.list(request.get('Filters'), request.get('NextToken'), request.get('MaxResults'))
+            elif operation == 'BatchGetSecretValue':
+                body = store.batch_get(request.get('SecretIdList'), request.get('Filters'),
+                                       request.get('NextToken'), request.get('MaxResults'))
+            elif operation == 'CreateSecret':
+                body = store.create(request['Name'], request['SecretString'])
+            elif operation == 'PutSecretValue':
+                body = store.put(request['SecretId'], request['SecretString'])
+            else:
+                self.send_json(400, {'__type': 'InvalidRequestException',
+                                     'message': f"Unsupported operation: {operation}"})
+                return
+        except SecretNotFound as e:
+            self.send_json(400, {'__type': 'ResourceNotFoundException', 'message': str(e)})
+            return
+        except (KeyError, ValueError) as e:
+            self.send_json(400, {'__type': 'InvalidParameterException', 'message': str(e)})
+            return
+        self.send_json(200, body)
+
+
+def start_server(store, port=0, verbose=False, session_token=None):
+    """Serve the store on 127.0.0.1 in a background thread and return the server.
+
+    Extension requests must carry `session_token` in X-Aws-Parameters-Secrets-Token
+    if it is set, or any token otherwise.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), SecretsManagerHandler)
+    server.store = store
+    server.verbose = verbose
+    server.session_token = session_token
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def seed_tenants(store, prefix, count):
+    """Create `count` tenant secrets named <prefix>desk-<n>, each with its own key and issuer"""
+    tenants = []
+    for i in range(count):
+        kid = f"desk-{i}"
+        secret = secrets.token_urlsafe(32)
+        store.create(f"{prefix}{kid}", json.dumps({"secret": secret, "kid": kid, "iss": f"https://{kid}.entrix.local"}))
+        tenants.append((kid, secret, f"https://{kid}.entrix.local"))
+    return tenants
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--port', type=int, default=4566, help='port to listen on (default: 4566)')
+    parser.add_argument('--seed-file', help='JSON file of {"secret-name": {...secret JSON...}} to create')
+    parser.add_argument('--tenants', type=int, default=0, help='number of tenant secrets to create')
+    parser.add_argument('--prefix', default='entrix/tenants/', help='name prefix of the tenant secrets')
+    parser.add_argument('--tokens', help='file to write one bearer token per tenant to')
+    parser.add_argument('--session-token', default='local-session-token',
+                        help='token extension requests must send, like AWS_SESSION_TOKEN in Lambda')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    store = SecretStore()
+    if args.seed_file:
+        with open(args.seed_file) as f:
+            for name, value in json.load(f).items():
+                store.create(name, value if isinstance(value, str) else json.dumps(value))
+    tenants = seed_tenants(store, args.prefix, args.tenants)
+
+    if args.tokens and tenants:
+        import jwt
+        now = datetime.datetime.now(datetime.UTC)
+        with open(args.tokens, 'w') as f:
+            for kid, secret, iss in tenants:
+                payload = {"sub": f"{kid}-trader", "iss": iss, "iat": int(now.timestamp()),
+                           "exp": int((now + datetime.timedelta(hours=12)).timestamp())}
+                f.write(jwt.encode(payload, secret, algorithm="HS256", headers={"kid": kid}) + '\n')
+        print(f"Wrote {len(tenants)} tenant tokens to {args.tokens}", file=sys.stderr)
+
+    server = start_server(store, args.port, args.verbose, args.session_token)
+    port = server.server_address[1]
+    url = f"http://127.0.0.1:{port}"
+    print(f"Secrets Manager stand-in listening on {url}")
+    print(f"export JWT_SECRETS_ENDPOINT_URL={url}")
+    print("# or, to read secrets like through the secrets extension:")
+    print(f"export JWT_SECRETS_EXTENSION=1 PARAMETERS_SECRETS_EXTENSION_HTTP_PORT={port} "
+          f"AWS_SESSION_TOKEN={args.session_token}")
+    if tenants:
+        print(f"export JWT_TENANT_SECRET_PREFIX={args.prefix}")
+    print("export AWS_ACCESS_KEY_ID=test AWS_SECRET_ACCESS_KEY=test AWS_REGION=eu-west-1")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()